@@ -5,6 +5,13 @@ from .app import AppDefinition as App, Page, State
 from .navigation import Navigation
 from .core.generator import Component as UI
 from .core.file import File
+from .core.table_sql import (
+    SqlTableSource,
+    SqlConnectionPool,
+    SqlDialect,
+    MySqlDialect,
+    SqlServerDialect,
+)
 from .core.ui import (
     TableColumn,
     TableColumns,
@@ -16,6 +23,7 @@ from .core.ui import (
     SelectOptions,
     TablePageChangeArgs,
     TablePageChangeResponse,
+    TableCountArgs,
     ChartSeriesData,
     TableAction,
     TableActions,
@@ -53,11 +61,18 @@ __all__ = [
     "TableData",
     "TablePageChangeArgs",
     "TablePageChangeResponse",
+    "TableCountArgs",
     "TableTagColors",
     "TableAction",
     "TableActions",
     "TableView",
     "TableViews",
+    # Table Data Sources
+    "SqlTableSource",
+    "SqlConnectionPool",
+    "SqlDialect",
+    "MySqlDialect",
+    "SqlServerDialect",
     # Table Data Control Types
     "TableColumnFilterModel",
     "TableColumnFilterGroup",
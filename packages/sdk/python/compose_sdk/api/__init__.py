@@ -5,6 +5,12 @@ from .ws_message import (
     encode_num_to_four_bytes,
     combine_buffers,
     encode_ws_message,
+    encode_sdk_message,
+    encode_batch_message,
+    decode_batch_message,
+    encode_chunks,
+    encode_chunked_message,
+    ChunkAssembler,
     decode_file_transfer_message,
     decode_json_message,
 )
@@ -15,6 +21,12 @@ __all__ = [
     "encode_num_to_four_bytes",
     "combine_buffers",
     "encode_ws_message",
+    "encode_sdk_message",
+    "encode_batch_message",
+    "decode_batch_message",
+    "encode_chunks",
+    "encode_chunked_message",
+    "ChunkAssembler",
     "decode_file_transfer_message",
     "decode_json_message",
     "ApiHandler",
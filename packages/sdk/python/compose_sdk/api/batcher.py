@@ -0,0 +1,142 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple, Union
+
+from .ws_message import HEADER_LENGTH, encode_batch_message
+
+# Batches are flushed early once they reach this size, and larger messages
+# are sent on their own.
+DEFAULT_MAX_BATCH_BYTES = 1024 * 1024
+
+
+class MessageBatcher:
+    """
+    Collects the messages sent within a short window and sends the messages
+    for each execution as one batch message, so that a burst of small
+    messages (e.g. a rerender followed by several stale state updates and a
+    toast) costs one websocket frame instead of many.
+
+    Messages for the same execution are always sent in order. Messages
+    without an execution (e.g. `INITIALIZE`) flush everything that's pending
+    and are sent on their own.
+
+    Pending messages are superseded by newer messages with the same
+    supersede key, and batches supersede the queued messages that share a
+    key with one of their messages.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes, Union[Hashable, None], List[Hashable]], Awaitable[None]],
+        *,
+        window_ms: float = 0,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    ) -> None:
+        """
+        :param send: Sends a message to the server, along with its supersede
+            key and the keys of the queued messages that it supersedes.
+        :param window_ms: How long to collect messages for before flushing.
+            `0` flushes once the current iteration of the event loop is done.
+        :param max_batch_bytes: Size at which a batch is flushed early.
+        """
+        self.send = send
+        self.window_ms = window_ms
+        self.max_batch_bytes = max_batch_bytes
+
+        # Pending messages, keyed by the session and execution ID part of
+        # their header. Dicts keep insertion order, so that batches are sent
+        # in the order of their first message.
+        self.pending: Dict[bytes, List[Tuple[bytes, Union[Hashable, None]]]] = {}
+        self.pending_bytes: Dict[bytes, int] = {}
+
+        # Created lazily so that it's bound to the loop that uses it.
+        self.lock: Union[asyncio.Lock, None] = None
+        self.flush_handle: Union[asyncio.TimerHandle, None] = None
+        self.flush_tasks: Set["asyncio.Task[Any]"] = set()
+
+    async def add(
+        self, message: bytes, supersede_key: Union[Hashable, None] = None
+    ) -> None:
+        if len(message) < HEADER_LENGTH or len(message) >= self.max_batch_bytes:
+            pending = self.__take_pending()
+
+            async with self.__lock():
+                await self.__send_pending(pending)
+                await self.send(message, supersede_key, [])
+
+            return
+
+        key = message[2:HEADER_LENGTH]
+
+        if key not in self.pending:
+            self.pending[key] = []
+            self.pending_bytes[key] = 0
+
+        if supersede_key is not None:
+            for idx, (pending_message, pending_key) in enumerate(self.pending[key]):
+                if pending_key == supersede_key:
+                    del self.pending[key][idx]
+                    self.pending_bytes[key] -= len(pending_message)
+                    break
+
+        self.pending[key].append((message, supersede_key))
+        self.pending_bytes[key] += len(message)
+
+        if self.pending_bytes[key] >= self.max_batch_bytes:
+            await self.flush()
+        elif self.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self.flush_handle = loop.call_later(
+                self.window_ms / 1000, self.__schedule_flush
+            )
+
+    async def flush(self) -> None:
+        # Pending messages are taken before waiting for the lock, so that
+        # they're sent before any message that's added in the meantime.
+        pending = self.__take_pending()
+
+        async with self.__lock():
+            await self.__send_pending(pending)
+
+    def __lock(self) -> asyncio.Lock:
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+
+        return self.lock
+
+    def __schedule_flush(self) -> None:
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    def __take_pending(
+        self,
+    ) -> Dict[bytes, List[Tuple[bytes, Union[Hashable, None]]]]:
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        pending = self.pending
+        self.pending = {}
+        self.pending_bytes = {}
+
+        return pending
+
+    async def __send_pending(
+        self, pending: Dict[bytes, List[Tuple[bytes, Union[Hashable, None]]]]
+    ) -> None:
+        for key, messages in pending.items():
+            if len(messages) == 1:
+                message, supersede_key = messages[0]
+                await self.send(message, supersede_key, [])
+            elif len(messages) > 1:
+                # The batch as a whole can't be superseded, but it supersedes
+                # the queued messages of its own messages' keys.
+                await self.send(
+                    encode_batch_message(key, [message for message, _ in messages]),
+                    None,
+                    [
+                        supersede_key
+                        for _, supersede_key in messages
+                        if supersede_key is not None
+                    ],
+                )
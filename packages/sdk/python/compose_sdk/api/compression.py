@@ -0,0 +1,221 @@
+import asyncio
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Union
+
+from ..core import EventType
+from .ws_message import HEADER_LENGTH, combine_buffers, encode_string
+
+try:
+    import zstandard  # type: ignore[import-not-found, unused-ignore]
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import lz4.frame  # type: ignore[import-not-found, unused-ignore]
+except ImportError:  # pragma: no cover
+    lz4 = None  # type: ignore[assignment, unused-ignore]
+
+DEFAULT_THRESHOLD_BYTES = 64 * 1024
+
+# The server reads the initialize message before anything else, and messages
+# are compressed before they're split into chunks, so chunks are never
+# compressed.
+UNCOMPRESSED_EVENT_TYPES = (
+    EventType.SdkToServer.INITIALIZE,
+    EventType.SdkToServer.CHUNK,
+)
+
+# Bandwidth used to weigh the time spent compressing against the time saved
+# sending fewer bytes.
+DEFAULT_BANDWIDTH_BYTES_PER_SECOND = 12.5 * 1024 * 1024
+
+# How often a codec other than the current best one is sampled, so that
+# the choice adapts when payloads change.
+EXPLORE_EVERY = 16
+
+# Weight of the latest sample in the moving averages.
+SMOOTHING = 0.3
+
+
+class Codec:
+    ZLIB = 1
+    ZSTD = 2
+    LZ4 = 3
+
+
+def compress(codec: int, data: bytes) -> bytes:
+    if codec == Codec.ZLIB:
+        return zlib.compress(data, 1)
+
+    if codec == Codec.ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(data)  # type: ignore[no-any-return, union-attr, unused-ignore]
+
+    if codec == Codec.LZ4:
+        return lz4.frame.compress(data)  # type: ignore[no-any-return, union-attr, unused-ignore]
+
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress(codec: int, data: bytes) -> bytes:
+    if codec == Codec.ZLIB:
+        return zlib.decompress(data)
+
+    if codec == Codec.ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)  # type: ignore[no-any-return, union-attr, unused-ignore]
+
+    if codec == Codec.LZ4:
+        return lz4.frame.decompress(data)  # type: ignore[no-any-return, union-attr, unused-ignore]
+
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def get_available_codecs() -> List[int]:
+    codecs = [Codec.ZLIB]
+
+    if zstandard is not None:
+        codecs.append(Codec.ZSTD)
+
+    if lz4 is not None:
+        codecs.append(Codec.LZ4)
+
+    return codecs
+
+
+def encode_compressed_message(message: bytes, codec: int, data: bytes) -> bytes:
+    """
+    Wraps a compressed message. The session and execution ID part of the
+    header is kept uncompressed, followed by the codec and the compressed
+    message (including its own header).
+    """
+    return combine_buffers(
+        encode_string(EventType.SdkToServer.COMPRESSED),
+        message[2:HEADER_LENGTH],
+        codec.to_bytes(1, byteorder="big"),
+        data,
+    )
+
+
+def decode_compressed_message(message: bytes) -> bytes:
+    codec = message[HEADER_LENGTH]
+    return decompress(codec, message[HEADER_LENGTH + 1 :])
+
+
+class CodecStats:
+    __slots__ = ("ratio", "bytes_per_second", "samples")
+
+    def __init__(self) -> None:
+        self.ratio = 1.0
+        self.bytes_per_second = 0.0
+        self.samples = 0
+
+    def add_sample(self, size: int, compressed_size: int, seconds: float) -> None:
+        ratio = compressed_size / size
+        bytes_per_second = size / max(seconds, 1e-9)
+
+        if self.samples == 0:
+            self.ratio = ratio
+            self.bytes_per_second = bytes_per_second
+        else:
+            self.ratio += SMOOTHING * (ratio - self.ratio)
+            self.bytes_per_second += SMOOTHING * (
+                bytes_per_second - self.bytes_per_second
+            )
+
+        self.samples += 1
+
+
+class PayloadCompressor:
+    """
+    Compresses messages above a size threshold with the codec that's
+    expected to get them to the server the fastest, based on the measured
+    compression ratio and speed of each available codec. Messages are sent
+    uncompressed when no codec is expected to pay off.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold_bytes: int = DEFAULT_THRESHOLD_BYTES,
+        bandwidth_bytes_per_second: float = DEFAULT_BANDWIDTH_BYTES_PER_SECOND,
+        codecs: Union[List[int], None] = None,
+    ) -> None:
+        self.threshold_bytes = threshold_bytes
+        self.bandwidth_bytes_per_second = bandwidth_bytes_per_second
+        self.codecs = codecs if codecs is not None else get_available_codecs()
+        self.stats: Dict[int, CodecStats] = {
+            codec: CodecStats() for codec in self.codecs
+        }
+        self.count = 0
+
+    def estimate_seconds(self, codec: Union[int, None], size: int) -> float:
+        if codec is None:
+            return size / self.bandwidth_bytes_per_second
+
+        stats = self.stats[codec]
+
+        return (
+            size / stats.bytes_per_second
+            + size * stats.ratio / self.bandwidth_bytes_per_second
+        )
+
+    def choose(self, size: int) -> Union[int, None]:
+        """
+        Returns the codec to compress a message of `size` bytes with, or
+        `None` to send it uncompressed.
+        """
+        unsampled = [codec for codec in self.codecs if self.stats[codec].samples == 0]
+
+        if len(unsampled) > 0:
+            return unsampled[0]
+
+        self.count += 1
+        options: List[Union[int, None]] = [None, *self.codecs]
+        best = min(options, key=lambda codec: self.estimate_seconds(codec, size))
+
+        others = [codec for codec in self.codecs if codec != best]
+
+        if self.count % EXPLORE_EVERY == 0 and len(others) > 0:
+            return others[(self.count // EXPLORE_EVERY) % len(others)]
+
+        return best
+
+    def should_compress(self, message: bytes) -> bool:
+        return (
+            len(message) >= self.threshold_bytes
+            and message[:2].decode("utf-8") not in UNCOMPRESSED_EVENT_TYPES
+        )
+
+    def compress(self, message: bytes) -> bytes:
+        codec = self.choose(len(message))
+
+        if codec is None:
+            return message
+
+        start = time.perf_counter()
+        data = compress(codec, message)
+        self.stats[codec].add_sample(
+            len(message), len(data), time.perf_counter() - start
+        )
+
+        if len(data) + HEADER_LENGTH + 1 >= len(message):
+            return message
+
+        return encode_compressed_message(message, codec, data)
+
+    def wrap(
+        self, write: Callable[[bytes], Awaitable[Any]]
+    ) -> Callable[[bytes], Awaitable[Any]]:
+        """
+        Wraps a write function so that large messages are compressed first.
+        Compression runs in a thread, since the codecs release the GIL.
+        """
+
+        async def write_compressed(message: bytes) -> Any:
+            if self.should_compress(message):
+                loop = asyncio.get_running_loop()
+                message = await loop.run_in_executor(None, self.compress, message)
+
+            return await write(message)
+
+        return write_compressed
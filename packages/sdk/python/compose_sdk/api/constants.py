@@ -14,6 +14,15 @@ WS_CLIENT = {
         "API_KEY": "x-compose-api-key",
         "PACKAGE_NAME": "x-compose-package-name",
         "PACKAGE_VERSION": "x-compose-package-version",
+        # Comma-separated wire features that the SDK supports. The server
+        # answers with the subset that it supports in the same header, and
+        # only those are used for the connection.
+        "CAPABILITIES": "x-compose-capabilities",
+    },
+    "CAPABILITIES": {
+        "BATCH": "batch",
+        "COMPRESSED": "compressed",
+        "CHUNK": "chunk",
     },
     "ERROR_RESPONSE_HEADERS": {
         "REASON": "x-compose-error-reason",
@@ -3,20 +3,32 @@
 from typing import Union
 import ssl
 import websockets
-import queue
 import urllib.parse
 import math
 import asyncio
 
 from ..scheduler import Scheduler
 from ..core import EventType, Debug
+from ..core.file_stream import FilePieces, aiter_pieces
 from .ws_message import (
-    encode_json,
-    encode_ws_message,
+    HEADER_LENGTH,
+    ChunkAssembler,
+    ChunkEncoder,
+    StreamedMessage,
+    encode_chunked_message,
+    encode_sdk_message,
     decode_file_transfer_message,
     decode_json_message,
 )
 
+from .batcher import MessageBatcher
+from .compression import PayloadCompressor
+from .send_queue import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_MESSAGES,
+    SendQueue,
+    get_supersede_key,
+)
 from .constants import WS_CLIENT
 
 YELLOW = "\033[93m"
@@ -60,6 +72,12 @@ class APIHandler:
         *,
         debug: bool = False,
         host: Union[str, None] = None,
+        batch_window_ms: Union[float, None] = None,
+        send_queue_max_messages: int = DEFAULT_MAX_MESSAGES,
+        send_queue_max_bytes: int = DEFAULT_MAX_BYTES,
+        send_queue_spill_dir: Union[str, None] = None,
+        payload_compression: bool = False,
+        chunk_size_bytes: Union[int, None] = None,
     ) -> None:
         self.scheduler = scheduler
 
@@ -87,11 +105,47 @@ class APIHandler:
 
         self.ws = None
         self.is_connected = False
-        self.push = None
 
         self.shutting_down = False
 
-        self.send_queue = queue.Queue()
+        self.send_queue = SendQueue(
+            max_messages=send_queue_max_messages,
+            max_bytes=send_queue_max_bytes,
+            spill_dir=send_queue_spill_dir,
+            on_drop=self.__on_dropped,
+        )
+
+        # Payload compression is opt-in, and only used while connected to a
+        # server that supports compressed messages.
+        self.compressor = PayloadCompressor() if payload_compression else None
+
+        # Chunking outgoing messages is opt-in. Chunks are only sent and
+        # reassembled while connected to a server that supports them, which
+        # is always requested since incoming chunks can always be reassembled.
+        self.chunk_size_bytes = chunk_size_bytes
+        self.chunk_message_id = 0
+        self.chunk_assembler = ChunkAssembler()
+
+        # Batching is opt-in, and only used while connected to a server that
+        # supports batch messages.
+        self.batcher = (
+            MessageBatcher(self.send_queue.put, window_ms=batch_window_ms)
+            if batch_window_ms is not None
+            else None
+        )
+
+        # Wire features that are requested from the server, and the ones
+        # that it accepted for the current connection.
+        self.requested_capabilities: set[str] = set()
+        self.capabilities: set[str] = set()
+
+        if self.batcher is not None:
+            self.requested_capabilities.add(WS_CLIENT["CAPABILITIES"]["BATCH"])
+
+        if self.compressor is not None:
+            self.requested_capabilities.add(WS_CLIENT["CAPABILITIES"]["COMPRESSED"])
+
+        self.requested_capabilities.add(WS_CLIENT["CAPABILITIES"]["CHUNK"])
 
     def add_listener(self, id: str, listener: callable) -> None:
         if id in self.listeners:
@@ -111,12 +165,48 @@ class APIHandler:
     def shutdown(self) -> None:
         self.shutting_down = True
         self.scheduler.shutdown()
+        self.send_queue.close()
 
     async def send_raw(self, data: bytes) -> None:
-        if self.is_connected == True:
-            await self.push(data)
+        await self.__enqueue(data, None)
+
+    async def __enqueue(self, data: bytes, key) -> None:
+        if self.__batching():
+            await self.batcher.add(data, key)
         else:
-            self.send_queue.put(data)
+            await self.send_queue.put(data, key)
+
+    async def send_stream(self, header: bytes, pieces: FilePieces) -> None:
+        """
+        Sends a message made up of `header` followed by `pieces`, which are
+        read as the message is written, so that it's never in memory all at
+        once. If chunking is in use, the message is sent in chunks,
+        otherwise as the fragments of a single websocket message. Streamed
+        messages are never compressed or batched.
+        """
+        if not self.__chunking():
+            # Sent after the pending batches, to keep the messages in order.
+            if self.batcher is not None:
+                await self.batcher.flush()
+
+            await self.send_queue.put(StreamedMessage(header, pieces))
+            return
+
+        encoder = ChunkEncoder(
+            EventType.SdkToServer.CHUNK,
+            header[2:HEADER_LENGTH],
+            self.__next_chunk_message_id(),
+            self.chunk_size_bytes,
+        )
+
+        for chunk in encoder.feed(header):
+            await self.send_raw(chunk)
+
+        async for piece in aiter_pieces(pieces):
+            for chunk in encoder.feed(piece):
+                await self.send_raw(chunk)
+
+        await self.send_raw(encoder.finish())
 
     async def send(
         self,
@@ -128,15 +218,9 @@ class APIHandler:
             data_type_pretty = EventType.SdkToServerPretty.get(data["type"], "Unknown")
             Debug.log("Send websocket message", f"{data_type_pretty}")
 
-        headerStr = (
-            data["type"]
-            if data["type"] == EventType.SdkToServer.INITIALIZE
-            else data["type"] + sessionId + executionId
-        )
-
-        binary = encode_ws_message(headerStr, encode_json(data))
+        binary = encode_sdk_message(data, sessionId, executionId)
 
-        await self.send_raw(binary)
+        await self.__enqueue(binary, get_supersede_key(data, executionId))
 
     async def __makeConnectionRequest(self, on_connect_data: dict) -> None:
         headers = {
@@ -145,6 +229,11 @@ class APIHandler:
             WS_CLIENT["CONNECTION_HEADERS"]["PACKAGE_VERSION"]: self.package_version,
         }
 
+        if len(self.requested_capabilities) > 0:
+            headers[WS_CLIENT["CONNECTION_HEADERS"]["CAPABILITIES"]] = ",".join(
+                sorted(self.requested_capabilities)
+            )
+
         ssl_context = None
         if not self.isDevelopment:
             ssl_context = ssl.create_default_context()
@@ -159,6 +248,8 @@ class APIHandler:
                 max_size=10485760,  # 10 MB
             ) as ws:
                 self.ws = ws
+                self.capabilities = self.__accepted_capabilities(ws)
+                writer = None
 
                 try:
                     print("🌐 Connected to Compose server.")
@@ -168,16 +259,37 @@ class APIHandler:
                     ]
                     self.is_connected = True
 
-                    async def push(data):
-                        if ws is not None:
-                            await ws.send(data)
+                    # Sent before the writer starts, since it has to precede
+                    # the messages that were queued while disconnected.
+                    if self.debug:
+                        Debug.log("Send websocket message", "Initialize")
+
+                    await ws.send(encode_sdk_message(on_connect_data))
 
-                    self.push = push
+                    writer = asyncio.get_running_loop().create_task(
+                        self.send_queue.drain(self.__writer(ws.send))
+                    )
+                    writer.add_done_callback(
+                        lambda task: task.cancelled() or task.exception()
+                    )
+                    self.send_queue.set_connected(True)
 
-                    await self.send(on_connect_data)
+                    for header in self.send_queue.take_desynced():
+                        self.scheduler.run_async(self.__resync_execution(header))
 
                     async for message in ws:
-                        self.__flush_send_queue()
+                        # Chunks are reassembled in the order they arrive,
+                        # before messages are handled concurrently.
+                        if (
+                            WS_CLIENT["CAPABILITIES"]["CHUNK"] in self.capabilities
+                            and message[:2].decode("utf-8")
+                            == EventType.ServerToSdk.CHUNK
+                        ):
+                            message = self.chunk_assembler.add(message)
+
+                            if message is None:
+                                continue
+
                         self.scheduler.run_async(self.__on_message(message))
 
                 except asyncio.CancelledError:
@@ -196,6 +308,11 @@ class APIHandler:
                 finally:
                     self.is_connected = False
                     self.ws = None
+                    self.capabilities = set()
+                    self.send_queue.set_connected(False)
+
+                    if writer is not None:
+                        writer.cancel()
 
         except Exception as e:
             if self.shutting_down:
@@ -245,6 +362,113 @@ class APIHandler:
 
             return
 
+    def __accepted_capabilities(self, ws) -> set[str]:
+        """
+        Returns the requested capabilities that the server accepted in its
+        handshake response. Servers that don't know about capabilities
+        accept none of them.
+        """
+        accepted = ws.response.headers.get(
+            WS_CLIENT["CONNECTION_HEADERS"]["CAPABILITIES"], ""
+        )
+
+        return self.requested_capabilities & {
+            capability.strip() for capability in accepted.split(",")
+        }
+
+    def __batching(self) -> bool:
+        return (
+            self.batcher is not None
+            and WS_CLIENT["CAPABILITIES"]["BATCH"] in self.capabilities
+        )
+
+    def __chunking(self) -> bool:
+        return (
+            self.chunk_size_bytes is not None
+            and WS_CLIENT["CAPABILITIES"]["CHUNK"] in self.capabilities
+        )
+
+    def __next_chunk_message_id(self) -> int:
+        self.chunk_message_id = (self.chunk_message_id + 1) % 2**32
+        return self.chunk_message_id
+
+    def __writer(self, write):
+        """
+        Wraps the websocket's write function so that messages are compressed
+        and then split into chunks, if enabled. Chunks of streamed messages
+        are written as-is, and streamed messages are written fragment by
+        fragment.
+        """
+        write_message = write
+
+        if self.__chunking():
+            write_frame = write
+            chunk_size = self.chunk_size_bytes
+
+            async def write(message: bytes) -> None:
+                if (
+                    len(message) <= chunk_size
+                    or len(message) < HEADER_LENGTH
+                    or message[:2].decode("utf-8") == EventType.SdkToServer.CHUNK
+                ):
+                    await write_frame(message)
+                    return
+
+                for chunk in encode_chunked_message(
+                    message, self.__next_chunk_message_id(), chunk_size
+                ):
+                    await write_frame(chunk)
+
+        if (
+            self.compressor is not None
+            and WS_CLIENT["CAPABILITIES"]["COMPRESSED"] in self.capabilities
+        ):
+            write = self.compressor.wrap(write)
+
+        write_bytes = write
+
+        async def write(message) -> None:
+            if isinstance(message, StreamedMessage):
+                await write_message(message.fragments())
+            else:
+                await write_bytes(message)
+
+        return write
+
+    def __on_dropped(self, header: bytes) -> None:
+        event_type = header[:2].decode("utf-8", errors="replace")
+        data_type_pretty = EventType.SdkToServerPretty.get(event_type, "Unknown")
+
+        if len(header) < HEADER_LENGTH:
+            print_warning(
+                f"Dropped a {data_type_pretty} message while disconnected from "
+                "the Compose server."
+            )
+            return
+
+        execution_id = header[38:HEADER_LENGTH].decode("utf-8", errors="replace")
+
+        print_warning(
+            f"Dropped a {data_type_pretty} message for execution {execution_id} "
+            "while disconnected from the Compose server. The execution will be "
+            "re-rendered once reconnected."
+        )
+
+    async def __resync_execution(self, header: bytes) -> None:
+        """
+        Lets the listeners know that messages of the execution were dropped
+        while disconnected, so that its UI can be re-rendered.
+        """
+        ids = header.decode("utf-8")
+        data = {
+            "type": EventType.SdkInternal.RESYNC_EXECUTION,
+            "sessionId": ids[:36],
+            "executionId": ids[36:],
+        }
+
+        for listener in self.listeners.values():
+            await listener(data)
+
     async def __on_message(self, message) -> None:
         # First 2 bytes are always event type
         event_type = message[:2].decode("utf-8")
@@ -256,9 +480,3 @@ class APIHandler:
 
         for listener in self.listeners.values():
             await listener(data)
-
-    def __flush_send_queue(self) -> None:
-        if self.is_connected:
-            while not self.send_queue.empty():
-                binary = self.send_queue.get()
-                self.scheduler.run_async(self.ws.send(binary))
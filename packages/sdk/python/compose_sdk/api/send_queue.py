@@ -0,0 +1,422 @@
+import asyncio
+import collections
+import tempfile
+from typing import (
+    IO,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Sequence,
+    Set,
+    TypedDict,
+    Union,
+)
+
+from ..core import EventType
+from .ws_message import CHUNK_HEADER_LENGTH, HEADER_LENGTH, StreamedMessage
+
+DEFAULT_MAX_MESSAGES = 10000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Length written in place of a spilled message that's kept in memory.
+SPILLED_STREAM_LENGTH = 0xFFFFFFFF
+
+Message = Union[bytes, StreamedMessage]
+
+# Messages that only carry the latest value of something, so that a newer
+# message makes the older ones redundant.
+SUPERSEDABLE_EVENT_KEYS: Dict[str, tuple[str, ...]] = {
+    EventType.SdkToServer.UPDATE_LOADING_V2: (),
+    EventType.SdkToServer.PAGE_CONFIG_V2: (),
+    EventType.SdkToServer.STALE_STATE_UPDATE_V2: ("renderId", "componentId"),
+}
+
+
+def get_supersede_key(
+    data: Dict[str, Any], execution_id: Union[str, None]
+) -> Union[Hashable, None]:
+    """
+    Returns a key that's shared by the messages that supersede each other,
+    or `None` if the message can't be superseded.
+
+    Rerender diffs are never superseded, since each diff builds on the
+    previous one.
+    """
+    if execution_id is None or data["type"] not in SUPERSEDABLE_EVENT_KEYS:
+        return None
+
+    fields = SUPERSEDABLE_EVENT_KEYS[data["type"]]
+
+    return (data["type"], execution_id, *(data.get(field) for field in fields))
+
+
+def get_header(data: Message) -> bytes:
+    """
+    Returns the bytes of a message that are in memory, which include its
+    header.
+    """
+    return data.header if isinstance(data, StreamedMessage) else data
+
+
+def get_chunk_message(data: bytes) -> Union[bytes, None]:
+    """
+    Returns the header and message ID that identify the message that a chunk
+    belongs to, or `None` if `data` isn't a chunk.
+    """
+    if (
+        len(data) < CHUNK_HEADER_LENGTH
+        or data[:2].decode("utf-8") != EventType.SdkToServer.CHUNK
+    ):
+        return None
+
+    return data[2 : HEADER_LENGTH + 4]
+
+
+def is_last_chunk(data: bytes) -> bool:
+    return data[HEADER_LENGTH + 8] == 1
+
+
+class SendQueueMetrics(TypedDict):
+    # Messages waiting to be sent, in memory and on disk.
+    depth: int
+    # Size of the messages that are waiting in memory.
+    bytes: int
+    # Messages waiting to be sent on disk.
+    spilled: int
+    # Highest depth seen so far.
+    max_depth: int
+    # Messages dropped because the queue was full.
+    dropped: int
+    # Messages dropped because a newer message superseded them.
+    superseded: int
+
+
+class _Entry:
+    __slots__ = ("data", "key", "alive")
+
+    def __init__(self, data: Message, key: Union[Hashable, None]) -> None:
+        self.data = data
+        self.key = key
+        self.alive = True
+
+
+class SendQueue:
+    """
+    Bounded queue of outgoing messages, which are written to the websocket
+    in order by a single writer (see `drain`).
+
+    When the queue is full:
+    - while connected, `put` waits for the writer to make room.
+    - while disconnected, messages are spilled to disk if a `spill_dir` is
+      set, otherwise the oldest message is dropped. Supersedable messages
+      are dropped before any other message. Executions that lose any other
+      message are returned by `take_desynced`, so that they can be
+      re-rendered, and the rest of a dropped chunk's message is dropped too.
+      Streamed messages aren't written to disk, only their place in the
+      queue is.
+
+    Queued messages that are superseded by a newer message (e.g. an older
+    loading state for the same execution) are dropped.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        spill_dir: Union[str, None] = None,
+        on_drop: Union[Callable[[bytes], None], None] = None,
+    ) -> None:
+        """
+        :param on_drop: Called with the header of each message that's
+            dropped without being superseded, e.g. to log it.
+        """
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.on_drop = on_drop
+
+        self.entries: Deque[_Entry] = collections.deque()
+        self.entries_by_key: Dict[Hashable, _Entry] = {}
+        self.size = 0
+        self.bytes = 0
+
+        # Messages on disk are always newer than the messages in memory.
+        self.spill_file: Union[IO[bytes], None] = None
+        self.spill_read_offset = 0
+        self.spilled = 0
+        self.spilled_streams: Deque[StreamedMessage] = collections.deque()
+
+        self.max_depth = 0
+        self.dropped = 0
+        self.superseded = 0
+
+        # Session and execution IDs of the executions that lost a message.
+        self.desynced: Set[bytes] = set()
+        # Chunked messages that lost a chunk, whose remaining chunks are
+        # dropped as they're queued.
+        self.dropped_chunk_messages: Set[bytes] = set()
+
+        self.connected = False
+        self.changed: Union[asyncio.Event, None] = None
+
+    def __event(self) -> asyncio.Event:
+        # Created lazily so that it's bound to the loop that uses it.
+        if self.changed is None:
+            self.changed = asyncio.Event()
+
+        return self.changed
+
+    def __notify(self) -> None:
+        if self.changed is not None:
+            self.changed.set()
+
+    def is_full(self) -> bool:
+        return self.size >= self.max_messages or self.bytes >= self.max_bytes
+
+    def set_connected(self, connected: bool) -> None:
+        self.connected = connected
+        self.__notify()
+
+    async def put(
+        self,
+        data: Message,
+        key: Union[Hashable, None] = None,
+        supersedes: Sequence[Hashable] = (),
+    ) -> None:
+        """
+        Queues a message. Queued messages with the same `key`, or with one
+        of the `supersedes` keys, are dropped.
+        """
+        while self.connected and self.is_full() and self.spilled == 0:
+            event = self.__event()
+            event.clear()
+            await event.wait()
+
+        for superseded_key in (key, *supersedes):
+            if superseded_key is not None and superseded_key in self.entries_by_key:
+                self.__remove(self.entries_by_key[superseded_key])
+                self.superseded += 1
+
+        if self.spilled > 0 or (self.is_full() and self.spill_dir is not None):
+            self.__spill(data)
+        else:
+            if self.is_full():
+                self.__drop_oldest()
+
+            if self.__is_dropped_chunk(data):
+                self.dropped += 1
+            else:
+                entry = _Entry(data, key)
+                self.entries.append(entry)
+                self.size += 1
+                self.bytes += len(data)
+
+                if key is not None:
+                    self.entries_by_key[key] = entry
+
+        self.max_depth = max(self.max_depth, self.size + self.spilled)
+        self.__notify()
+
+    def put_front(self, data: Message) -> None:
+        """
+        Returns a message that couldn't be written to the front of the queue.
+        """
+        self.entries.appendleft(_Entry(data, None))
+        self.size += 1
+        self.bytes += len(data)
+        self.__notify()
+
+    async def get(self) -> Message:
+        while True:
+            if self.size == 0 and self.spilled > 0:
+                self.__unspill()
+
+            while self.entries:
+                entry = self.entries.popleft()
+
+                if not entry.alive:
+                    continue
+
+                self.__remove(entry)
+                self.__notify()
+                return entry.data
+
+            event = self.__event()
+            event.clear()
+            await event.wait()
+
+    async def drain(self, write: Callable[[Message], Awaitable[Any]]) -> None:
+        """
+        Writes queued messages in order until cancelled or `write` fails. A
+        message that couldn't be written is kept at the front of the queue,
+        unless it's a streamed message that was partly read, which can't be
+        written again and is dropped.
+        """
+        while True:
+            data = await self.get()
+
+            try:
+                await write(data)
+            except BaseException:
+                if isinstance(data, StreamedMessage) and data.started:
+                    self.dropped += 1
+                    self.desynced.add(data.header[2:HEADER_LENGTH])
+
+                    if self.on_drop is not None:
+                        self.on_drop(data.header)
+                else:
+                    self.put_front(data)
+                raise
+
+    def take_desynced(self) -> List[bytes]:
+        """
+        Returns the session and execution IDs of the executions that lost
+        messages since the last call.
+        """
+        desynced = list(self.desynced)
+        self.desynced.clear()
+
+        return desynced
+
+    def metrics(self) -> SendQueueMetrics:
+        return {
+            "depth": self.size + self.spilled,
+            "bytes": self.bytes,
+            "spilled": self.spilled,
+            "max_depth": self.max_depth,
+            "dropped": self.dropped,
+            "superseded": self.superseded,
+        }
+
+    def __remove(self, entry: _Entry) -> None:
+        # Entries are removed lazily from the deque.
+        entry.alive = False
+        self.size -= 1
+        self.bytes -= len(entry.data)
+
+        if entry.key is not None and self.entries_by_key.get(entry.key) is entry:
+            del self.entries_by_key[entry.key]
+
+    def __drop_oldest(self) -> None:
+        # Keyed entries are supersedable, and `entries_by_key` is in the order
+        # they were queued.
+        supersedable = next(iter(self.entries_by_key.values()), None)
+
+        if supersedable is not None:
+            self.__drop(supersedable)
+            return
+
+        while self.entries:
+            entry = self.entries.popleft()
+
+            if entry.alive:
+                self.__drop(entry)
+                return
+
+    def __drop(self, entry: _Entry) -> None:
+        self.__remove(entry)
+        self.dropped += 1
+
+        header = get_header(entry.data)
+
+        if entry.key is not None:
+            return
+
+        if self.on_drop is not None:
+            self.on_drop(header)
+
+        if len(header) < HEADER_LENGTH:
+            return
+
+        self.desynced.add(header[2:HEADER_LENGTH])
+
+        chunk_message = get_chunk_message(header)
+
+        if chunk_message is None:
+            return
+
+        # The message can't be reassembled without the chunk, so the rest of
+        # its chunks are dropped.
+        if not is_last_chunk(header):
+            self.dropped_chunk_messages.add(chunk_message)
+
+        for other in self.entries:
+            other_header = get_header(other.data)
+
+            if other.alive and get_chunk_message(other_header) == chunk_message:
+                self.__remove(other)
+                self.dropped += 1
+
+                if is_last_chunk(other_header):
+                    self.dropped_chunk_messages.discard(chunk_message)
+
+    def __is_dropped_chunk(self, data: Message) -> bool:
+        if isinstance(data, StreamedMessage):
+            return False
+
+        chunk_message = get_chunk_message(data)
+
+        if chunk_message is None or chunk_message not in self.dropped_chunk_messages:
+            return False
+
+        if is_last_chunk(data):
+            self.dropped_chunk_messages.discard(chunk_message)
+
+        return True
+
+    def __spill(self, data: Message) -> None:
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(dir=self.spill_dir)
+            self.spill_read_offset = 0
+
+        self.spill_file.seek(0, 2)
+
+        if isinstance(data, StreamedMessage):
+            self.spill_file.write(SPILLED_STREAM_LENGTH.to_bytes(4, byteorder="big"))
+            self.spilled_streams.append(data)
+        else:
+            self.spill_file.write(len(data).to_bytes(4, byteorder="big"))
+            self.spill_file.write(data)
+
+        self.spilled += 1
+
+    def __unspill(self) -> None:
+        """
+        Reads spilled messages back into memory, up to the queue limits.
+        """
+        if self.spill_file is None:
+            return
+
+        self.spill_file.seek(self.spill_read_offset)
+
+        while self.spilled > 0 and not self.is_full():
+            length = int.from_bytes(self.spill_file.read(4), byteorder="big")
+            data: Message
+
+            if length == SPILLED_STREAM_LENGTH:
+                data = self.spilled_streams.popleft()
+            else:
+                data = self.spill_file.read(length)
+
+            self.entries.append(_Entry(data, None))
+            self.size += 1
+            self.bytes += len(data)
+            self.spilled -= 1
+
+        self.spill_read_offset = self.spill_file.tell()
+
+        if self.spilled == 0:
+            self.spill_file.close()
+            self.spill_file = None
+
+    def close(self) -> None:
+        if self.spill_file is not None:
+            self.spill_file.close()
+            self.spill_file = None
+
+        self.spilled_streams.clear()
@@ -1,5 +1,8 @@
 from ..core import EventType, JSON
-from typing import Any, Dict
+from ..core.file_stream import FilePieces, aiter_pieces
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
 
 
 def encode_string(data: str) -> bytes:
@@ -14,7 +17,7 @@ def encode_json(data: Any) -> bytes:
     return JSON.to_bytes(data)
 
 
-def combine_buffers(*args: bytes) -> bytes:
+def combine_buffers(*args: Buffer) -> bytes:
     return b"".join(args)
 
 
@@ -23,12 +26,247 @@ def encode_ws_message(header_string: str, data: bytes) -> bytes:
     return combine_buffers(header_buffer, data)
 
 
+def encode_sdk_message(
+    data: Dict[str, Any],
+    session_id: Union[str, None] = None,
+    execution_id: Union[str, None] = None,
+) -> bytes:
+    header_string = (
+        data["type"]
+        if data["type"] == EventType.SdkToServer.INITIALIZE
+        else data["type"] + session_id + execution_id
+    )
+
+    return encode_ws_message(header_string, encode_json(data))
+
+
+# Event type, session ID and execution ID.
+HEADER_LENGTH = 74
+
+
+def encode_batch_message(header: bytes, messages: List[bytes]) -> bytes:
+    """
+    Combines messages that share the same session and execution into one
+    message. `header` is the session and execution ID part of their header.
+    Each message is kept as-is, prefixed with its length.
+    """
+    parts = [encode_string(EventType.SdkToServer.BATCH), header]
+
+    for message in messages:
+        parts.append(encode_num_to_four_bytes(len(message)))
+        parts.append(message)
+
+    return combine_buffers(*parts)
+
+
+def decode_batch_message(message: bytes) -> List[bytes]:
+    messages: List[bytes] = []
+    offset = HEADER_LENGTH
+
+    while offset < len(message):
+        length = int.from_bytes(message[offset : offset + 4], byteorder="big")
+        offset += 4
+        messages.append(message[offset : offset + length])
+        offset += length
+
+    return messages
+
+
+class StreamedMessage:
+    """
+    A message made up of `header` followed by `pieces`, which are read as
+    it's written, as the fragments of a single websocket message. Only the
+    header is held in memory, so its length is the length of the header.
+    """
+
+    def __init__(self, header: bytes, pieces: FilePieces) -> None:
+        self.header = header
+        self.pieces = pieces
+        self.started = False
+
+    def __len__(self) -> int:
+        return len(self.header)
+
+    async def fragments(self) -> AsyncIterator[Buffer]:
+        self.started = True
+        yield self.header
+
+        async for piece in aiter_pieces(self.pieces):
+            yield piece
+
+
+# Message ID, chunk index, and whether it's the last chunk.
+CHUNK_HEADER_LENGTH = HEADER_LENGTH + 9
+
+DEFAULT_CHUNK_SIZE_BYTES = 1024 * 1024
+
+
+def encode_chunk(
+    event_type: str,
+    header: bytes,
+    message_id: int,
+    index: int,
+    is_last: bool,
+    data: Buffer,
+) -> bytes:
+    return combine_buffers(
+        encode_string(event_type),
+        header,
+        encode_num_to_four_bytes(message_id),
+        encode_num_to_four_bytes(index),
+        b"\x01" if is_last else b"\x00",
+        data,
+    )
+
+
+class ChunkEncoder:
+    """
+    Splits a message into chunks of `chunk_size` bytes as it's fed, so that
+    the message never has to be in memory all at once. `header` is the
+    session and execution ID part of the message header.
+    """
+
+    def __init__(
+        self,
+        event_type: str,
+        header: bytes,
+        message_id: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE_BYTES,
+    ) -> None:
+        self.event_type = event_type
+        self.header = header
+        self.message_id = message_id
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.index = 0
+
+    def feed(self, piece: Buffer) -> Iterator[bytes]:
+        """
+        Returns the chunks that are complete after adding `piece`. The piece
+        is copied, so it can be reused once this returns.
+        """
+        self.buffer += piece
+
+        while len(self.buffer) > self.chunk_size:
+            yield self.__encode(self.buffer[: self.chunk_size], False)
+            del self.buffer[: self.chunk_size]
+
+    def finish(self) -> bytes:
+        chunk = self.__encode(self.buffer, True)
+        self.buffer = bytearray()
+        return chunk
+
+    def __encode(self, data: Buffer, is_last: bool) -> bytes:
+        chunk = encode_chunk(
+            self.event_type, self.header, self.message_id, self.index, is_last, data
+        )
+        self.index += 1
+        return chunk
+
+
+def encode_chunks(
+    event_type: str,
+    header: bytes,
+    message_id: int,
+    pieces: Iterable[Buffer],
+    chunk_size: int = DEFAULT_CHUNK_SIZE_BYTES,
+) -> Iterator[bytes]:
+    """
+    Splits a message into chunks. The message is read from `pieces` as the
+    chunks are consumed.
+    """
+    encoder = ChunkEncoder(event_type, header, message_id, chunk_size)
+
+    for piece in pieces:
+        yield from encoder.feed(piece)
+
+    yield encoder.finish()
+
+
+def encode_chunked_message(
+    message: bytes, message_id: int, chunk_size: int = DEFAULT_CHUNK_SIZE_BYTES
+) -> Iterator[bytes]:
+    """
+    Splits an encoded message into chunks, each of which carries the session
+    and execution ID of the message so that it can be routed on its own.
+    The receiver concatenates the chunks to get the original message back.
+    """
+    view = memoryview(message)
+
+    return encode_chunks(
+        EventType.SdkToServer.CHUNK,
+        message[2:HEADER_LENGTH],
+        message_id,
+        (view[idx : idx + chunk_size] for idx in range(0, len(message), chunk_size)),
+        chunk_size,
+    )
+
+
+def decode_chunk(message: bytes) -> Tuple[bytes, int, int, bool, bytes]:
+    """
+    Returns the header, message ID, index, last chunk flag, and data of a
+    chunk.
+    """
+    return (
+        message[2:HEADER_LENGTH],
+        int.from_bytes(message[HEADER_LENGTH : HEADER_LENGTH + 4], byteorder="big"),
+        int.from_bytes(message[HEADER_LENGTH + 4 : HEADER_LENGTH + 8], byteorder="big"),
+        message[HEADER_LENGTH + 8] == 1,
+        message[CHUNK_HEADER_LENGTH:],
+    )
+
+
+class ChunkAssembler:
+    """
+    Reassembles chunked messages. Chunks of a message must arrive in order,
+    but may be interleaved with the chunks of other messages.
+
+    Incomplete messages are discarded, oldest first, once they exceed
+    `max_pending_bytes` in total.
+    """
+
+    def __init__(self, max_pending_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_pending_bytes = max_pending_bytes
+        self.pending: Dict[Tuple[bytes, int], List[bytes]] = {}
+        self.pending_bytes = 0
+
+    def add(self, chunk: bytes) -> Union[bytes, None]:
+        """
+        Returns the message once its last chunk has been added, or `None`
+        otherwise.
+        """
+        header, message_id, index, is_last, data = decode_chunk(chunk)
+        key = (header, message_id)
+
+        parts = self.pending.pop(key, [])
+
+        if len(parts) != index:
+            # A chunk went missing, so the message can't be reassembled.
+            self.pending_bytes -= sum(len(part) for part in parts)
+            return None
+
+        if is_last:
+            self.pending_bytes -= sum(len(part) for part in parts)
+            return combine_buffers(*parts, data)
+
+        parts.append(data)
+        self.pending[key] = parts
+        self.pending_bytes += len(data)
+
+        while self.pending_bytes > self.max_pending_bytes and self.pending:
+            oldest = next(iter(self.pending))
+            self.pending_bytes -= sum(len(part) for part in self.pending.pop(oldest))
+
+        return None
+
+
 def decode_file_transfer_message(message: bytes) -> Dict[str, Any]:
     # Bytes 2-38 are the environmentId, hence we start parsing after that
     execution_id = message[38:74].decode("utf-8")
     file_id = message[74:110].decode("utf-8")
 
-    file_contents = message[110:]
+    # A view avoids copying the file, which may be large.
+    file_contents = memoryview(message)[110:]
 
     data = {
         "type": EventType.ServerToSdk.FILE_TRANSFER,
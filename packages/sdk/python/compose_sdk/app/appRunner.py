@@ -1,9 +1,20 @@
 # type: ignore
 
+import asyncio
 import inspect
-import io
 import traceback
-from typing import Any, TypedDict, Callable, Union, Dict, Literal, Mapping
+from typing import (
+    Any,
+    TypedDict,
+    Callable,
+    Union,
+    Dict,
+    Literal,
+    Mapping,
+    Set,
+    List,
+    Tuple,
+)
 import time
 
 from ..scheduler import Scheduler
@@ -38,15 +49,32 @@ from ..core import (
     RateLimiter,
     validate_audit_log,
     Table,
+    TablePageChangeArgs,
     ComponentUpdateCache,
     ComponentReturn,
 )
 from ..core.run_hook_function import RunHookFunction
 from ..core.validate_form import ValidateForm
+from ..core.file_stream import FileSource, iter_file
+from ..core.upload_store import UploadStore
+from ..core.table_view_cache import TableViewCache
 from ..core.static_tree.find_component import FindComponent
+from ..core.static_tree.component_index import ComponentIndex
+from ..core.static_tree.diff.metadata import get_component_metadata
+from ..core.static_tree.diff.table_delta import (
+    DEFAULT_MAX_CHANGE_RATIO as TABLE_DELTA_MAX_CHANGE_RATIO,
+)
+from ..core.static_tree.pipeline import (
+    StaticTreePipeline,
+    StaticTreePass,
+    ValidatePass,
+    IndexPass,
+    CallbackPass,
+    CompressPass,
+)
 
 from .appDefinition import AppDefinition
-from .state import State
+from .state import State, ALL_KEYS
 from .page import Page, Params as PageParams
 
 
@@ -62,9 +90,44 @@ class RenderObj(TypedDict):
     cleanup: Callable[[], None]
     layout: Any
     static_layout: Any
+    # Maps component IDs in the static layout to the components.
+    index: ComponentIndex
     appearance: RENDER_APPEARANCE
     modal_header: Union[str, None]
     modal_width: MODAL_WIDTH
+    track_state: bool
+    # The state keys read by the layout during its last render, or `None` if
+    # the layout should re-render on every state update.
+    dependencies: Union[Set[Any], None]
+
+
+class DependenciesPass(StaticTreePass):
+    """
+    Finds the components that prevent a render from only re-rendering when
+    the state keys that it reads change, and the state keys that manually
+    paginated tables declare that they depend on.
+    """
+
+    name = "dependencies"
+
+    def __init__(self):
+        self.has_undeclared_manual_table = False
+        self.table_keys = set()
+
+    def visit(self, component, parent, form_id, depth):
+        if (
+            component["type"] == TYPE.INPUT_TABLE
+            and component["hooks"]["onPageChange"] is not None
+            and component["hooks"]["onPageChange"]["type"] == TablePagination.MANUAL
+        ):
+            hook = component["hooks"]["onPageChange"]
+
+            if hook.get("depends_on") is not None:
+                self.table_keys.update(hook["depends_on"])
+            elif hook.get("deps") is None:
+                self.has_undeclared_manual_table = True
+
+        return None
 
 
 DELETED_RENDER = "DELETED"
@@ -82,6 +145,12 @@ class AppRunner:
         *,
         debug: bool = False,
         audit_log_rate_limiter: Union[RateLimiter, None] = None,
+        concurrent_renders: bool = False,
+        hash_component_models: bool = False,
+        table_row_deltas: bool = False,
+        columnar_tables: bool = False,
+        upload_store: Union[UploadStore, None] = None,
+        table_view_cache: Union[TableViewCache, None] = None,
     ):
         self.scheduler = scheduler
         self.api = api
@@ -90,19 +159,36 @@ class AppRunner:
         self.browserSessionId = browserSessionId
         self.debug = debug
         self.audit_log_rate_limiter = audit_log_rate_limiter
+        self.concurrent_renders = concurrent_renders
+        self.table_delta_ratio = (
+            TABLE_DELTA_MAX_CHANGE_RATIO if table_row_deltas else None
+        )
+        self.columnar_tables = columnar_tables
 
         self.renders: List[str] = []
         self.renders_by_id: Dict[str, Union[RenderObj, DeletedRender]] = {}
-        self.tempFiles = {}
+        self.tempFiles = (
+            upload_store if upload_store is not None else UploadStore()
+        ).scope(executionId)
 
         self.confirmationDialog: Union[ConfirmationDialog, None] = None
 
-        self.component_update_cache = ComponentUpdateCache()
-        self.table_state = TableState(self.scheduler, self.component_update_cache)
+        self.component_update_cache = ComponentUpdateCache(
+            hash_models=hash_component_models
+        )
+        self.table_state = TableState(
+            self.scheduler,
+            self.component_update_cache,
+            view_cache=(
+                table_view_cache if table_view_cache is not None else TableViewCache()
+            ).scope(executionId),
+        )
 
         self.run_hook_function = RunHookFunction(self.scheduler)
         self.validate_form = ValidateForm(self.run_hook_function)
 
+        self.__state_update_lock: Union[asyncio.Lock, None] = None
+
     async def render_ui(
         self,
         layout: Any,
@@ -111,6 +197,7 @@ class AppRunner:
         modal_header: Union[str, None] = None,
         modal_width: MODAL_WIDTH = MODAL_WIDTH_DEFAULT,
         key: Union[str, None] = None,
+        track_state: bool = True,
     ) -> Any:
         try:
             future = self.scheduler.create_future()
@@ -154,14 +241,14 @@ class AppRunner:
 
             self.renders.append(renderId)
 
+            dependencies = set() if track_state else None
+
             def cache_component(component: ComponentReturn):
                 if self.component_update_cache.should_cache(component):
-                    model_to_cache = JSON.remove_keys(component["model"], ["id"])
                     self.component_update_cache.set(
                         renderId,
                         component["model"]["id"],
-                        # diff function uses bytes in python SDK
-                        JSON.to_bytes(model_to_cache),
+                        self.component_update_cache.fingerprint(component["model"]),
                     )
 
             if self.debug:
@@ -173,32 +260,40 @@ class AppRunner:
                         warning_threshold_ms=25,
                     )
                 ):
+                    with State.record_reads(dependencies):
+                        static_layout = await StaticTree.generate(
+                            self.__track_layout(layout, dependencies),
+                            resolve_render,
+                            renderId,
+                            self.table_state,
+                            self.scheduler,
+                        )
+            else:
+                with State.record_reads(dependencies):
                     static_layout = await StaticTree.generate(
-                        layout,
+                        self.__track_layout(layout, dependencies),
                         resolve_render,
                         renderId,
                         self.table_state,
                         self.scheduler,
                     )
-                    await FindComponent.do_for_component(static_layout, cache_component)
-            else:
-                static_layout = await StaticTree.generate(
-                    layout, resolve_render, renderId, self.table_state, self.scheduler
-                )
-                await FindComponent.do_for_component(static_layout, cache_component)
 
-            if self.debug:
-                with Debug.measure_duration(
-                    lambda elapsed: Debug.log(
-                        f"Page add (fragment: {renderId})",
-                        f"validated layout in {elapsed:.2f} ms",
-                        duration_ms=elapsed,
-                        warning_threshold_ms=10,
-                    )
-                ):
-                    validation_error = StaticTree.validate(static_layout)
-            else:
-                validation_error = StaticTree.validate(static_layout)
+            # Validate, cache, index and compress the layout in one traversal.
+            dependencies_pass = DependenciesPass()
+            index_pass = IndexPass()
+            compress_pass = CompressPass(self.columnar_tables)
+
+            validation_error = self.__run_pipeline(
+                static_layout,
+                [
+                    ValidatePass(),
+                    dependencies_pass,
+                    CallbackPass("cache", cache_component),
+                    index_pass,
+                    compress_pass,
+                ],
+                f"Page add (fragment: {renderId})",
+            )
 
             if validation_error is not None:
                 return await self.__send_error(
@@ -209,10 +304,15 @@ class AppRunner:
                 "resolve": resolve_render,
                 "layout": layout,
                 "static_layout": static_layout,
+                "index": index_pass.index,
                 "cleanup": cleanup,
                 "appearance": appearance,
                 "modal_header": modal_header,
                 "modal_width": modal_width,
+                "track_state": track_state,
+                "dependencies": self.__resolve_dependencies(
+                    dependencies_pass, dependencies
+                ),
             }
 
             optional_params = {
@@ -220,22 +320,9 @@ class AppRunner:
                 "modalWidth": modal_width,
             }
 
-            if self.debug:
-                with Debug.measure_duration(
-                    lambda elapsed: Debug.log(
-                        f"Page add (fragment: {renderId})",
-                        f"Compressed static layout in {elapsed:.2f} ms",
-                        duration_ms=elapsed,
-                        warning_threshold_ms=25,
-                    )
-                ):
-                    compressed = Compress.ui_tree(static_layout)
-            else:
-                compressed = Compress.ui_tree(static_layout)
-
             final_params = {
                 "type": EventType.SdkToServer.RENDER_UI_V2,
-                "ui": compressed,
+                "ui": compress_pass.result,
                 "renderId": renderId,
                 "appearance": appearance,
                 "idx": len(self.renders) - 1,
@@ -415,69 +502,198 @@ class AppRunner:
             self.executionId,
         )
 
-    async def on_state_update(self):
+    def __track_layout(self, layout: Any, dependencies: Union[Set[Any], None]):
+        if dependencies is None or not callable(layout):
+            return layout
+
+        return State.track_reads(layout, dependencies)
+
+    def __run_pipeline(
+        self, static_layout: ComponentReturn, passes, event: str
+    ) -> Union[str, None]:
+        """
+        Runs the passes over the static layout in a single traversal, and
+        returns the validation error, if any. In debug mode, logs the time
+        spent in each pass.
+        """
+        pipeline = StaticTreePipeline(passes, measure=self.debug)
+
+        if not self.debug:
+            return pipeline.run(static_layout)
+
+        with Debug.measure_duration(
+            lambda elapsed: Debug.log(
+                event,
+                f"ran static tree passes in {elapsed:.2f} ms ({pipeline.format_timings()})",
+                duration_ms=elapsed,
+                warning_threshold_ms=35,
+            )
+        ):
+            return pipeline.run(static_layout)
+
+    @staticmethod
+    def __resolve_dependencies(
+        dependencies_pass: "DependenciesPass", dependencies: Union[Set[Any], None]
+    ) -> Union[Set[Any], None]:
+        # Manually paginated tables fetch their data in the page change
+        # function, which may read state outside of the render. Unless they
+        # declare what they depend on, keep re-rendering them on every state
+        # update so that they're marked stale.
+        if dependencies is None or dependencies_pass.has_undeclared_manual_table:
+            return None
+
+        return dependencies | dependencies_pass.table_keys
+
+    @staticmethod
+    def __should_rerender(
+        render: RenderObj, changed_keys: Union[Set[Any], None]
+    ) -> bool:
+        dependencies = render["dependencies"]
+
+        if changed_keys is None or dependencies is None:
+            return True
+
+        if ALL_KEYS in changed_keys or ALL_KEYS in dependencies:
+            return True
+
+        return not dependencies.isdisjoint(changed_keys)
+
+    async def __regenerate_layout(
+        self,
+        renderId: str,
+        render: RenderObj,
+        changed_keys: Union[Set[Any], None],
+    ):
+        dependencies = set() if render["track_state"] else None
+
+        if self.debug:
+            async with Debug.async_measure_duration(
+                lambda elapsed: Debug.log(
+                    f"Page update (fragment: {renderId})",
+                    f"generated new layout in {elapsed:.2f} ms",
+                    duration_ms=elapsed,
+                    warning_threshold_ms=25,
+                )
+            ):
+                with State.record_reads(dependencies):
+                    new_static_layout = await StaticTree.generate(
+                        self.__track_layout(render["layout"], dependencies),
+                        render["resolve"],
+                        renderId,
+                        self.table_state,
+                        self.scheduler,
+                        changed_keys,
+                    )
+        else:
+            with State.record_reads(dependencies):
+                new_static_layout = await StaticTree.generate(
+                    self.__track_layout(render["layout"], dependencies),
+                    render["resolve"],
+                    renderId,
+                    self.table_state,
+                    self.scheduler,
+                    changed_keys,
+                )
+
+        return new_static_layout, dependencies
+
+    async def __regenerate_layouts(
+        self,
+        renders: List[Tuple[str, RenderObj]],
+        changed_keys: Union[Set[Any], None],
+    ):
+        """
+        Generates the new static layout for each render. Returns a list in the
+        same order as `renders`, which contains either the generated layout
+        and its dependencies, or the exception raised while generating it.
+        """
+        # Tables compare the changed keys against the keys they depend on.
+        if changed_keys is not None and ALL_KEYS in changed_keys:
+            changed_keys = None
+
+        if self.concurrent_renders:
+            return await asyncio.gather(
+                *[
+                    self.__regenerate_layout(renderId, render, changed_keys)
+                    for renderId, render in renders
+                ],
+                return_exceptions=True,
+            )
+
+        results = []
+
+        for renderId, render in renders:
+            try:
+                results.append(
+                    await self.__regenerate_layout(renderId, render, changed_keys)
+                )
+            except Exception as error:
+                results.append(error)
+                break
+
+        return results
+
+    async def on_state_update(self, changed_keys: Union[Set[Any], None] = None):
+        """
+        Re-renders the page after a state update. If `changed_keys` is
+        provided, only the fragments that read one of the changed keys during
+        their last render are regenerated.
+        """
+        if self.__state_update_lock is None:
+            self.__state_update_lock = asyncio.Lock()
+
+        # Generating layouts may yield to the event loop, so serialize updates
+        # to ensure that each diff is computed against the latest layout.
+        async with self.__state_update_lock:
+            await self.__update_renders(changed_keys)
+
+    async def __update_renders(self, changed_keys: Union[Set[Any], None]):
         try:
             updated_renders = {}
 
             if self.debug:
                 algorithm_start_time = time.time()
 
-            for renderId in self.renders_by_id:
-                render = self.renders_by_id[renderId]
+            renders_to_update = []
 
+            for renderId, render in list(self.renders_by_id.items()):
                 if render == DELETED_RENDER:
                     continue
 
-                layout = render["layout"]
-
                 # No need to check for changes for static layouts
-                if not callable(layout):
+                if not callable(render["layout"]):
                     continue
 
-                resolve_fn = render["resolve"]
+                if not self.__should_rerender(render, changed_keys):
+                    continue
 
-                try:
-                    if self.debug:
-                        async with Debug.async_measure_duration(
-                            lambda elapsed: Debug.log(
-                                f"Page update (fragment: {renderId})",
-                                f"generated new layout in {elapsed:.2f} ms",
-                                duration_ms=elapsed,
-                                warning_threshold_ms=25,
-                            )
-                        ):
-                            new_static_layout = await StaticTree.generate(
-                                layout,
-                                resolve_fn,
-                                renderId,
-                                self.table_state,
-                                self.scheduler,
-                            )
-                    else:
-                        new_static_layout = await StaticTree.generate(
-                            layout,
-                            resolve_fn,
-                            renderId,
-                            self.table_state,
-                            self.scheduler,
-                        )
-                except Exception as error:
+                renders_to_update.append((renderId, render))
+
+            regenerated = await self.__regenerate_layouts(
+                renders_to_update, changed_keys
+            )
+
+            # Validate and diff in render order, so that errors are reported
+            # for the first fragment that failed.
+            for (renderId, render), result in zip(renders_to_update, regenerated):
+                if isinstance(result, BaseException):
                     return await self.__send_error(
-                        f"An error occurred while re-rendering the UI:\n\n{str(error)}\n\n{''.join(traceback.format_tb(error.__traceback__))}"
+                        f"An error occurred while re-rendering the UI:\n\n{str(result)}\n\n{''.join(traceback.format_tb(result.__traceback__))}"
                     )
 
-                if self.debug:
-                    with Debug.measure_duration(
-                        lambda elapsed: Debug.log(
-                            f"Page update (fragment: {renderId})",
-                            f"validated layout in {elapsed:.2f} ms",
-                            duration_ms=elapsed,
-                            warning_threshold_ms=10,
-                        )
-                    ):
-                        validation_error = StaticTree.validate(new_static_layout)
-                else:
-                    validation_error = StaticTree.validate(new_static_layout)
+                new_static_layout, dependencies = result
+
+                dependencies_pass = DependenciesPass()
+
+                validation_error = self.__run_pipeline(
+                    new_static_layout,
+                    [ValidatePass(), dependencies_pass],
+                    f"Page update (fragment: {renderId})",
+                )
+
+                render["dependencies"] = self.__resolve_dependencies(
+                    dependencies_pass, dependencies
+                )
 
                 if validation_error is not None:
                     return await self.__send_error(
@@ -498,6 +714,8 @@ class AppRunner:
                             new_static_layout,
                             renderId,
                             self.component_update_cache,
+                            self.table_delta_ratio,
+                            self.columnar_tables,
                         )
                 else:
                     diff = StaticTree.diff(
@@ -505,6 +723,8 @@ class AppRunner:
                         new_static_layout,
                         renderId,
                         self.component_update_cache,
+                        self.table_delta_ratio,
+                        self.columnar_tables,
                     )
 
                 # When we perform a diff, we don't update the IDs of existing
@@ -524,6 +744,7 @@ class AppRunner:
                 # that when we finally do send a delete command to the client,
                 # the ID is recognized.
                 render["static_layout"] = diff["new_layout_with_ids_applied"]
+                render["index"] = diff["index"]
 
                 if not diff["did_change"]:
                     continue
@@ -536,11 +757,14 @@ class AppRunner:
                     "metadata": diff["metadata"],
                 }
 
+                if len(diff["table_deltas"]) > 0:
+                    updated_renders[renderId]["tableDeltas"] = diff["table_deltas"]
+
             if self.debug:
                 algorithm_time = time.time() - algorithm_start_time
                 Debug.log(
                     "Page update",
-                    f"computed page diff in {(algorithm_time * 1000):.2f} ms",
+                    f"computed page diff in {(algorithm_time * 1000):.2f} ms ({len(renders_to_update)} fragments re-rendered)",
                     duration_ms=algorithm_time * 1000,
                     warning_threshold_ms=75,
                 )
@@ -592,6 +816,40 @@ class AppRunner:
                 f"An error occurred while updating the page:\n\n{str(error)}\n\n{''.join(traceback.format_tb(error.__traceback__))}"
             )
 
+    async def resync(self):
+        """
+        Re-sends every fragment in full, after messages of the execution were
+        dropped. Each fragment is sent as a diff that replaces its whole tree,
+        so that the browser doesn't depend on the diffs it missed.
+        """
+        for renderId, render in list(self.renders_by_id.items()):
+            if render == DELETED_RENDER:
+                continue
+
+            root_id = render["static_layout"]["model"]["id"]
+
+            await self.api.send(
+                {
+                    "type": EventType.SdkToServer.RERENDER_UI_V3,
+                    "diff": {
+                        renderId: {
+                            "add": {
+                                root_id: Compress.ui_tree(
+                                    render["static_layout"], self.columnar_tables
+                                )
+                            },
+                            "delete": [],
+                            "update": {},
+                            "rootId": root_id,
+                            "metadata": get_component_metadata(render["index"]),
+                        }
+                    },
+                    "v": 2,
+                },
+                self.browserSessionId,
+                self.executionId,
+            )
+
     async def log(
         self,
         message: str,
@@ -662,8 +920,7 @@ class AppRunner:
                     if render == DELETED_RENDER:
                         continue
 
-                    static_layout = render["static_layout"]
-                    component = StaticTree.find_component.by_id(static_layout, input_id)
+                    component = render["index"].get(input_id)
 
                     if component is not None:
                         if was_found is True:
@@ -717,17 +974,9 @@ class AppRunner:
                 "warning",
             )
 
-    async def download(self, file: Union[bytes, io.BufferedIOBase], filename: str):
-        if isinstance(file, io.BufferedIOBase):
-            file.seek(0)
-            file_content = file.read()
-        elif isinstance(file, bytes):
-            file_content = file
-        else:
-            raise TypeError(
-                "The 'file' argument must be of type 'bytes' or a bytes-like object that supports the read() method (e.g., BytesIO). "
-                "Please provide the file content as bytes or a bytes-like object."
-            )
+    async def download(self, file: FileSource, filename: str):
+        # Validate the file before anything is sent.
+        pieces = iter_file(file)
 
         metadata = {
             "name": filename,
@@ -747,12 +996,13 @@ class AppRunner:
 
         metadata_binary = encode_string(metadata_str)
 
-        message = combine_buffers(
-            header_binary, metadata_length_binary, metadata_binary, file_content
+        # The content is streamed after the header, rather than combined
+        # with it, so that large files aren't copied in memory.
+        await self.api.send_stream(
+            combine_buffers(header_binary, metadata_length_binary, metadata_binary),
+            pieces,
         )
 
-        await self.api.send_raw(message)
-
     async def link(
         self, appRouteOrUrl: str, newTab: bool = True, params: PageParams = {}
     ):
@@ -809,7 +1059,9 @@ class AppRunner:
             if inspect.iscoroutinefunction(self.appDefinition.handler):
                 self.scheduler.run_async(self.appDefinition.handler(**kwargs))
             else:
-                self.scheduler.run_sync(self.appDefinition.handler, **kwargs)
+                await self.scheduler.run_sync_async(
+                    self.appDefinition.handler, **kwargs
+                )
         except Exception as error:
             await self.__send_error(
                 f"An error occurred while running the app:\n\n{str(error)}\n\n{''.join(traceback.format_tb(error.__traceback__))}"
@@ -824,9 +1076,7 @@ class AppRunner:
         if render == DELETED_RENDER:
             return
 
-        static_layout = render["static_layout"]
-
-        component = StaticTree.find_component.by_id(static_layout, component_id)
+        component = render["index"].get(component_id)
 
         if (
             component is None
@@ -855,21 +1105,20 @@ class AppRunner:
         if render == DELETED_RENDER:
             return
 
-        static_layout = render["static_layout"]
-        component = StaticTree.find_component.by_id(static_layout, form_component_id)
+        component = render["index"].get(form_component_id)
 
         if component is None or component["type"] != TYPE.LAYOUT_FORM:
             return
 
         hydrated, temp_files_to_delete = ValidateForm.hydrate_form_data(
-            form_data, component, self.tempFiles
+            form_data, component, self.tempFiles, render["index"]
         )
 
         for file_id in temp_files_to_delete:
             del self.tempFiles[file_id]
 
         input_errors = await self.validate_form.get_form_input_errors(
-            hydrated, static_layout
+            hydrated, render["index"]
         )
         form_error = await self.validate_form.get_form_error(component, hydrated)
 
@@ -920,8 +1169,7 @@ class AppRunner:
         if render == DELETED_RENDER:
             return
 
-        static_layout = render["static_layout"]
-        component = StaticTree.find_component.by_id(static_layout, component_id)
+        component = render["index"].get(component_id)
 
         if component is None or component["interactionType"] != INTERACTION_TYPE.INPUT:
             return
@@ -934,7 +1182,7 @@ class AppRunner:
             del self.tempFiles[file_id]
 
         input_errors = await self.validate_form.get_form_input_errors(
-            hydrated, static_layout
+            hydrated, render["index"]
         )
 
         if input_errors is not None:
@@ -984,8 +1232,7 @@ class AppRunner:
         if render == DELETED_RENDER:
             return
 
-        static_layout = render["static_layout"]
-        component = StaticTree.find_component.by_id(static_layout, component_id)
+        component = render["index"].get(component_id)
 
         if component is None:
             await self.__send_error(
@@ -1061,7 +1308,7 @@ class AppRunner:
 
         render["resolve"](None)
 
-    def on_file_transfer(self, file_id: str, file_contents: bytes):
+    def on_file_transfer(self, file_id: str, file_contents: Union[bytes, memoryview]):
         self.tempFiles[file_id] = file_contents
 
     async def on_table_page_change_hook(
@@ -1086,8 +1333,7 @@ class AppRunner:
             if render == DELETED_RENDER:
                 return
 
-            static_layout = render["static_layout"]
-            component = StaticTree.find_component.by_id(static_layout, component_id)
+            component = render["index"].get(component_id)
 
             if component is None:
                 await self.__send_error(
@@ -1129,36 +1375,152 @@ class AppRunner:
                 return
 
             if component["hooks"]["onPageChange"]["type"] == TablePagination.AUTO:
-                all_data = component["hooks"]["onPageChange"]["fn"]()
-                data = all_data[offset : offset + page_size]
-                total_records = len(all_data)
+                data, total_records = self.table_state.get_page(
+                    render_id,
+                    component_id,
+                    component["hooks"]["onPageChange"]["fn"](),
+                    view,
+                    offset,
+                    page_size,
+                    component["model"]["properties"]["columns"],
+                )
             elif component["hooks"]["onPageChange"]["type"] == TablePagination.MANUAL:
-                should_refresh_total_records = (
-                    TableState.should_refresh_total_record(previous_active_view, view)
-                    or refresh_total_records
+                page_change_fn = component["hooks"]["onPageChange"]["fn"]
+                prefetch = component["hooks"]["onPageChange"].get("prefetch", False)
+                count_fn = component["hooks"]["onPageChange"].get("count")
+
+                cached_page = (
+                    self.table_state.get_cached_page(
+                        render_id, component_id, view, offset, page_size
+                    )
+                    if prefetch and not refresh_total_records
+                    else None
                 )
 
-                arguments = {
-                    "offset": offset,
-                    "page_size": page_size,
-                    "search_query": view["search_query"],
-                    "filter_by": Table().transform_advanced_filter_model_to_snake_case(
-                        view["filter_by"]
-                    ),
-                    "sort_by": view["sort_by"],
-                    "prev_search_query": previous_active_view["search_query"],
-                    "prev_total_records": (
-                        None if refresh_total_records else table_state["total_records"]
-                    ),
-                    "refresh_total_records": should_refresh_total_records,
-                }
+                if cached_page is not None:
+                    # Supersedes any page change that's still in flight.
+                    self.table_state.cancel_page_change(
+                        self.table_state.generate_key(render_id, component_id)
+                    )
 
-                response = await self.run_hook_function.execute(
-                    component["hooks"]["onPageChange"]["fn"], arguments
-                )
+                    data = cached_page["data"]
+                    total_records = cached_page["total_records"]
+                else:
+                    if count_fn is not None:
+                        # The total is counted by the count function instead.
+                        should_refresh_total_records = False
+                        prev_total_records = self.table_state.get_cached_count(
+                            render_id, component_id, view
+                        )
+                    else:
+                        should_refresh_total_records = (
+                            TableState.should_refresh_total_record(
+                                previous_active_view, view
+                            )
+                            or refresh_total_records
+                        )
+                        prev_total_records = (
+                            None
+                            if refresh_total_records
+                            else table_state["total_records"]
+                        )
+
+                    arguments = self.__get_page_change_arguments(
+                        offset,
+                        page_size,
+                        view,
+                        previous_active_view["search_query"],
+                        prev_total_records,
+                        should_refresh_total_records,
+                        *self.table_state.get_cursor(
+                            render_id, component_id, view, offset, page_size
+                        ),
+                    )
+
+                    # The hook runs in its own task, so that a newer page change
+                    # of the same table can cancel it. Sync hooks can't be
+                    # interrupted, but their result is discarded.
+                    page_change = asyncio.ensure_future(
+                        self.run_hook_function.execute(page_change_fn, arguments)
+                    )
+                    self.table_state.start_page_change(
+                        render_id, component_id, page_change
+                    )
+
+                    try:
+                        # Unlike awaiting the hook, waiting for it doesn't
+                        # cancel it when this task is cancelled, so that a
+                        # superseded hook can be told apart from a cancelled
+                        # page change.
+                        await asyncio.wait({page_change})
+                        # A newer page change cancels the hook, or may have
+                        # started while it was finishing, in which case its
+                        # result is discarded.
+                        superseded = (
+                            page_change.cancelled()
+                            or not self.table_state.is_latest_page_change(
+                                render_id, component_id, page_change
+                            )
+                        )
+                    except asyncio.CancelledError:
+                        page_change.cancel()
+                        raise
+                    finally:
+                        self.table_state.finish_page_change(
+                            render_id, component_id, page_change
+                        )
+
+                    if superseded:
+                        return
+
+                    response = page_change.result()
+
+                    data = response["data"]
+                    total_records = (
+                        response.get("total_records")
+                        if count_fn is not None
+                        else response["total_records"]
+                    )
+
+                    self.table_state.set_cursors(
+                        render_id, component_id, view, offset, page_size, response
+                    )
+
+                    if prefetch:
+                        self.table_state.set_cached_page(
+                            render_id,
+                            component_id,
+                            view,
+                            offset,
+                            page_size,
+                            {"data": data, "total_records": total_records},
+                        )
+
+                if count_fn is not None:
+                    total_records = self.__get_deferred_total_records(
+                        render_id,
+                        component_id,
+                        count_fn,
+                        view,
+                        previous_active_view,
+                        offset,
+                        page_size,
+                        data,
+                        total_records,
+                        table_state["total_records"],
+                        refresh_total_records,
+                    )
 
-                data = response["data"]
-                total_records = response["total_records"]
+                if prefetch:
+                    self.__prefetch_adjacent_pages(
+                        render_id,
+                        component_id,
+                        page_change_fn,
+                        view,
+                        offset,
+                        page_size,
+                        total_records,
+                    )
             else:
                 await self.__send_error(
                     "An error occurred while trying to execute a table page change hook:\n\nDid not find a valid page change handler function.",
@@ -1232,60 +1594,335 @@ class AppRunner:
 
                     return
 
-            self.table_state.update(
+            await self.__send_table_page(
                 render_id,
                 component_id,
-                {
-                    "total_records": total_records,
-                    "offset": offset,
-                    "data": data,
-                    "stale": Stale.FALSE,
-                    "page_size": page_size,
-                    "active_view": view,
-                },
+                component,
+                data,
+                offset,
+                page_size,
+                view,
+                total_records,
             )
 
-            component["model"]["properties"] = {
-                **component["model"]["properties"],
+        except Exception as error:
+            await self.__send_error(
+                f"An error occurred while executing table page change callback function:\n\n{str(error)}\n\n{''.join(traceback.format_tb(error.__traceback__))}"
+            )
+
+    async def __send_table_page(
+        self,
+        render_id: str,
+        component_id: str,
+        component: ComponentReturn,
+        data: List[Any],
+        offset: int,
+        page_size: int,
+        view: Table.PaginationView,
+        total_records: int,
+    ):
+        self.table_state.update(
+            render_id,
+            component_id,
+            {
+                "total_records": total_records,
+                "offset": offset,
                 "data": data,
+                "stale": Stale.FALSE,
+                "page_size": page_size,
+                "active_view": view,
+            },
+        )
+
+        component["model"]["properties"] = {
+            **component["model"]["properties"],
+            "data": data,
+            "offset": offset,
+            "searchQuery": view["search_query"],
+            "sortBy": view["sort_by"],
+            "filterBy": view["filter_by"],
+            "viewBy": view["view_by"],
+            "totalRecords": total_records,
+            "pageSize": page_size,
+        }
+
+        compressed_table = Compress.ui_tree(component, self.columnar_tables)
+        compressed_properties = compressed_table["model"]["properties"]
+
+        await self.api.send(
+            {
+                "type": EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2,
+                "renderId": render_id,
+                "componentId": component_id,
+                "data": compressed_properties["data"],
+                **(
+                    {"dataVersion": compressed_properties["dataVersion"]}
+                    if "dataVersion" in compressed_properties
+                    else {}
+                ),
+                "totalRecords": total_records,
                 "offset": offset,
                 "searchQuery": view["search_query"],
                 "sortBy": view["sort_by"],
                 "filterBy": view["filter_by"],
                 "viewBy": view["view_by"],
-                "totalRecords": total_records,
-                "pageSize": page_size,
-            }
+                "stale": (
+                    Stale.UPDATE_NOT_DISABLED
+                    if self.table_state.has_queued_update(render_id, component_id)
+                    else Stale.FALSE
+                ),
+            },
+            self.browserSessionId,
+            self.executionId,
+        )
 
-            compressed_table = Compress.ui_tree(component)
-            compressed_data = compressed_table["model"]["properties"]["data"]
+    def __get_deferred_total_records(
+        self,
+        render_id: str,
+        component_id: str,
+        count_fn: Callable[..., Any],
+        view: Table.PaginationView,
+        previous_view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+        data: List[Any],
+        returned_total_records: Union[int, None],
+        previous_total_records: Union[int, None],
+        refresh: bool,
+    ) -> int:
+        """
+        Returns the total number of records of a table with a count function.
+        If the count isn't cached, it's started in the background and sent
+        once it's done, while a provisional total is returned right away.
+        """
+        if not refresh:
+            cached_count = self.table_state.get_cached_count(
+                render_id, component_id, view
+            )
 
-            await self.api.send(
+            if cached_count is not None:
+                return cached_count
+
+        if refresh or not self.table_state.is_counting(render_id, component_id, view):
+            count = asyncio.ensure_future(
+                self.__count_total_records(render_id, component_id, count_fn, view)
+            )
+            self.table_state.start_count(render_id, component_id, view, count)
+
+        if returned_total_records is not None:
+            return returned_total_records
+
+        if (
+            previous_total_records is not None
+            and not TableState.should_refresh_total_record(previous_view, view)
+        ):
+            return previous_total_records
+
+        # Enough to allow moving to the next page until the count arrives.
+        return offset + len(data) + (1 if len(data) >= page_size else 0)
+
+    async def __count_total_records(
+        self,
+        render_id: str,
+        component_id: str,
+        count_fn: Callable[..., Any],
+        view: Table.PaginationView,
+    ):
+        count = asyncio.current_task()
+
+        try:
+            total_records = await self.run_hook_function.execute(
+                count_fn,
                 {
-                    "type": EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2,
-                    "renderId": render_id,
-                    "componentId": component_id,
-                    "data": compressed_data,
-                    "totalRecords": total_records,
-                    "offset": offset,
-                    "searchQuery": view["search_query"],
-                    "sortBy": view["sort_by"],
-                    "filterBy": view["filter_by"],
-                    "viewBy": view["view_by"],
-                    "stale": (
-                        Stale.UPDATE_NOT_DISABLED
-                        if self.table_state.has_queued_update(render_id, component_id)
-                        else Stale.FALSE
+                    "search_query": view["search_query"],
+                    "filter_by": Table().transform_advanced_filter_model_to_snake_case(
+                        view["filter_by"]
                     ),
                 },
-                self.browserSessionId,
-                self.executionId,
             )
-
         except Exception as error:
             await self.__send_error(
-                f"An error occurred while executing table page change callback function:\n\n{str(error)}\n\n{''.join(traceback.format_tb(error.__traceback__))}"
+                f"An error occurred while executing table count function:\n\n{str(error)}\n\n{''.join(traceback.format_tb(error.__traceback__))}"
             )
+            return
+        finally:
+            self.table_state.finish_count(render_id, component_id, count)
+
+        self.table_state.set_cached_count(render_id, component_id, view, total_records)
+
+        table_state = self.table_state.get(render_id, component_id)
+
+        # Page changes that are in flight, or refreshes of a stale table, will
+        # pick up the cached count instead.
+        if (
+            table_state is None
+            or table_state["stale"] != Stale.FALSE
+            or self.table_state.generate_key(render_id, component_id)
+            in self.table_state.page_changes
+        ):
+            return
+
+        # The count may be for a view that's no longer active.
+        active_total_records = self.table_state.get_cached_count(
+            render_id, component_id, table_state["active_view"]
+        )
+
+        if (
+            active_total_records is None
+            or active_total_records == table_state["total_records"]
+        ):
+            return
+
+        render = self.renders_by_id.get(render_id)
+
+        if render is None or render == DELETED_RENDER:
+            return
+
+        component = render["index"].get(component_id)
+
+        if component is None:
+            return
+
+        await self.__send_table_page(
+            render_id,
+            component_id,
+            component,
+            table_state["data"],
+            table_state["offset"],
+            table_state["page_size"],
+            table_state["active_view"],
+            active_total_records,
+        )
+
+    @staticmethod
+    def __get_page_change_arguments(
+        offset: int,
+        page_size: int,
+        view: Table.PaginationView,
+        prev_search_query: Union[str, None],
+        prev_total_records: Union[int, None],
+        refresh_total_records: bool,
+        cursor: Any,
+        cursor_direction: Union[Table.CursorDirection.TYPE, None],
+    ) -> TablePageChangeArgs:
+        return {
+            "offset": offset,
+            "page_size": page_size,
+            "search_query": view["search_query"],
+            "filter_by": Table().transform_advanced_filter_model_to_snake_case(
+                view["filter_by"]
+            ),
+            "sort_by": view["sort_by"],
+            "prev_search_query": prev_search_query,
+            "prev_total_records": prev_total_records,
+            "refresh_total_records": refresh_total_records,
+            "cursor": cursor,
+            "cursor_direction": cursor_direction,
+        }
+
+    def __prefetch_adjacent_pages(
+        self,
+        render_id: str,
+        component_id: str,
+        page_change_fn: Callable[..., Any],
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+        total_records: int,
+    ):
+        """
+        Fetches the pages before and after the current page in the
+        background, so that they can be served from the page cache.
+        """
+        key = self.table_state.generate_key(render_id, component_id)
+        generation = self.table_state.page_cache.generation(key)
+
+        for adjacent_offset in (offset + page_size, offset - page_size):
+            if adjacent_offset < 0 or adjacent_offset >= total_records:
+                continue
+
+            if (
+                self.table_state.get_cached_page(
+                    render_id, component_id, view, adjacent_offset, page_size
+                )
+                is not None
+            ):
+                continue
+
+            if not self.table_state.page_cache.start_prefetch(
+                key, adjacent_offset, page_size
+            ):
+                continue
+
+            self.scheduler.run_async(
+                self.__prefetch_page(
+                    render_id,
+                    component_id,
+                    page_change_fn,
+                    view,
+                    adjacent_offset,
+                    page_size,
+                    total_records,
+                    generation,
+                )
+            )
+
+    async def __prefetch_page(
+        self,
+        render_id: str,
+        component_id: str,
+        page_change_fn: Callable[..., Any],
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+        total_records: int,
+        generation: int,
+    ):
+        key = self.table_state.generate_key(render_id, component_id)
+
+        try:
+            response = await self.run_hook_function.execute(
+                page_change_fn,
+                self.__get_page_change_arguments(
+                    offset,
+                    page_size,
+                    view,
+                    view["search_query"],
+                    total_records,
+                    False,
+                    *self.table_state.get_cursor(
+                        render_id, component_id, view, offset, page_size
+                    ),
+                ),
+            )
+
+            self.table_state.set_cursors(
+                render_id, component_id, view, offset, page_size, response
+            )
+
+            self.table_state.set_cached_page(
+                render_id,
+                component_id,
+                view,
+                offset,
+                page_size,
+                {
+                    "data": response["data"],
+                    # Tables with a count function may leave out the total.
+                    "total_records": response.get("total_records", total_records),
+                },
+                generation,
+            )
+        except Exception as error:
+            # Prefetching is best effort. Errors are reported if the page is
+            # requested, since it's fetched again then.
+            if self.debug:
+                Debug.log(
+                    f"Table prefetch (table: {component_id})",
+                    f"failed to prefetch page at offset {offset}: {str(error)}",
+                )
+        finally:
+            self.table_state.page_cache.finish_prefetch(key, offset, page_size)
 
     def cleanup(self):
         try:
@@ -1300,6 +1937,7 @@ class AppRunner:
 
             self.table_state.cleanup()
             self.component_update_cache.clear()
+            self.tempFiles.discard_all()
 
         except Exception as error:
             print(f"Error cleaning up app runner: {error}")
@@ -1,4 +1,3 @@
-import io
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -20,6 +19,7 @@ from ..core import (
     MODAL_WIDTH_DEFAULT,
     Debug,
 )
+from ..core.file_stream import FileSource
 from .state import State  # type: ignore[attr-defined]
 import warnings
 
@@ -104,7 +104,11 @@ class Page:
         return self.__params
 
     def add(
-        self, layout: Layout, *, key: Union[str, None] = None
+        self,
+        layout: Layout,
+        *,
+        key: Union[str, None] = None,
+        track_state: bool = True,
     ) -> Union[Awaitable[Any], Any]:
         """
         Add UI components to the page.
@@ -121,6 +125,12 @@ class Page:
             function passes a `resolve` callback that can be used to resolve
             the `add` method with whatever value is passed to the callback.
 
+        track_state : `bool`, optional
+            Whether to only re-render the layout when the state keys that it
+            reads change. Set to `False` if the layout depends on variables
+            outside of `state`, so that it re-renders on every state update.
+            Defaults to `True`.
+
         Returns
         ----------
         An awaitable that resolves to nothing or the value passed to the
@@ -156,7 +166,7 @@ class Page:
                 Debug.log("Page", "add")
 
         return self.__appRunner.scheduler.run_async(
-            self.__appRunner.render_ui(layout, key=key)
+            self.__appRunner.render_ui(layout, key=key, track_state=track_state)
         )
 
     def modal(
@@ -166,6 +176,7 @@ class Page:
         title: Union[str, None] = None,
         width: MODAL_WIDTH = MODAL_WIDTH_DEFAULT,
         key: Union[str, None] = None,
+        track_state: bool = True,
     ) -> Union[Awaitable[Any], Any]:
         """
         Add UI components to the page inside a modal.
@@ -188,6 +199,12 @@ class Page:
         width : 'sm' | 'md' | 'lg' | 'xl' | '2xl', optional
             The width of the modal. Defaults to "md".
 
+        track_state : `bool`, optional
+            Whether to only re-render the modal when the state keys that it
+            reads change. Set to `False` if the modal depends on variables
+            outside of `state`, so that it re-renders on every state update.
+            Defaults to `True`.
+
         Returns
         ----------
         An awaitable that resolves to nothing or the value passed to the
@@ -219,10 +236,11 @@ class Page:
                 modal_header=title,
                 modal_width=width,
                 key=key,
+                track_state=track_state,
             )
         )
 
-    def download(self, file: Union[bytes, io.BufferedIOBase], filename: str) -> None:
+    def download(self, file: FileSource, filename: str) -> None:
         """
         Download a file to the user's device.
 
@@ -232,8 +250,11 @@ class Page:
 
         Parameters
         ----------
-        file : `bytes` | `io.BufferedIOBase`
-            The file content to download.
+        file : `bytes` | `str` | `os.PathLike` | `io.IOBase` | `Iterable[bytes]` | `AsyncIterable[bytes]`
+            The file content to download. Strings are downloaded as UTF-8
+            text. Pass a path (e.g. a `pathlib.Path`), a binary file object,
+            or an (async) iterator of bytes to stream large files without
+            loading them into memory.
 
         filename : `str`
             The name to give the downloaded file.
@@ -244,6 +265,9 @@ class Page:
         ... content = "Hello World"
         ... bytes_content = content.encode("utf-8")
         ... page.download(bytes_content, "hello.txt")
+
+        >>> # Download a file from disk
+        ... page.download(pathlib.Path("/tmp/export.csv"), "export.csv")
         """
         if self.__debug:
             Debug.log("Page", f"download file ({filename})")
@@ -665,4 +689,4 @@ class Page:
         if self.__debug:
             Debug.log("Page", "update")
 
-        self.__state.merge({})
+        self.__state._update_all()
@@ -1,7 +1,11 @@
 # type: ignore
 
+import contextlib
 import copy
-from typing import Dict, Any, TYPE_CHECKING, Iterator, Union
+import functools
+import inspect
+from contextvars import ContextVar
+from typing import Dict, Any, TYPE_CHECKING, Iterator, Union, Set, Callable, Generator
 
 dict_key = str
 dict_value = Any
@@ -9,6 +13,22 @@ dict_value = Any
 if TYPE_CHECKING:
     from .appRunner import AppRunner
 
+# Recorded when a layout reads the entire state (e.g. by iterating over it),
+# or when the entire state changes (e.g. `state.overwrite()`).
+ALL_KEYS = object()
+
+# The set of keys read by the layout that is currently being generated, if any.
+_tracked_reads: ContextVar[Union[Set[Any], None]] = ContextVar(
+    "compose_tracked_state_reads", default=None
+)
+
+
+def _record_read(key: Any) -> None:
+    reads = _tracked_reads.get()
+
+    if reads is not None:
+        reads.add(key)
+
 
 class State:
     def __init__(self, appRunner: "AppRunner", initial_state: Union[dict, None] = None):
@@ -20,36 +40,101 @@ class State:
         self._debounce_interval = 1  # 1 millisecond
         self._debounced_update = None
 
-    def __onStateUpdate(self):
+        # Keys that changed since the last state update was dispatched.
+        self._changed_keys: Set[Any] = set()
+
+    def __onStateUpdate(self, keys):
+        self._changed_keys.update(keys)
+
         if self._debounced_update is not None:
             self._debounced_update.cancel()
 
         self._debounced_update = self.appRunner.scheduler.cancelable_delay(
             self._debounce_interval,
             lambda: self.appRunner.scheduler.run_async(
-                self.appRunner.on_state_update()
+                self.appRunner.on_state_update(self.__take_changed_keys())
             ),
         )
 
+    def __take_changed_keys(self) -> Set[Any]:
+        changed_keys = self._changed_keys
+        self._changed_keys = set()
+        return changed_keys
+
+    @staticmethod
+    def track_reads(layout: Callable[..., Any], reads: Set[Any]) -> Callable[..., Any]:
+        """
+        Wraps a layout function so that every state key it reads while it runs
+        is added to `reads`. The wrapper keeps the signature of the layout, and
+        can run on any thread.
+        """
+
+        @functools.wraps(layout)
+        def tracked_layout(*args, **kwargs):
+            token = _tracked_reads.set(reads)
+
+            try:
+                result = layout(*args, **kwargs)
+            finally:
+                _tracked_reads.reset(token)
+
+            # Reads of async layouts happen once the result is awaited, which
+            # may be outside of any tracked scope.
+            if inspect.isawaitable(result):
+                reads.add(ALL_KEYS)
+
+            return result
+
+        return tracked_layout
+
+    @staticmethod
+    @contextlib.contextmanager
+    def record_reads(reads: Union[Set[Any], None]) -> Generator[None, None, None]:
+        """
+        Adds every state key that's read in the current context to `reads`,
+        until the block exits. Coroutines that are awaited within the block
+        (e.g. the data of charts) are tracked too, unlike with `track_reads`.
+        Does nothing if `reads` is `None`.
+        """
+        if reads is None:
+            yield
+            return
+
+        token = _tracked_reads.set(reads)
+
+        try:
+            yield
+        finally:
+            _tracked_reads.reset(token)
+
     def __getitem__(self, key: dict_key) -> dict_value:
+        _record_read(key)
         return self._state[key]
 
     def __setitem__(self, key: dict_key, value: dict_value):
         self._state[key] = value
-        self.__onStateUpdate()
+        self.__onStateUpdate((key,))
 
     def overwrite(self, new_state: Dict[dict_key, dict_value]):
         self._state = new_state
-        self.__onStateUpdate()
+        self.__onStateUpdate((ALL_KEYS,))
 
     def merge(self, new_state: Dict[dict_key, dict_value]):
         self._state.update(new_state)
-        self.__onStateUpdate()
+        self.__onStateUpdate(new_state.keys())
+
+    def _update_all(self):
+        """
+        Re-renders every fragment, regardless of which keys they read.
+        """
+        self.__onStateUpdate((ALL_KEYS,))
 
     def __repr__(self):
+        _record_read(ALL_KEYS)
         return repr(self._state)
 
     def __eq__(self, other):
+        _record_read(ALL_KEYS)
         if isinstance(other, dict):
             return self._state == other
         elif isinstance(other, State):
@@ -57,12 +142,15 @@ class State:
         return False
 
     def __len__(self):
+        _record_read(ALL_KEYS)
         return len(self._state)
 
     def __iter__(self) -> Iterator[dict_key]:
+        _record_read(ALL_KEYS)
         return iter(self._state)
 
     def __contains__(self, item):
+        _record_read(item)
         return item in self._state
 
     def _cleanup(self):
@@ -70,13 +158,17 @@ class State:
             self._debounced_update.cancel()
 
     def keys(self):
+        _record_read(ALL_KEYS)
         return self._state.keys()
 
     def values(self):
+        _record_read(ALL_KEYS)
         return self._state.values()
 
     def items(self):
+        _record_read(ALL_KEYS)
         return self._state.items()
 
     def get(self, key, default=None):
+        _record_read(key)
         return self._state.get(key, default)
@@ -3,10 +3,25 @@
 from typing import Dict, List, Set, TypedDict, Union
 import importlib.metadata
 from .api import ApiHandler
+from .api.send_queue import (
+    DEFAULT_MAX_BYTES as DEFAULT_SEND_QUEUE_MAX_BYTES,
+    SendQueueMetrics,
+)
 from .scheduler import Scheduler
 from .app import AppDefinition, AppRunner, PageParams
 from .core import EventType, Debug, RateLimiter
+from .core.upload_store import (
+    DEFAULT_MEMORY_BUDGET_BYTES as DEFAULT_UPLOAD_MEMORY_BUDGET_BYTES,
+    DEFAULT_TTL_SECONDS as DEFAULT_UPLOAD_TTL_SECONDS,
+    UploadStore,
+)
+from .core.table_view_cache import (
+    DEFAULT_MEMORY_BUDGET_BYTES as DEFAULT_TABLE_VIEW_CACHE_MEMORY_BUDGET_BYTES,
+    TableViewCache,
+)
+from .event_dispatcher import EventDispatcher, EventDispatcherMetrics
 from .navigation import NavigationConfiguration
+from .worker_pool import WorkerApiHandler, WorkerPool, is_supported as workers_supported
 
 # get package version
 try:
@@ -114,6 +129,22 @@ class ComposeClient:
         debug: bool = False,
         DANGEROUS_ENABLE_DEV_MODE: bool = False,
         host: Union[str, None] = None,
+        concurrent_renders: bool = False,
+        hash_component_models: bool = False,
+        table_row_deltas: bool = False,
+        columnar_tables: bool = False,
+        workers: int = 1,
+        batch_window_ms: Union[float, None] = None,
+        send_queue_max_bytes: int = DEFAULT_SEND_QUEUE_MAX_BYTES,
+        send_queue_spill_dir: Union[str, None] = None,
+        payload_compression: bool = False,
+        chunk_size_bytes: Union[int, None] = None,
+        upload_memory_budget_bytes: int = DEFAULT_UPLOAD_MEMORY_BUDGET_BYTES,
+        upload_ttl_seconds: float = DEFAULT_UPLOAD_TTL_SECONDS,
+        upload_spill_dir: Union[str, None] = None,
+        table_view_cache_memory_budget_bytes: int = DEFAULT_TABLE_VIEW_CACHE_MEMORY_BUDGET_BYTES,
+        max_concurrent_executions: Union[int, None] = None,
+        max_event_hold_seconds: Union[float, None] = None,
     ):
         if api_key is None:  # type: ignore
             raise ValueError("Missing 'api_key' field in Compose.Client constructor")
@@ -144,6 +175,18 @@ class ComposeClient:
         self.api_key = api_key
         self.is_development = DANGEROUS_ENABLE_DEV_MODE
         self.debug = debug
+        self.concurrent_renders = concurrent_renders
+        self.hash_component_models = hash_component_models
+        self.table_row_deltas = table_row_deltas
+        self.columnar_tables = columnar_tables
+
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError("'workers' must be a positive integer")
+
+        if workers > 1 and not workers_supported():
+            raise ValueError(
+                "'workers' requires the fork start method, which is not available on this platform"
+            )
 
         unique_routes = get_unique_routes(apps)
         ensure_valid_parent_app_route(apps)
@@ -163,26 +206,116 @@ class ComposeClient:
             package_version,
             debug=self.debug,
             host=host,
+            batch_window_ms=batch_window_ms,
+            send_queue_max_bytes=send_queue_max_bytes,
+            send_queue_spill_dir=send_queue_spill_dir,
+            payload_compression=payload_compression,
+            chunk_size_bytes=chunk_size_bytes,
         )
         self.app_runners: Dict[str, AppRunner] = {}
         self.audit_log_rate_limiter = RateLimiter(MAX_AUDIT_LOGS_PER_MINUTE, 60000)
+        self.upload_store = UploadStore(
+            memory_budget_bytes=upload_memory_budget_bytes,
+            ttl_seconds=upload_ttl_seconds,
+            spill_dir=upload_spill_dir,
+        )
+        # Shared by every execution, so that the memory budget is per process.
+        self.table_view_cache = TableViewCache(
+            memory_budget_bytes=table_view_cache_memory_budget_bytes
+        )
+
+        self.max_concurrent_executions = max_concurrent_executions
+        self.max_event_hold_seconds = max_event_hold_seconds
+        self.event_dispatcher = EventDispatcher(
+            self.handle_browser_event,
+            max_concurrency=max_concurrent_executions,
+            max_hold_seconds=max_event_hold_seconds,
+        )
+
+        # In worker mode, the supervisor process only relays messages between
+        # the websocket and the workers, which run the apps.
+        self.worker_pool = (
+            WorkerPool(workers, self.__serve_worker) if workers > 1 else None
+        )
 
     def connect(self) -> None:
+        self.__start_workers()
         self.scheduler.init(True)
         self.__connect_ws()
 
     def connect_async(self) -> None:
+        self.__start_workers()
         self.scheduler.init(False)
         self.__connect_ws()
 
     def shutdown(self) -> None:
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+
         self.api.shutdown()
 
-    def __connect_ws(self) -> None:
-        self.api.add_listener(
-            "browser-listener",
-            lambda event: self.handle_browser_event(event),
+    def send_queue_metrics(self) -> SendQueueMetrics:
+        """
+        Returns the depth of the queue of messages waiting to be sent to the
+        Compose server, and how many messages were dropped from it.
+        """
+        return self.api.send_queue.metrics()
+
+    def event_dispatcher_metrics(self) -> EventDispatcherMetrics:
+        """
+        Returns the number of browser events waiting to be handled, and how
+        long they waited before being handled.
+        """
+        return self.event_dispatcher.metrics()
+
+    def __start_workers(self) -> None:
+        # Workers must be forked before the scheduler starts its threads.
+        if self.worker_pool is not None:
+            self.worker_pool.start()
+
+    def __serve_worker(self, conn) -> None:
+        """
+        Runs inside a worker process. Replaces the websocket connection with
+        the connection to the supervisor and handles browser events until
+        the supervisor shuts down.
+        """
+        self.worker_pool = None
+        self.scheduler = Scheduler()
+        self.scheduler.init(False)
+        self.api = WorkerApiHandler(conn, debug=self.debug)
+        self.app_runners = {}
+        self.event_dispatcher = EventDispatcher(
+            self.handle_browser_event,
+            max_concurrency=self.max_concurrent_executions,
+            max_hold_seconds=self.max_event_hold_seconds,
         )
+        # Rate limits are enforced per process.
+        self.audit_log_rate_limiter = RateLimiter(MAX_AUDIT_LOGS_PER_MINUTE, 60000)
+        self.scheduler.run_async(self.upload_store.expire_periodically())
+
+        try:
+            while True:
+                try:
+                    event = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                if event is None:
+                    break
+
+                self.scheduler.run_async(self.event_dispatcher.dispatch(event))
+        finally:
+            self.scheduler.shutdown()
+
+    def __connect_ws(self) -> None:
+        if self.worker_pool is not None:
+            for relay in self.worker_pool.relay(self.api.send_raw):
+                self.scheduler.run_async(relay)
+
+            self.api.add_listener("browser-listener", self.worker_pool.dispatch)
+        else:
+            self.api.add_listener("browser-listener", self.event_dispatcher.dispatch)
+            self.scheduler.run_async(self.upload_store.expire_periodically())
 
         self.api.connect(
             {
@@ -258,6 +391,12 @@ class ComposeClient:
 
             runner.on_file_transfer(event["fileId"], event["fileContents"])
 
+        elif event["type"] == EventType.SdkInternal.RESYNC_EXECUTION:
+            if self.debug:
+                Debug.log("Browser", "Resync execution after dropped messages")
+
+            await runner.resync()
+
         if event["type"] == EventType.ServerToSdk.ON_CLICK_HOOK:
             if self.debug:
                 Debug.log("Browser", f"click event (component: {event['componentId']})")
@@ -358,6 +497,12 @@ class ComposeClient:
             browser_session_id,
             debug=self.debug,
             audit_log_rate_limiter=self.audit_log_rate_limiter,
+            concurrent_renders=self.concurrent_renders,
+            hash_component_models=self.hash_component_models,
+            table_row_deltas=self.table_row_deltas,
+            columnar_tables=self.columnar_tables,
+            upload_store=self.upload_store,
+            table_view_cache=self.table_view_cache,
         )
 
         self.app_runners[execution_id] = runner
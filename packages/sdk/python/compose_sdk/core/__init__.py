@@ -51,6 +51,7 @@ from .ui import (
     TableDataRow,
     TablePageChangeArgs,
     TablePageChangeResponse,
+    TableCountArgs,
     TableDefault,
     TablePagination,
     Stale,
@@ -130,6 +131,7 @@ __all__ = [
     "TableDataRow",
     "TablePageChangeArgs",
     "TablePageChangeResponse",
+    "TableCountArgs",
     "TableDefault",
     "TablePagination",
     "TableState",
@@ -1,7 +1,15 @@
-from typing import Dict, Union
+import hashlib
+from typing import Any, Dict, Union
+from .json import JSON
 from .ui.types import TYPE
 from .ui.componentGenerators import ComponentReturn
 
+DIGEST_SIZE_BYTES = 16
+
+
+def digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE_BYTES).digest()
+
 
 class ComponentUpdateCache:
     """
@@ -12,10 +20,22 @@ class ComponentUpdateCache:
     1. Cache lookup instead of recomputing the stringified component state.
     2. Avoids update-by-reference bugs when underlying data objects that
        are used in the component state change, since the cache is stringified.
+
+    If `hash_models` is `True`, component models are stored as fixed-size
+    digests of their serialized bytes instead of the bytes themselves, so
+    that memory usage scales with the number of components rather than the
+    size of their data. Since digests are cheap to keep, diffs then cache
+    every leaf component, which avoids serializing the old layout again on
+    the next diff.
+
+    Row fingerprints of tables are stored separately, and are used to diff
+    tables row-by-row.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, *, hash_models: bool = False) -> None:
         self._cache: Dict[str, Union[str, bytes]] = {}
+        self._table_rows: Dict[str, Any] = {}
+        self.hash_models = hash_models
 
     def _generate_key(self, render_id: str, component_id: str) -> str:
         return f"{render_id}-{component_id}"
@@ -30,6 +50,14 @@ class ComponentUpdateCache:
         key = self._generate_key(render_id, component_id)
         if key in self._cache:
             del self._cache[key]
+        if key in self._table_rows:
+            del self._table_rows[key]
+
+    def get_table_rows(self, render_id: str, component_id: str) -> Any:
+        return self._table_rows.get(self._generate_key(render_id, component_id))
+
+    def set_table_rows(self, render_id: str, component_id: str, rows: Any) -> None:
+        self._table_rows[self._generate_key(render_id, component_id)] = rows
 
     def clear_render(self, render_id: str) -> None:
         """
@@ -39,8 +67,26 @@ class ComponentUpdateCache:
         for key in keys_to_delete:
             del self._cache[key]
 
+        keys_to_delete = [key for key in self._table_rows if key.startswith(render_id)]
+        for key in keys_to_delete:
+            del self._table_rows[key]
+
     def clear(self) -> None:
         self._cache.clear()
+        self._table_rows.clear()
+
+    def fingerprint(self, model: Dict[str, Any]) -> bytes:
+        """
+        Returns the value that's cached for a component model, which is
+        compared to determine whether the model changed. The component ID
+        is excluded.
+        """
+        model_bytes = JSON.to_bytes(JSON.remove_keys(model, ["id"]))
+
+        if self.hash_models:
+            return digest(model_bytes)
+
+        return model_bytes
 
     def should_cache(self, component: ComponentReturn) -> bool:
         """
@@ -3,6 +3,10 @@ from typing import Any, Dict, List, Union
 
 UNIQUE_PRIMARY_KEY_ID = "i"
 
+# Set as the `dataVersion` property of compressed tables whose data is encoded
+# as a map of column keys to column values, rather than a list of rows.
+TABLE_DATA_VERSION_COLUMNAR = 2
+
 
 def get_columns(table: ComponentReturn) -> Union[List[Any], Any]:
     columnsProperty = table["model"]["properties"]["columns"]
@@ -33,10 +37,14 @@ def get_columns(table: ComponentReturn) -> Union[List[Any], Any]:
 
 class Compress:
     @staticmethod
-    def table_layout(table: ComponentReturn) -> ComponentReturn:
+    def table_layout(table: ComponentReturn, columnar: bool = False) -> ComponentReturn:
         """
         Optimizes the table packet size by removing columns that are not needed
         by the client.
+
+        If `columnar` is `True`, the data is encoded as a map of column keys to
+        column values, so that keys aren't repeated on every row. Values that
+        are missing from a row are encoded as `None`.
         """
         columns = get_columns(table)
 
@@ -82,8 +90,34 @@ class Compress:
         # Pre-compute original and key mappings for better performance
         key_original_map = [(col["key"], col["original"]) for col in optimized_columns]
 
-        new_data: List[Dict[str, Any]] = []
         data = table["model"]["properties"]["data"]
+
+        if columnar:
+            if should_separately_assign_primary_key:
+                key_original_map.append((UNIQUE_PRIMARY_KEY_ID, original_primary_key))
+
+            return {
+                **table,
+                "model": {
+                    **table["model"],
+                    "properties": {
+                        **table["model"]["properties"],
+                        "data": {
+                            key: [row.get(original) for row in data]
+                            for key, original in key_original_map
+                        },
+                        "dataVersion": TABLE_DATA_VERSION_COLUMNAR,
+                        "columns": optimized_columns,
+                        "primaryKey": (
+                            None
+                            if original_primary_key is None
+                            else UNIQUE_PRIMARY_KEY_ID
+                        ),
+                    },
+                },
+            }
+
+        new_data: List[Dict[str, Any]] = []
         for row in data:
             new_row: Dict[str, Any] = {}
             for key, original in key_original_map:
@@ -111,15 +145,15 @@ class Compress:
         }
 
     @staticmethod
-    def ui_tree(layout: ComponentReturn) -> ComponentReturn:
+    def ui_tree(layout: ComponentReturn, columnar: bool = False) -> ComponentReturn:
         if layout["type"] == TYPE.INPUT_TABLE:
-            return Compress.table_layout(layout)
+            return Compress.table_layout(layout, columnar)
 
         if layout["interactionType"] == INTERACTION_TYPE.LAYOUT:
             new_children = (
-                [Compress.ui_tree(child) for child in layout["model"]["children"]]  # type: ignore[unused-ignore]
+                [Compress.ui_tree(child, columnar) for child in layout["model"]["children"]]  # type: ignore[unused-ignore]
                 if isinstance(layout["model"]["children"], list)
-                else Compress.ui_tree(layout["model"]["children"])
+                else Compress.ui_tree(layout["model"]["children"], columnar)
             )
 
             return {
@@ -135,9 +169,10 @@ class Compress:
     @staticmethod
     def ui_tree_without_recursion(
         layout: ComponentReturn,
+        columnar: bool = False,
     ) -> ComponentReturn:
         if layout["type"] == TYPE.INPUT_TABLE:
-            return Compress.table_layout(layout)
+            return Compress.table_layout(layout, columnar)
 
         if layout["interactionType"] == INTERACTION_TYPE.LAYOUT:
             return layout
@@ -0,0 +1,104 @@
+from typing import Any, Dict, Iterator, List, Sequence, Union, overload
+
+import numpy
+import pandas  # type: ignore[import-untyped]
+
+
+def get_column_values(series: pandas.Series) -> List[Any]:
+    """
+    Converts a column to Python values, replacing empty values (`None`, `NaN`
+    and `pandas.NA`) with empty strings. Datetime columns are returned as-is.
+    """
+    values: List[Any] = series.tolist()
+
+    # `NaT` in datetime columns is kept as-is.
+    if series.dtype.kind == "M":
+        return values
+
+    # NumPy integer and boolean columns can't contain empty values, unlike
+    # their nullable extension types.
+    if isinstance(series.dtype, numpy.dtype) and series.dtype.kind in "biu":
+        return values
+
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = values
+    mask = pandas.isna(array)
+
+    if not mask.any():
+        return values
+
+    array[mask] = ""
+    return array.tolist()  # type: ignore[no-any-return]
+
+
+def dataframe_to_records(df: pandas.DataFrame) -> List[Dict[Any, Any]]:
+    """
+    Converts a DataFrame to a list of rows, one column at a time, without
+    copying the DataFrame first.
+    """
+    keys = list(df.columns)
+    columns = [get_column_values(df.iloc[:, idx]) for idx in range(len(keys))]
+
+    return [dict(zip(keys, values)) for values in zip(*columns)]
+
+
+class DataFrameRows(Sequence[Dict[Any, Any]]):
+    """
+    A read-only sequence of table rows that's backed by a DataFrame.
+
+    Rows are converted to Python objects when they're accessed, so that
+    paginated tables only convert the rows of the current page and the
+    columns that are searched, filtered or sorted, instead of the entire
+    DataFrame.
+    """
+
+    def __init__(self, df: pandas.DataFrame):
+        self.df = df
+        self._columns: Dict[Any, numpy.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[Any, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Dict[Any, Any]]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[Dict[Any, Any], List[Dict[Any, Any]]]:
+        if isinstance(index, slice):
+            return dataframe_to_records(self.df.iloc[index])
+
+        if index < 0:
+            index += len(self.df)
+
+        if index < 0 or index >= len(self.df):
+            raise IndexError("DataFrameRows index out of range")
+
+        return dataframe_to_records(self.df.iloc[index : index + 1])[0]
+
+    def __iter__(self) -> Iterator[Dict[Any, Any]]:
+        return iter(self.tolist())
+
+    def take(self, indices: Sequence[int]) -> List[Dict[Any, Any]]:
+        return dataframe_to_records(self.df.iloc[list(indices)])
+
+    def column(self, key: Any) -> numpy.ndarray:
+        """
+        Returns the values of a column as an object array, or an array of
+        `None` if the column doesn't exist.
+        """
+        if key not in self._columns:
+            values = numpy.empty(len(self.df), dtype=object)
+
+            if key in self.df.columns:
+                values[:] = get_column_values(self.df[key])
+
+            self._columns[key] = values
+
+        return self._columns[key]
+
+    def tolist(self) -> List[Dict[Any, Any]]:
+        return dataframe_to_records(self.df)
@@ -40,6 +40,15 @@ class SDK_TO_SERVER_EVENT_TYPE:
     STALE_STATE_UPDATE_V2 = "bk"
     FILE_TRANSFER_V2 = "bl"
 
+    # several messages for the same execution, sent as one frame
+    BATCH = "bm"
+
+    # a message compressed with one of the codecs in `api/compression.py`
+    COMPRESSED = "bn"
+
+    # one fragment of a message that's too large for a single frame
+    CHUNK = "bo"
+
     # sdk to server ONLY events
     WRITE_AUDIT_LOG = "50"
 
@@ -83,6 +92,9 @@ SDK_TO_SERVER_EVENT_TYPE_TO_PRETTY = {
     "bj": "Table Page Change Response V2",
     "bk": "Stale State Update V2",
     "bl": "File Transfer V2",
+    "bm": "Batch",
+    "bn": "Compressed",
+    "bo": "Chunk",
     "50": "Write Audit Log",
 }
 
@@ -101,9 +113,19 @@ class SERVER_TO_SDK_EVENT_TYPE:
     BROWSER_SESSION_ENDED = "ak"
     ON_CLOSE_MODAL = "al"
     ON_TABLE_PAGE_CHANGE_HOOK = "am"
+    CHUNK = "an"
+
+
+# Events that are raised by the sdk itself and never sent over the wire.
+# Their types are longer than the 2 characters of wire event types, so they
+# can't collide with them.
+class SDK_INTERNAL_EVENT_TYPE:
+    # Raised when an execution lost messages while the sdk was disconnected.
+    RESYNC_EXECUTION = "resync_execution"
 
 
 class EventType:
     SdkToServer = SDK_TO_SERVER_EVENT_TYPE
     SdkToServerPretty = SDK_TO_SERVER_EVENT_TYPE_TO_PRETTY
     ServerToSdk = SERVER_TO_SDK_EVENT_TYPE
+    SdkInternal = SDK_INTERNAL_EVENT_TYPE
@@ -1,8 +1,161 @@
-from io import BytesIO
+import io
+from typing import IO, Union
 
+FileContent = Union[bytes, bytearray, memoryview, IO[bytes]]
 
-class File(BytesIO):
-    def __init__(self, content: bytes, file_name: str, file_type: str):
-        super().__init__(content)
+
+class File(io.BufferedIOBase):
+    """
+    A file uploaded by the user. Small uploads are read from memory without
+    copying them, while large uploads are read from disk.
+
+    Supports the methods of `io.BytesIO` (e.g. `getvalue()`, `getbuffer()`
+    and `write()`). An upload in memory is copied the first time it's
+    written to.
+    """
+
+    def __init__(self, content: FileContent, file_name: str, file_type: str):
+        super().__init__()
         self.name = file_name
         self.type = file_type
+
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            self._view: Union[memoryview, None] = memoryview(content)
+            self._stream: Union[IO[bytes], None] = None
+        else:
+            self._view = None
+            self._stream = content
+            self._stream.seek(0)
+
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: Union[int, None] = -1) -> bytes:
+        self._check_closed()
+
+        if self._stream is not None:
+            return self._stream.read(-1 if size is None else size)
+
+        assert self._view is not None
+        end = (
+            len(self._view)
+            if size is None or size < 0
+            else min(self._position + size, len(self._view))
+        )
+        data = bytes(self._view[self._position : end])
+        self._position = max(self._position, end)
+        return data
+
+    def read1(self, size: int = -1) -> bytes:
+        return self.read(size)
+
+    def readinto(self, buffer) -> int:  # type: ignore[no-untyped-def]
+        data = self.read(len(memoryview(buffer)))
+        memoryview(buffer)[: len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._check_closed()
+
+        if self._stream is not None:
+            return self._stream.seek(offset, whence)
+
+        assert self._view is not None
+
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+
+        if offset < 0:
+            raise ValueError(f"negative seek value {offset}")
+
+        self._position = offset
+        return self._position
+
+    def tell(self) -> int:
+        self._check_closed()
+
+        if self._stream is not None:
+            return self._stream.tell()
+
+        return self._position
+
+    def write(self, data) -> int:  # type: ignore[no-untyped-def]
+        self._check_closed()
+        return self._writable_stream().write(data)
+
+    def truncate(self, size: Union[int, None] = None) -> int:
+        self._check_closed()
+        return self._writable_stream().truncate(size)
+
+    def getbuffer(self) -> memoryview:
+        """
+        Returns a view of the entire content of the file. The view is
+        read-only if the upload is kept in memory and wasn't written to.
+        """
+        self._check_closed()
+
+        if isinstance(self._stream, io.BytesIO):
+            return self._stream.getbuffer()
+
+        if self._stream is not None:
+            return memoryview(self.getvalue())
+
+        assert self._view is not None
+        return self._view[:]
+
+    def getvalue(self) -> bytes:
+        """
+        Returns the entire content of the file, regardless of the current
+        position.
+        """
+        self._check_closed()
+
+        if self._stream is not None:
+            position = self._stream.tell()
+            self._stream.seek(0)
+            data = self._stream.read()
+            self._stream.seek(position)
+            return data
+
+        assert self._view is not None
+        return bytes(self._view)
+
+    def fileno(self) -> int:
+        if self._stream is not None:
+            return self._stream.fileno()
+
+        return super().fileno()
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+
+        if self._view is not None:
+            self._view.release()
+
+        super().close()
+
+    def _writable_stream(self) -> IO[bytes]:
+        # Uploads in memory may be shared, so they're copied before writing.
+        if self._stream is None:
+            assert self._view is not None
+            self._stream = io.BytesIO(self._view)
+            self._stream.seek(self._position)
+            self._view.release()
+            self._view = None
+
+        return self._stream
+
+    def _check_closed(self) -> None:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
@@ -0,0 +1,112 @@
+import asyncio
+import io
+import os
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Union,
+)
+
+DEFAULT_READ_SIZE_BYTES = 1024 * 1024
+
+FileSource = Union[
+    bytes,
+    bytearray,
+    memoryview,
+    str,
+    "os.PathLike[str]",
+    io.IOBase,
+    Iterable[bytes],
+    AsyncIterable[bytes],
+]
+
+FilePieces = Union[Iterator[Union[bytes, memoryview]], AsyncIterator[bytes]]
+
+
+async def aiter_file_object(file: Any, read_size: int) -> AsyncIterator[bytes]:
+    """
+    Reads a file object in pieces. Reads run in a worker thread, so that
+    slow disks don't block the event loop.
+    """
+    loop = asyncio.get_running_loop()
+
+    if file.seekable():
+        await loop.run_in_executor(None, file.seek, 0)
+
+    while True:
+        piece = await loop.run_in_executor(None, file.read, read_size)
+
+        if not piece:
+            return
+
+        yield piece
+
+
+async def aiter_path(path: "os.PathLike[str]", read_size: int) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    file = await loop.run_in_executor(None, open, path, "rb")
+
+    try:
+        async for piece in aiter_file_object(file, read_size):
+            yield piece
+    finally:
+        await loop.run_in_executor(None, file.close)
+
+
+def iter_file(file: FileSource, read_size: int = DEFAULT_READ_SIZE_BYTES) -> FilePieces:
+    """
+    Returns the content of a file as an iterator of pieces of at most
+    `read_size` bytes, so that it can be sent without reading the whole file
+    into memory. Bytes are returned as-is, and strings are encoded as UTF-8.
+    Paths and file objects are read by an async iterator in a worker thread.
+
+    Raises a `TypeError` if `file` isn't a supported file source.
+    """
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        return iter([memoryview(file)])
+
+    if isinstance(file, str):
+        return iter([file.encode("utf-8")])
+
+    if isinstance(file, os.PathLike):
+        return aiter_path(file, read_size)
+
+    if isinstance(file, io.IOBase) or hasattr(file, "read"):
+        return aiter_file_object(file, read_size)
+
+    if isinstance(file, AsyncIterable):
+        return file.__aiter__()
+
+    if isinstance(file, Iterable):
+        return iter(file)
+
+    raise TypeError(
+        "The 'file' argument must be bytes, a string, a file path "
+        "(os.PathLike), a binary file object (e.g. BytesIO or a file opened "
+        "with 'rb'), or an iterator or async iterator of bytes."
+    )
+
+
+async def aiter_pieces(pieces: FilePieces) -> AsyncIterator[Union[bytes, memoryview]]:
+    if isinstance(pieces, AsyncIterator):
+        async for async_piece in pieces:
+            yield async_piece
+    else:
+        for piece in pieces:
+            yield piece
+
+
+async def join_pieces(header: bytes, pieces: FilePieces) -> bytearray:
+    """
+    Copies `header` and `pieces` into a single buffer, which is the only
+    copy of the content that's made.
+    """
+    message = bytearray(header)
+
+    async for piece in aiter_pieces(pieces):
+        message += piece
+
+    return message
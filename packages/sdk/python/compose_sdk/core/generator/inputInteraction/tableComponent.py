@@ -20,6 +20,8 @@ from ...ui import (
     TABLE_COLUMN_OVERFLOW,
     Table,
 )
+from ...dataframe_rows import DataFrameRows, dataframe_to_records
+from ...table_sql import SqlTableSource
 from ..base import MULTI_SELECTION_MIN_DEFAULT, MULTI_SELECTION_MAX_DEFAULT
 
 
@@ -98,13 +100,7 @@ def camel_case_and_add_key_to_views(
     return return_views
 
 
-def get_searchable(
-    searchable: Union[bool, None], manually_paged: bool, auto_paged: bool
-) -> bool:
-    # If auto-paginated, then it is never searchable.
-    if auto_paged:
-        return False
-
+def get_searchable(searchable: Union[bool, None], manually_paged: bool) -> bool:
     # If manually paged, then it is searchable only if explicitly set to true.
     if manually_paged:
         if searchable is True:
@@ -112,21 +108,19 @@ def get_searchable(
 
         return False
 
-    # If not paged and explicitly set, then use the explicitly set value.
+    # Auto-paginated tables are searched by the SDK's query engine, so they
+    # share the defaults of normal tables. If explicitly set, then use the
+    # explicitly set value.
     if searchable is not None:
         return searchable
 
-    # Otherwise, if not paged, the table is default searchable.
+    # Otherwise, the table is default searchable.
     return True
 
 
 def get_sortable(
-    sortable: Union[Table.SortOption.TYPE, None], manually_paged: bool, auto_paged: bool
+    sortable: Union[Table.SortOption.TYPE, None], manually_paged: bool
 ) -> Table.SortOption.TYPE:
-    # If auto-paginated, then it is never sortable.
-    if auto_paged:
-        return Table.SortOption.DISABLED
-
     # If manually paged, then it is sortable only if explicitly set.
     if manually_paged:
         if sortable is None:
@@ -134,21 +128,17 @@ def get_sortable(
 
         return sortable
 
-    # If not paged and explicitly set, then use the explicitly set value.
+    # Auto-paginated tables are sorted by the SDK's query engine, so they
+    # share the defaults of normal tables. If explicitly set, then use the
+    # explicitly set value.
     if sortable is not None:
         return sortable
 
-    # Otherwise, if not paged, the table is default multi-column sortable.
+    # Otherwise, the table is default multi-column sortable.
     return Table.SortOption.MULTI
 
 
-def get_filterable(
-    filterable: Union[bool, None], manually_paged: bool, auto_paged: bool
-) -> bool:
-    # If auto-paginated, then it is never filterable.
-    if auto_paged:
-        return False
-
+def get_filterable(filterable: Union[bool, None], manually_paged: bool) -> bool:
     # If manually paged, then it is filterable only if explicitly set.
     if manually_paged:
         if filterable is True:
@@ -156,7 +146,9 @@ def get_filterable(
 
         return False
 
-    # In the normal case, the table is filterable unless explicitly set to false.
+    # In the normal case (including auto-paginated tables, which are filtered
+    # by the SDK's query engine), the table is filterable unless explicitly
+    # set to false.
     if filterable is False:
         return False
 
@@ -224,7 +216,9 @@ def warn_about_select_mode(
 
 def _table(
     id: str,
-    data: Union[TableData, Table.OnPageChangeSync, Table.OnPageChangeAsync],
+    data: Union[
+        TableData, Table.OnPageChangeSync, Table.OnPageChangeAsync, SqlTableSource
+    ],
     *,
     label: Union[str, None] = None,
     required: bool = True,
@@ -250,6 +244,10 @@ def _table(
     filterable: Union[bool, None] = None,
     views: Union[List[Table.View], None] = None,
     primary_key: Union[Table.DataKey, None] = None,
+    prefetch: bool = False,
+    count: Union[Table.OnCountSync, Table.OnCountAsync, None] = None,
+    depends_on: Union[Sequence[str], None] = None,
+    deps: Union[Sequence[Any], None] = None,
 ) -> ComponentReturn:
 
     if not isinstance(initial_selected_rows, list):
@@ -265,7 +263,18 @@ def _table(
             f"{type(initial_selected_rows).__name__}"
         )
 
-    if not isinstance(data, list) and not isinstance(data, Callable):
+    # The view of the table is pushed down to the database as a page change
+    # function.
+    sql_source = isinstance(data, SqlTableSource)
+
+    if sql_source:
+        data = data.page
+
+    if (
+        not isinstance(data, list)
+        and not isinstance(data, DataFrameRows)
+        and not isinstance(data, Callable)
+    ):
         raise ValueError(
             f"data must be a list for table component or a function for table with pagination, got {type(data).__name__}"
         )
@@ -294,19 +303,23 @@ def _table(
         "v": 3,
     }
 
+    # Tables of SQL sources use the defaults of tables that are paged by the
+    # SDK, since the view is pushed down to the database.
+    views_disabled_by_default = manually_paged and not sql_source
+
     # Only set `notSearchable` if the table is not searchable.
-    if get_searchable(searchable, manually_paged, auto_paged) is False:
+    if get_searchable(searchable, views_disabled_by_default) is False:
         model_properties["notSearchable"] = True
 
     # Only set `sortable` if the table is not multi-column sortable.
-    sortable = get_sortable(sortable, manually_paged, auto_paged)
+    sortable = get_sortable(sortable, views_disabled_by_default)
     if sortable != Table.SortOption.MULTI:
         model_properties["sortable"] = sortable
 
     if primary_key is not None:
         model_properties["primaryKey"] = primary_key
 
-    filterable = get_filterable(filterable, manually_paged, auto_paged)
+    filterable = get_filterable(filterable, views_disabled_by_default)
     if filterable is False:
         model_properties["filterable"] = False
 
@@ -320,6 +333,10 @@ def _table(
         {
             "fn": data,
             "type": TablePagination.MANUAL,
+            "prefetch": prefetch,
+            "count": count,
+            "depends_on": depends_on,
+            "deps": deps,
         }
         if manually_paged
         else (
@@ -371,7 +388,9 @@ def _table(
 
 def table(
     id: str,
-    data: Union[TableData, Table.OnPageChangeSync, Table.OnPageChangeAsync],
+    data: Union[
+        TableData, Table.OnPageChangeSync, Table.OnPageChangeAsync, SqlTableSource
+    ],
     *,
     columns: Union[TableColumns, None] = None,
     actions: Union[TableActions, None] = None,
@@ -401,6 +420,10 @@ def table(
     filterable: Union[bool, None] = None,
     views: Union[Sequence[Table.View], None] = None,
     primary_key: Union[Table.DataKey, None] = None,
+    prefetch: bool = False,
+    count: Union[Table.OnCountSync, Table.OnCountAsync, None] = None,
+    depends_on: Union[Sequence[str], None] = None,
+    deps: Union[Sequence[Any], None] = None,
 ) -> ComponentReturn:
     """A powerful and highly customizable table component. For example:
 
@@ -434,6 +457,8 @@ def table(
     #### data : `List[Dict[str, Any]]`
         Data to be displayed in the table. Should be a list of dictionaries, where each dictionary represents a row in the table.
 
+        Alternatively, pass a `SqlTableSource` to page, search, filter and sort the table in a SQL database.
+
     #### columns : `List[TableColumns]`. Optional.
         Manually specify the columns to be displayed in the table. Each item in the list should be either a string that maps to a key in the data, or a dictionary with at least a `key` field and other optional fields. Learn more in the [docs](https://docs.composehq.com/components/input/table#columns).
 
@@ -480,7 +505,7 @@ def table(
         Whether to return a list of rows, or a list of row ids to callbacks like `on_change` and `on_submit`. Defaults to `full`. Must be `id` if the table is paginated.
 
     #### searchable : `bool`. Optional.
-        Whether to enable the table search bar. Defaults to `True` for normal tables, `False` for paginated tables.
+        Whether to enable the table search bar. Defaults to `True` for normal, auto-paginated and `SqlTableSource` tables, `False` for tables paginated with a page change function.
 
     #### paginate : `bool`. Optional.
         Whether to paginate the table. Defaults to `False`. Tables with more than 2500 rows will be paginated by default.
@@ -492,10 +517,10 @@ def table(
         - `"single"`: Allow single-column sorting.
         - `False`: Disable sorting.
 
-        Defaults to `True` for normal tables, `False` for paginated tables.
+        Defaults to `True` for normal, auto-paginated and `SqlTableSource` tables, `False` for tables paginated with a page change function.
 
     #### filterable : `bool`. Optional.
-        Whether to allow filtering. Defaults to `True` for normal tables, `False` for paginated tables.
+        Whether to allow filtering. Defaults to `True` for normal, auto-paginated and `SqlTableSource` tables, `False` for tables paginated with a page change function.
 
     #### selectable : `bool`. Optional.
         Whether to allow row selection. Defaults to `False`, or `True` if `on_change` is provided.
@@ -515,6 +540,18 @@ def table(
     #### views : `List[Table.View]`. Optional.
         A list of preset views that can be used to filter, sort, and search the table. Each view is a dictionary with at least a `label` field and other optional fields. Learn more in the [docs](https://docs.composehq.com/components/input/table#views).
 
+    #### prefetch : `bool`. Optional.
+        Whether to cache the pages of a table paginated with a page change function, and fetch the pages before and after the current page in the background. Revisiting a page, or moving to an adjacent one, is then served without calling the page change function. Cached pages are dropped when the search, sort or filter changes, or when the table is refreshed. Defaults to `False`.
+
+    #### count : `Callable[[TableCountArgs], int]`. Optional.
+        A function that returns the total number of records for a search query and filter, for tables paginated with a page change function. When set, pages are sent as soon as the page change function returns them, without waiting for the total. The count runs in the background and is sent once it's done, and counts are cached per search query and filter until the table is refreshed. The page change function no longer needs to return `total_records`.
+
+    #### depends_on : `List[str]`. Optional.
+        The state keys that the page change function reads. By default, tables paginated with a page change function are refreshed on every state update. When set, the table is only refreshed when one of these keys changes.
+
+    #### deps : `List[Any]`. Optional.
+        Values that the page change function depends on, e.g. `[state["customer_id"]]`. When set, the table is only refreshed when one of the values differs from the previous render. Can be combined with `depends_on`, in which case a change in either refreshes the table.
+
     ## Returns
     The configured table component.
     """
@@ -549,6 +586,10 @@ def table(
         filterable=filterable,
         views=views,
         primary_key=primary_key,
+        prefetch=prefetch,
+        count=count,
+        depends_on=depends_on,
+        deps=deps,
     )
 
 
@@ -592,14 +633,17 @@ def dataframe(
             DeprecationWarning,
         )
 
-    # Replace empty values in the dataframe with None
-    df = df.replace({None: "", pandas.NA: "", float("nan"): ""})
-
     # Create the "columns" array
     columns: TableColumns = [{"key": col, "label": col} for col in df.columns]
 
-    # Create the "table" array
-    table: TableData = df.to_dict(orient="records")  # type: ignore
+    # Paginated tables only need the rows of the current page, so keep the
+    # dataframe as the backing store instead of converting every row. Empty
+    # values are replaced with empty strings as rows are converted.
+    table: TableData = (
+        DataFrameRows(df)
+        if paginate is True or len(df) > TableDefault.PAGINATION_THRESHOLD
+        else dataframe_to_records(df)
+    )
 
     return _table(
         id,
@@ -6,6 +6,8 @@ from pathlib import Path
 from enum import Enum
 from typing import Any, Dict, Union, List, Callable
 
+from .dataframe_rows import DataFrameRows
+
 Json = Union[
     Dict[Any, Any],
     List[Any],
@@ -38,6 +40,8 @@ class JSON:
             return float(obj)
         if isinstance(obj, (Path, Enum)):
             return str(obj)
+        if isinstance(obj, DataFrameRows):
+            return obj.tolist()
         if callable(obj):
             return None
         return "$$COULD_NOT_SERIALIZE$$"
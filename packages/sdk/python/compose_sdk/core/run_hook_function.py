@@ -46,7 +46,7 @@ class RunHookFunction:
             if inspect.iscoroutinefunction(hook_function):
                 return await hook_function(*arguments)
             else:
-                return self.scheduler.run_sync(hook_function, *arguments)
+                return await self.scheduler.run_sync_async(hook_function, *arguments)
 
         param_count = len(inspect.signature(hook_function).parameters)
         num_args = len(args)
@@ -0,0 +1,96 @@
+from typing import Dict, List, Tuple, Union
+
+from ..ui import INTERACTION_TYPE, TYPE, ComponentReturn
+
+
+class ComponentIndex:
+    """
+    Maps the IDs of the components in a static layout to the components
+    themselves, their parent layout, and the form they're nested in.
+
+    Lookups match `FindComponent.by_id`: if multiple components share an ID,
+    the first one in depth-first order is returned.
+    """
+
+    def __init__(self) -> None:
+        self.components: Dict[str, ComponentReturn] = {}
+        self.parent_ids: Dict[str, Union[str, None]] = {}
+        self.form_ids: Dict[str, Union[str, None]] = {}
+
+    def add(
+        self,
+        component: ComponentReturn,
+        parent_id: Union[str, None],
+        form_id: Union[str, None],
+    ) -> None:
+        component_id = component["model"]["id"]
+
+        if component_id in self.components:
+            return
+
+        self.components[component_id] = component
+        self.parent_ids[component_id] = parent_id
+        self.form_ids[component_id] = form_id
+
+    def get(self, component_id: str) -> Union[ComponentReturn, None]:
+        return self.components.get(component_id)
+
+    def get_parent(self, component_id: str) -> Union[ComponentReturn, None]:
+        parent_id = self.parent_ids.get(component_id)
+
+        if parent_id is None:
+            return None
+
+        return self.components.get(parent_id)
+
+    def get_form_id(self, component_id: str) -> Union[str, None]:
+        """
+        Returns the ID of the form that the component is nested in. Forms are
+        considered to be nested in themselves.
+        """
+        return self.form_ids.get(component_id)
+
+    def __contains__(self, component_id: str) -> bool:
+        return component_id in self.components
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    @staticmethod
+    def get_child_form_id(
+        component: ComponentReturn, form_id: Union[str, None]
+    ) -> Union[str, None]:
+        """
+        Returns the form ID to use for the children (and the component itself)
+        of a component nested in the given form.
+        """
+        if component["type"] == TYPE.LAYOUT_FORM:
+            return component["model"]["id"]  # type: ignore[no-any-return]
+
+        return form_id
+
+    @staticmethod
+    def build(static_layout: ComponentReturn) -> "ComponentIndex":
+        index = ComponentIndex()
+        stack: List[Tuple[ComponentReturn, Union[str, None], Union[str, None]]] = [
+            (static_layout, None, None)
+        ]
+
+        while len(stack) > 0:
+            component, parent_id, parent_form_id = stack.pop()
+            form_id = ComponentIndex.get_child_form_id(component, parent_form_id)
+
+            index.add(component, parent_id, form_id)
+
+            if component["interactionType"] == INTERACTION_TYPE.LAYOUT:
+                children = (
+                    component["model"]["children"]
+                    if isinstance(component["model"]["children"], list)
+                    else [component["model"]["children"]]
+                )
+
+                # Push in reverse so that children are visited in order.
+                for child in reversed(children):
+                    stack.append((child, component["model"]["id"], form_id))
+
+        return index
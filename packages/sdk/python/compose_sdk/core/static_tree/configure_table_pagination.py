@@ -1,7 +1,7 @@
-from typing import Any, List, Union, Literal
+from typing import Any, Dict, List, Set, Union, Literal
 
 from ..ui import TYPE, ComponentReturn, TableDefault, TablePagination, Stale, Table
-from ..table_state import TableState
+from ..table_state import TableState, inputs_did_change
 from .find_component import FindComponent  # type: ignore[attr-defined]
 
 FALLBACK_VIEW: Table.PaginationView = {
@@ -69,19 +69,12 @@ def get_default_view(
 
 
 def configure_table_pagination(
-    layout: ComponentReturn, render_id: str, table_state: TableState
+    layout: ComponentReturn,
+    render_id: str,
+    table_state: TableState,
+    changed_keys: Union[Set[Any], None] = None,
 ) -> ComponentReturn:
-    def count_condition(component: ComponentReturn) -> bool:
-        return (
-            component["type"] == TYPE.INPUT_TABLE
-            and component["hooks"]["onPageChange"] is not None
-        )
-
-    count = FindComponent.count_by_condition(layout, count_condition)
-
-    if count == 0:
-        table_state.delete_for_render_id(render_id)
-        return layout
+    has_paginated_table = False
 
     def edit_condition(
         component: ComponentReturn,
@@ -96,6 +89,9 @@ def configure_table_pagination(
                 table_state.delete(render_id, component["model"]["id"])
             return False
 
+        nonlocal has_paginated_table
+        has_paginated_table = True
+
         searchable = (
             False
             if component["model"]["properties"].get("notSearchable", None) == True
@@ -127,14 +123,22 @@ def configure_table_pagination(
                     else len(current_state["data"])
                 )
 
-                table_state.update(
-                    render_id,
-                    component["model"]["id"],
-                    {
-                        "stale": Stale.UPDATE_NOT_DISABLED,
-                        "initial_view": default_view,
-                    },
-                )
+                # Only refresh tables whose inputs changed, so that their
+                # cached pages and counts are kept otherwise.
+                update: Dict[str, Any] = {
+                    "initial_view": default_view,
+                    "deps": component["hooks"]["onPageChange"].get("deps"),
+                }
+
+                if inputs_did_change(
+                    component["hooks"]["onPageChange"],
+                    current_state,
+                    default_view,
+                    changed_keys,
+                ):
+                    update["stale"] = Stale.UPDATE_NOT_DISABLED
+
+                table_state.update(render_id, component["model"]["id"], update)
             else:
                 data = []
                 total_records = len(data)
@@ -149,32 +153,51 @@ def configure_table_pagination(
                         "total_records": None,
                         "stale": "INITIALLY_STALE",
                         "initial_view": default_view,
+                        "deps": component["hooks"]["onPageChange"].get("deps"),
                     },
                 )
         else:
-            all_rows = component["hooks"]["onPageChange"]["fn"]()
-            data = all_rows[offset : offset + page_size]
-            total_records = len(all_rows)
-
-            if not current_state:
+            if current_state:
+                table_state.update(
+                    render_id,
+                    component["model"]["id"],
+                    {"initial_view": default_view},
+                )
+            else:
                 table_state.add(
                     render_id,
                     component["model"]["id"],
                     {
-                        "data": data,
+                        "data": [],
                         "offset": offset,
                         "page_size": page_size,
-                        "total_records": total_records,
+                        "total_records": None,
                         "stale": False,
                         "initial_view": default_view,
                     },
                 )
-            else:
-                table_state.update(
-                    render_id,
-                    component["model"]["id"],
-                    {"initial_view": default_view},
-                )
+
+            # Apply the active view (which may have been reset by the initial
+            # view above) to the full dataset. If the table was re-rendered
+            # with a new data reference, the cached views for the table are
+            # invalidated here.
+            record = table_state.get(render_id, component["model"]["id"])
+            active_view = record["active_view"] if record else default_view
+            data, total_records = table_state.get_page(
+                render_id,
+                component["model"]["id"],
+                component["hooks"]["onPageChange"]["fn"](),
+                active_view,
+                offset,
+                page_size,
+                component["model"]["properties"]["columns"],
+            )
+
+            table_state.update(
+                render_id,
+                component["model"]["id"],
+                {"data": data, "total_records": total_records},
+            )
 
         # Set these at the end to ensure they are working with the most recent
         # active view. In some cases, the active view will be overriden when
@@ -218,4 +241,9 @@ def configure_table_pagination(
             },
         }
 
-    return FindComponent.edit_by_condition(layout, edit_condition)  # type: ignore[no-any-return]
+    edited_layout = FindComponent.edit_by_condition(layout, edit_condition)
+
+    if not has_paginated_table:
+        table_state.delete_for_render_id(render_id)
+
+    return edited_layout  # type: ignore[no-any-return]
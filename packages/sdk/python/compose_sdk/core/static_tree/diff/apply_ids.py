@@ -1,16 +1,41 @@
+from typing import Union
+
 from ...ui import ComponentReturn, INTERACTION_TYPE
+from ..component_index import ComponentIndex
 
 
-def apply_ids(layout: ComponentReturn, id_map: dict[str, str]) -> ComponentReturn:
+def apply_ids(
+    layout: ComponentReturn,
+    id_map: dict[str, str],
+    index: Union[ComponentIndex, None] = None,
+    parent_id: Union[str, None] = None,
+    parent_form_id: Union[str, None] = None,
+) -> ComponentReturn:
+    """
+    Applies the old IDs onto the new layout. If an index is provided, the
+    components are added to it while the layout is traversed.
+    """
     if layout["model"]["id"] in id_map:
         layout["model"]["id"] = id_map[layout["model"]["id"]]
 
+    form_id = ComponentIndex.get_child_form_id(layout, parent_form_id)
+
+    if index is not None:
+        index.add(layout, parent_id, form_id)
+
     if layout["interactionType"] == INTERACTION_TYPE.LAYOUT:
         if isinstance(layout["model"]["children"], list):
             layout["model"]["children"] = [
-                apply_ids(child, id_map) for child in layout["model"]["children"]
+                apply_ids(child, id_map, index, layout["model"]["id"], form_id)
+                for child in layout["model"]["children"]
             ]
         else:
-            layout["model"]["children"] = apply_ids(layout["model"]["children"], id_map)
+            layout["model"]["children"] = apply_ids(
+                layout["model"]["children"],
+                id_map,
+                index,
+                layout["model"]["id"],
+                form_id,
+            )
 
     return layout
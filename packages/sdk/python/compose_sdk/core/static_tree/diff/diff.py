@@ -1,14 +1,22 @@
 # type: ignore
 
-from typing import TypedDict, List
+from typing import TypedDict, List, Union
 
 from ...json import JSON
 from ...ui import ComponentReturn, is_interactive_component, INTERACTION_TYPE, TYPE
 from ...compress import Compress
 from ...component_update_cache import ComponentUpdateCache
 
+from ..component_index import ComponentIndex
 from .apply_ids import apply_ids
 from .metadata import get_component_metadata
+from .table_delta import (
+    TableDelta,
+    diff_table_rows,
+    get_compressed_rows,
+    get_table_rows,
+    supports_table_delta,
+)
 
 
 class DiffMap(TypedDict):
@@ -16,6 +24,7 @@ class DiffMap(TypedDict):
     add: dict[str, ComponentReturn]
     update: dict[str, ComponentReturn]
     id_map: dict[str, str]
+    table_deltas: dict[str, TableDelta]
 
 
 def interactive_component_id_changed(
@@ -32,6 +41,8 @@ def diff_static_layouts_recursive(
     new_layout: ComponentReturn,
     render_id: str,
     cache: ComponentUpdateCache,
+    table_delta_ratio: Union[float, None],
+    columnar_tables: bool,
 ) -> DiffMap:
     # Option 1: The component has changed entirely. In this case,
     # delete the old component and add the new component.
@@ -39,13 +50,14 @@ def diff_static_layouts_recursive(
     if old_layout["type"] != new_layout["type"] or (
         interactive_id_changed and old_layout["type"] != TYPE.BUTTON_FORM_SUBMIT
     ):
-        compressed = Compress.ui_tree(new_layout)
+        compressed = Compress.ui_tree(new_layout, columnar_tables)
 
         return {
             "delete": [old_layout["model"]["id"]],
             "add": {new_layout["model"]["id"]: compressed},
             "update": {},
             "id_map": {},
+            "table_deltas": {},
         }
 
     # Option 2: The components are the same and not layout types, meaning
@@ -58,24 +70,76 @@ def diff_static_layouts_recursive(
         old_layout["interactionType"] != INTERACTION_TYPE.LAYOUT
         or new_layout["interactionType"] != INTERACTION_TYPE.LAYOUT
     ):
-        old_model_bytes: Union[bytes, None] = cache.get(
+        old_fingerprint: Union[bytes, None] = cache.get(
             render_id, old_layout["model"]["id"]
         )
 
-        if old_model_bytes is None:
-            old_model_to_compare = JSON.remove_keys(old_layout["model"], ["id"])
-            old_model_bytes = JSON.to_bytes(old_model_to_compare)
+        diff_rows = (
+            table_delta_ratio is not None
+            and new_layout["type"] == TYPE.INPUT_TABLE
+            and supports_table_delta(new_layout)
+        )
+
+        old_table_rows = (
+            cache.get_table_rows(render_id, old_layout["model"]["id"])
+            if diff_rows
+            else None
+        )
+
+        if old_fingerprint is None:
+            old_fingerprint = cache.fingerprint(old_layout["model"])
 
-        new_model_to_compare = JSON.remove_keys(new_layout["model"], ["id"])
-        new_model_bytes = JSON.to_bytes(new_model_to_compare)
+        new_fingerprint = cache.fingerprint(new_layout["model"])
 
-        # Always update cache
+        # Always update cache. The new component keeps the old ID once the
+        # IDs are applied, so cache it under the old ID.
         cache.delete(render_id, old_layout["model"]["id"])
-        if cache.should_cache(new_layout):
-            cache.set(render_id, new_layout["model"]["id"], new_model_bytes)
+        if cache.hash_models or cache.should_cache(new_layout):
+            cache.set(render_id, old_layout["model"]["id"], new_fingerprint)
+
+        if old_fingerprint != new_fingerprint:
+            compressed = Compress.ui_tree(new_layout, columnar_tables)
+
+            # Tables whose rows were fingerprinted in a previous diff can be
+            # updated row-by-row instead of being replaced in full.
+            if diff_rows:
+                new_data = get_compressed_rows(compressed)
+                new_table_rows = get_table_rows(compressed, new_data)
+
+                if new_table_rows is not None:
+                    cache.set_table_rows(
+                        render_id, old_layout["model"]["id"], new_table_rows
+                    )
+
+                if old_table_rows is not None and new_table_rows is not None:
+                    delta = diff_table_rows(
+                        old_table_rows,
+                        new_table_rows,
+                        new_data,
+                        table_delta_ratio,
+                    )
+
+                    if delta is not None:
+                        has_changes = (
+                            len(delta["delete"]) > 0
+                            or len(delta["insert"]) > 0
+                            or len(delta["update"]) > 0
+                        )
+
+                        return {
+                            "delete": [],
+                            "add": {},
+                            "update": {},
+                            "id_map": {
+                                new_layout["model"]["id"]: old_layout["model"]["id"]
+                            },
+                            "table_deltas": (
+                                {old_layout["model"]["id"]: delta}
+                                if has_changes
+                                else {}
+                            ),
+                        }
 
-        if old_model_bytes != new_model_bytes:
-            compressed = Compress.ui_tree(new_layout)
             compressed_model = JSON.remove_keys(compressed["model"], ["id"])
 
             return {
@@ -83,13 +147,20 @@ def diff_static_layouts_recursive(
                 "add": {},
                 "update": {old_layout["model"]["id"]: compressed_model},  # type: ignore
                 "id_map": {new_layout["model"]["id"]: old_layout["model"]["id"]},
+                "table_deltas": {},
             }
         else:
+            if old_table_rows is not None:
+                cache.set_table_rows(
+                    render_id, old_layout["model"]["id"], old_table_rows
+                )
+
             return {
                 "delete": [],
                 "add": {},
                 "update": {},
                 "id_map": {new_layout["model"]["id"]: old_layout["model"]["id"]},
+                "table_deltas": {},
             }
 
     # Option 3: The components are the same and are layout types, meaning
@@ -98,6 +169,7 @@ def diff_static_layouts_recursive(
     update_obj: dict[str, dict] = {}
     add_obj: dict[str, ComponentReturn] = {}
     delete_arr: List[str] = []
+    table_deltas: dict[str, TableDelta] = {}
 
     # We'll start by iterating through the children.
     old_children = (
@@ -129,7 +201,12 @@ def diff_static_layouts_recursive(
         # If both children exist, we'll compare them recursively.
         if old_child is not None and new_child is not None:
             child_diff = diff_static_layouts_recursive(
-                old_child, new_child, render_id, cache
+                old_child,
+                new_child,
+                render_id,
+                cache,
+                table_delta_ratio,
+                columnar_tables,
             )
 
             if new_child["model"]["id"] in child_diff["add"]:
@@ -141,6 +218,7 @@ def diff_static_layouts_recursive(
             add_obj = {**add_obj, **child_diff["add"]}
             delete_arr = [*delete_arr, *child_diff["delete"]]
             id_map = {**id_map, **child_diff["id_map"]}
+            table_deltas = {**table_deltas, **child_diff["table_deltas"]}
 
         # If the old child doesn't exist but the new child does, we'll add the new child.
         if old_child is None and new_child is not None:
@@ -160,7 +238,7 @@ def diff_static_layouts_recursive(
     new_model = JSON.remove_keys(new_layout["model"], ["id", "children"])
 
     if JSON.to_bytes(old_model) != JSON.to_bytes(new_model) or children_did_change:
-        compressed = Compress.ui_tree_without_recursion(new_layout)
+        compressed = Compress.ui_tree_without_recursion(new_layout, columnar_tables)
         compressed_model = JSON.remove_keys(compressed["model"], ["id", "children"])
 
         update_obj[old_layout["model"]["id"]] = {
@@ -175,6 +253,7 @@ def diff_static_layouts_recursive(
         "add": add_obj,
         "update": update_obj,  # type: ignore
         "id_map": id_map,
+        "table_deltas": table_deltas,
     }
 
 
@@ -183,25 +262,45 @@ def diff_static_layouts(
     new_layout: ComponentReturn,
     render_id: str,
     cache: ComponentUpdateCache,
+    table_delta_ratio: Union[float, None] = None,
+    columnar_tables: bool = False,
 ):
     """
     Diff two static layouts.
 
+    If `table_delta_ratio` is set, changed tables are diffed row-by-row and
+    returned in `table_deltas` instead of `update`, unless the ratio of
+    changed rows exceeds it.
+
+    If `columnar_tables` is `True`, compressed tables use the columnar data
+    encoding.
+
     NOTE: The deleted IDs covers the branches of the layout that have been
     deleted, but does not exhaustively list all the IDs that need to be deleted.
     For example, if an entire stack is deleted, then only the root stack ID is
     included in the `delete` array. It is up to the client to delete any
     stranded leaf nodes as a result of a deleted branch.
     """
-    diff = diff_static_layouts_recursive(old_layout, new_layout, render_id, cache)
+    diff = diff_static_layouts_recursive(
+        old_layout,
+        new_layout,
+        render_id,
+        cache,
+        table_delta_ratio,
+        columnar_tables,
+    )
 
-    new_layout_with_ids_applied = apply_ids(new_layout, diff["id_map"])
+    index = ComponentIndex()
+    new_layout_with_ids_applied = apply_ids(new_layout, diff["id_map"], index)
     root_id = new_layout_with_ids_applied["model"]["id"]
 
-    metadata = get_component_metadata(new_layout_with_ids_applied)
+    metadata = get_component_metadata(index)
 
     is_empty = (
-        len(diff["delete"]) == 0 and len(diff["add"]) == 0 and len(diff["update"]) == 0
+        len(diff["delete"]) == 0
+        and len(diff["add"]) == 0
+        and len(diff["update"]) == 0
+        and len(diff["table_deltas"]) == 0
     )
 
     # Remove deleted components from cache
@@ -211,13 +310,13 @@ def diff_static_layouts(
     # Add new components to cache
     for added_id, added_component in diff["add"].items():
         if cache.should_cache(added_component):
-            model_to_cache = JSON.remove_keys(added_component["model"], ["id"])
-            cache.set(render_id, added_id, JSON.to_bytes(model_to_cache))
+            cache.set(render_id, added_id, cache.fingerprint(added_component["model"]))
 
     return {
         **diff,
         "root_id": root_id,
         "metadata": metadata,
         "new_layout_with_ids_applied": new_layout_with_ids_applied,
+        "index": index,
         "did_change": not is_empty,
     }
@@ -0,0 +1,143 @@
+from typing import Any, Dict, List, Tuple, TypedDict, Union
+
+from ...component_update_cache import digest
+from ...compress import TABLE_DATA_VERSION_COLUMNAR
+from ...json import JSON
+from ...ui import ComponentReturn
+
+# Past this ratio of changed rows to total rows, the table is replaced in
+# full since the delta would be about as large as the table itself.
+DEFAULT_MAX_CHANGE_RATIO = 0.5
+
+
+class TableRows(TypedDict):
+    # Digest of the compressed table model, excluding the ID and data.
+    model: bytes
+    # Row keys in display order.
+    keys: List[Any]
+    # Digest of each compressed row, keyed by row key.
+    rows: Dict[Any, bytes]
+
+
+class TableDelta(TypedDict):
+    # Keys of the rows to delete.
+    delete: List[Any]
+    # `[index, row]` pairs to insert, where `index` is the position of the
+    # row in the new data. Sorted by index.
+    insert: List[Tuple[int, Dict[str, Any]]]
+    # `[key, row]` pairs of the rows to replace.
+    update: List[Tuple[Any, Dict[str, Any]]]
+
+
+def supports_table_delta(table: ComponentReturn) -> bool:
+    """
+    Paginated tables receive their rows through page change responses, so
+    the rows that were sent in the last diff may not be the rows that the
+    browser is displaying.
+    """
+    return table["model"]["properties"].get("paged", None) is not True
+
+
+def get_compressed_rows(compressed_table: ComponentReturn) -> List[Dict[str, Any]]:
+    """
+    Returns the rows of a compressed table, regardless of its data encoding.
+    """
+    properties = compressed_table["model"]["properties"]
+    data = properties["data"]
+
+    if properties.get("dataVersion", None) == TABLE_DATA_VERSION_COLUMNAR:
+        keys = list(data.keys())
+        return [dict(zip(keys, values)) for values in zip(*data.values())]
+
+    return data  # type: ignore[no-any-return]
+
+
+def get_table_rows(
+    compressed_table: ComponentReturn, data: List[Dict[str, Any]]
+) -> Union[TableRows, None]:
+    """
+    Fingerprints the rows of a compressed table, as returned by
+    `get_compressed_rows`. Rows are keyed by their primary key if the table
+    has one, or their index otherwise.
+
+    Returns `None` if the primary keys aren't unique.
+    """
+    properties = compressed_table["model"]["properties"]
+    primary_key = properties.get("primaryKey", None)
+
+    keys: List[Any] = (
+        list(range(len(data)))
+        if primary_key is None
+        else [row.get(primary_key, None) for row in data]
+    )
+
+    rows: Dict[Any, bytes] = {}
+
+    for key, row in zip(keys, data):
+        if not isinstance(key, (str, int, float)) or key in rows:
+            return None
+
+        rows[key] = digest(JSON.to_bytes(row))
+
+    model = JSON.remove_keys(compressed_table["model"], ["id"])
+
+    return {
+        "model": digest(
+            JSON.to_bytes({**model, "properties": {**properties, "data": None}})
+        ),
+        "keys": keys,
+        "rows": rows,
+    }
+
+
+def diff_table_rows(
+    old_rows: TableRows,
+    new_rows: TableRows,
+    new_data: List[Dict[str, Any]],
+    max_change_ratio: float,
+) -> Union[TableDelta, None]:
+    """
+    Computes the row inserts, deletes, and updates that turn the old rows
+    into the new rows.
+
+    Returns `None` if the table should be replaced in full instead: when
+    anything besides the data changed, when rows that exist in both tables
+    were reordered, or when the ratio of changed rows exceeds
+    `max_change_ratio`.
+    """
+    if old_rows["model"] != new_rows["model"]:
+        return None
+
+    old_fingerprints = old_rows["rows"]
+    new_fingerprints = new_rows["rows"]
+
+    old_kept = [key for key in old_rows["keys"] if key in new_fingerprints]
+    new_kept = [key for key in new_rows["keys"] if key in old_fingerprints]
+
+    if old_kept != new_kept:
+        return None
+
+    max_changes = max_change_ratio * max(len(old_rows["keys"]), len(new_rows["keys"]))
+    changes = len(old_rows["keys"]) - len(old_kept)
+
+    if changes > max_changes:
+        return None
+
+    delete = [key for key in old_rows["keys"] if key not in new_fingerprints]
+    insert: List[Tuple[int, Dict[str, Any]]] = []
+    update: List[Tuple[Any, Dict[str, Any]]] = []
+
+    for idx, key in enumerate(new_rows["keys"]):
+        if key not in old_fingerprints:
+            insert.append((idx, new_data[idx]))
+        elif old_fingerprints[key] != new_fingerprints[key]:
+            update.append((key, new_data[idx]))
+        else:
+            continue
+
+        changes += 1
+
+        if changes > max_changes:
+            return None
+
+    return {"delete": delete, "insert": insert, "update": update}
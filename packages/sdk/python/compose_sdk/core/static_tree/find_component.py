@@ -141,6 +141,12 @@ class FindComponent:
                 for child in children
             ]
 
+            # Share unchanged branches instead of copying the entire tree.
+            if all(
+                new_child is child for new_child, child in zip(new_children, children)
+            ):
+                return static_layout
+
             return {
                 **static_layout,
                 "model": {
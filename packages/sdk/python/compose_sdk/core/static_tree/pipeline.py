@@ -0,0 +1,253 @@
+import time
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+from ..compress import Compress
+from ..ui import INTERACTION_TYPE, TYPE, ComponentReturn
+from .component_index import ComponentIndex
+
+MAX_DEPTH = 100
+
+Parent = Union[ComponentReturn, None]
+FormId = Union[str, None]
+
+
+class StaticTreePass:
+    """
+    A single pass over a static layout. Passes are run by a
+    `StaticTreePipeline`, which visits every component once and hands it to
+    each of its passes in order.
+    """
+
+    name = "pass"
+
+    def visit(
+        self,
+        component: ComponentReturn,
+        parent: Parent,
+        form_id: FormId,
+        depth: int,
+    ) -> Union[str, None]:
+        """
+        Called for every component in depth-first order, where `parent` is the
+        parent layout and `form_id` is the ID of the form that the component
+        is nested in (excluding the component itself).
+
+        Return an error message to stop the pipeline.
+        """
+        return None
+
+    def finish(self) -> None:
+        """
+        Called once after every component was visited without errors.
+        """
+        return None
+
+
+class StaticTreePipeline:
+    """
+    Runs a list of passes over a static layout in a single traversal.
+
+    If `measure` is `True`, the time spent in each pass is recorded in
+    `timings`, keyed by the name of the pass.
+    """
+
+    def __init__(self, passes: Sequence[StaticTreePass], *, measure: bool = False):
+        self.passes = passes
+        self.measure = measure
+        self.timings: Dict[str, float] = {}
+
+    def run(self, static_layout: ComponentReturn) -> Union[str, None]:
+        """
+        Runs the passes over the layout. Returns the first error returned by
+        a pass, or `None` if every pass succeeded.
+        """
+        self.timings = {visitor.name: 0.0 for visitor in self.passes}
+
+        stack: List[Tuple[ComponentReturn, Parent, FormId, int]] = [
+            (static_layout, None, None, 0)
+        ]
+
+        while len(stack) > 0:
+            component, parent, form_id, depth = stack.pop()
+
+            for visitor in self.passes:
+                if self.measure:
+                    start = time.perf_counter()
+                    error = visitor.visit(component, parent, form_id, depth)
+                    self.timings[visitor.name] += (time.perf_counter() - start) * 1000
+                else:
+                    error = visitor.visit(component, parent, form_id, depth)
+
+                if error is not None:
+                    return error
+
+            if component["interactionType"] == INTERACTION_TYPE.LAYOUT:
+                children = component["model"]["children"]
+                child_form_id = ComponentIndex.get_child_form_id(component, form_id)
+
+                if isinstance(children, list):
+                    # Push in reverse so that children are visited in order.
+                    for child in reversed(children):
+                        stack.append((child, component, child_form_id, depth + 1))
+                else:
+                    stack.append((children, component, child_form_id, depth + 1))
+
+        for visitor in self.passes:
+            if self.measure:
+                start = time.perf_counter()
+                visitor.finish()
+                self.timings[visitor.name] += (time.perf_counter() - start) * 1000
+            else:
+                visitor.finish()
+
+        return None
+
+    def format_timings(self) -> str:
+        return ", ".join(
+            f"{name}: {elapsed:.2f} ms" for name, elapsed in self.timings.items()
+        )
+
+
+class ValidatePass(StaticTreePass):
+    """
+    Checks:
+    - That the component ID is a string
+    - That all components have unique IDs
+    - That on_enter hooks are not used for inputs inside forms
+    - That a form is not inside another form
+    - That the component tree does not exceed a depth of 100
+    """
+
+    name = "validate"
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, bool] = {}
+
+    def visit(
+        self,
+        component: ComponentReturn,
+        parent: Parent,
+        form_id: FormId,
+        depth: int,
+    ) -> Union[str, None]:
+        component_id = component["model"]["id"]
+
+        if not isinstance(component_id, str):
+            return "Component IDs must be a string"
+
+        if form_id is not None and component["type"] == TYPE.LAYOUT_FORM:
+            return "Cannot render a form inside another form"
+
+        if form_id is not None and component["model"]["properties"].get(
+            "hasOnEnterHook", False
+        ):
+            return f"Invalid input: {component_id}.\n\nInputs inside forms cannot have on_enter hooks since pressing enter will submit the form.\n\nPlace the input outside the form to use the on_enter hook."
+
+        if depth > MAX_DEPTH:
+            return f"Maximum component tree depth of {MAX_DEPTH} exceeded"
+
+        if component_id in self.ids:
+            return f"Duplicate component ID found: '{component_id}'. All component IDs must be unique."
+
+        self.ids[component_id] = True
+
+        return None
+
+
+class IndexPass(StaticTreePass):
+    """
+    Builds a `ComponentIndex` for the layout.
+    """
+
+    name = "index"
+
+    def __init__(self) -> None:
+        self.index = ComponentIndex()
+
+    def visit(
+        self,
+        component: ComponentReturn,
+        parent: Parent,
+        form_id: FormId,
+        depth: int,
+    ) -> Union[str, None]:
+        self.index.add(
+            component,
+            None if parent is None else parent["model"]["id"],
+            ComponentIndex.get_child_form_id(component, form_id),
+        )
+
+        return None
+
+
+class CallbackPass(StaticTreePass):
+    """
+    Calls a function for every component in the layout.
+    """
+
+    def __init__(self, name: str, callback: Callable[[ComponentReturn], Any]):
+        self.name = name
+        self.callback = callback
+
+    def visit(
+        self,
+        component: ComponentReturn,
+        parent: Parent,
+        form_id: FormId,
+        depth: int,
+    ) -> Union[str, None]:
+        self.callback(component)
+        return None
+
+
+class CompressPass(StaticTreePass):
+    """
+    Builds the compressed layout that is sent to the browser. Equivalent to
+    `Compress.ui_tree`.
+    """
+
+    name = "compress"
+
+    def __init__(self, columnar: bool = False) -> None:
+        self.columnar = columnar
+        self.result: Union[ComponentReturn, None] = None
+        # Compressed models of the visited layouts, keyed by the identity of
+        # the original layout, so that children can be attached to them.
+        self._models: Dict[int, Dict[str, Any]] = {}
+
+    def visit(
+        self,
+        component: ComponentReturn,
+        parent: Parent,
+        form_id: FormId,
+        depth: int,
+    ) -> Union[str, None]:
+        if component["type"] == TYPE.INPUT_TABLE:
+            compressed = Compress.table_layout(component, self.columnar)
+        elif component["interactionType"] == INTERACTION_TYPE.LAYOUT:
+            model = {
+                **component["model"],
+                "children": (
+                    [] if isinstance(component["model"]["children"], list) else None
+                ),
+            }
+            compressed = {**component, "model": model}
+            self._models[id(component)] = model
+        else:
+            compressed = component
+
+        if parent is None:
+            self.result = compressed
+            return None
+
+        parent_model = self._models[id(parent)]
+
+        if isinstance(parent_model["children"], list):
+            parent_model["children"].append(compressed)
+        else:
+            parent_model["children"] = compressed
+
+        return None
+
+    def finish(self) -> None:
+        self._models.clear()
@@ -1,27 +1,21 @@
+from typing import List
+
 from ..ui import TYPE, ComponentReturn
-from .find_component import FindComponent  # type: ignore[attr-defined]
+from .pipeline import StaticTreePipeline, CallbackPass
 
 
 async def resolve_coroutines(
     layout: ComponentReturn,
 ) -> None:
-    def count_condition(component: ComponentReturn) -> bool:
-        return (
-            component["type"] == TYPE.BUTTON_BAR_CHART
-            or component["type"] == TYPE.BUTTON_LINE_CHART
-        )
-
-    count = FindComponent.count_by_condition(layout, count_condition)
+    charts: List[ComponentReturn] = []
 
-    if count == 0:
-        return
-
-    async def await_coroutine(
-        component: ComponentReturn,
-    ) -> None:
+    def collect_chart(component: ComponentReturn) -> None:
         if component["type"] == TYPE.BUTTON_BAR_CHART:
-            component["model"]["properties"]["data"] = await component["model"][
-                "properties"
-            ]["data"]
+            charts.append(component)
+
+    StaticTreePipeline([CallbackPass("collect_charts", collect_chart)]).run(layout)
 
-    await FindComponent.do_for_component(layout, await_coroutine)
+    for chart in charts:
+        chart["model"]["properties"]["data"] = await chart["model"]["properties"][
+            "data"
+        ]
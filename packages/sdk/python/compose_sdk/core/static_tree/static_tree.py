@@ -7,6 +7,7 @@ from ..table_state import TableState
 from ..generator import display_none
 from ..ui import INTERACTION_TYPE, ComponentReturn
 from .find_component import FindComponent
+from .component_index import ComponentIndex
 from .validate import validate_static_layout
 from .diff import diff_static_layouts
 from .configure_submit_button import configure_layout_form_submit_button
@@ -24,6 +25,10 @@ class _StaticTree:
     def find_component(self):
         return FindComponent
 
+    @property
+    def component_index(self):
+        return ComponentIndex
+
     @property
     def diff(self):
         return diff_static_layouts
@@ -39,9 +44,11 @@ class _StaticTree:
         render_id: str,
         table_state: TableState,
         scheduler: Scheduler,
+        changed_keys: Any = None,
     ) -> ComponentReturn:
         """
-        Generates a static layout from a layout.
+        Generates a static layout from a layout. `changed_keys` are the state
+        keys that changed since the last render, or `None` if unknown.
         """
         executed = None
 
@@ -50,7 +57,7 @@ class _StaticTree:
             kwargs = {}
             if "resolve" in layout_params:
                 kwargs["resolve"] = resolver
-            executed = scheduler.run_sync(layout, **kwargs)
+            executed = await scheduler.run_sync_async(layout, **kwargs)
         else:
             executed = layout
 
@@ -58,7 +65,10 @@ class _StaticTree:
             return display_none()
 
         processed = configure_table_pagination(
-            configure_layout_form_submit_button(executed), render_id, table_state
+            configure_layout_form_submit_button(executed),
+            render_id,
+            table_state,
+            changed_keys,
         )
 
         await resolve_coroutines(processed)
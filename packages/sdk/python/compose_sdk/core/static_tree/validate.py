@@ -1,73 +1,12 @@
-# type: ignore
-
 from typing import Union
-from ..ui import INTERACTION_TYPE, TYPE, ComponentReturn
 
-MAX_DEPTH = 100
+from ..ui import ComponentReturn
+from .pipeline import StaticTreePipeline, ValidatePass
 
 
-def validate_static_layout_recursive(
-    layout: ComponentReturn, parent_form_id: str, depth: int
-) -> Union[str, dict[str, bool]]:
+def validate_static_layout(layout: ComponentReturn) -> Union[str, None]:
     """
-    Internal recursive function for validating a static layout. Checks:
-    - That the component ID is a string
-    - That all components have unique IDs
-    - That on_enter hooks are not used for inputs inside forms
-    - That a form is not inside another form
-    - That the component tree does not exceed a depth of 100 (to prevent stack overflow)
+    Validates a static layout, returning an error message if the layout is
+    invalid. See `ValidatePass` for the checks that are run.
     """
-
-    if not isinstance(layout["model"]["id"], str):
-        return "Component IDs must be a string"
-
-    if parent_form_id is not None and layout["type"] == TYPE.LAYOUT_FORM:
-        return "Cannot render a form inside another form"
-
-    if parent_form_id is not None and layout["model"]["properties"].get(
-        "hasOnEnterHook", False
-    ):
-        return f"Invalid input: {layout['model']['id']}.\n\nInputs inside forms cannot have on_enter hooks since pressing enter will submit the form.\n\nPlace the input outside the form to use the on_enter hook."
-
-    if depth > MAX_DEPTH:
-        return f"Maximum component tree depth of {MAX_DEPTH} exceeded"
-
-    ids = {layout["model"]["id"]: True}
-
-    if layout["interactionType"] != INTERACTION_TYPE.LAYOUT:
-        return ids
-
-    children = (
-        layout["model"]["children"]
-        if isinstance(layout["model"]["children"], list)
-        else [layout["model"]["children"]]
-    )
-
-    new_form_id = (
-        layout["model"]["id"] if layout["type"] == TYPE.LAYOUT_FORM else parent_form_id
-    )
-
-    for child in children:
-        child_ids = validate_static_layout_recursive(child, new_form_id, depth + 1)
-
-        if isinstance(child_ids, str):
-            return child_ids
-
-        merged_ids = {**ids, **child_ids}
-
-        if len(merged_ids) != len(ids) + len(child_ids):
-            duplicate_id = next((id for id in child_ids if id in ids), None)
-            return f"Duplicate component ID found: '{duplicate_id or '<Unknown ID>'}'. All component IDs must be unique."
-
-        ids = merged_ids
-
-    return ids
-
-
-def validate_static_layout(layout) -> Union[str, None]:
-    result = validate_static_layout_recursive(layout, None, 0)
-
-    if isinstance(result, str):
-        return result
-
-    return None
+    return StaticTreePipeline([ValidatePass()]).run(layout)
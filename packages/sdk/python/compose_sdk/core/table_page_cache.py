@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Set, Tuple, TypedDict, Union
+
+from .table_view_cache import normalize_filter_key, normalize_view_key
+from .ui.types import Table
+
+# Enough for the current page and its neighbours across a few dozen tables.
+DEFAULT_MAX_PAGES = 128
+
+
+class CachedPage(TypedDict):
+    data: List[Any]
+    total_records: int
+
+
+def get_page_view_key(view: Table.PaginationView) -> str:
+    return normalize_view_key(normalize_filter_key(view, None), view)
+
+
+class TablePageCache:
+    """
+    An LRU cache of the pages returned by the page change functions of
+    manually paginated tables, bounded by the number of pages.
+
+    Each table caches the pages of a single view. Caching a page for a
+    different view drops the pages of the previous view.
+    """
+
+    def __init__(self, max_pages: int = DEFAULT_MAX_PAGES):
+        self.max_pages = max_pages
+        self._cache: "OrderedDict[Tuple[str, int, int], CachedPage]" = OrderedDict()
+        self._views: Dict[str, str] = {}
+        self._keys_by_table: Dict[str, Set[Tuple[str, int, int]]] = {}
+        # Bumped whenever a table's pages are dropped, so that pages fetched
+        # before then are not cached.
+        self._generations: Dict[str, int] = {}
+        self._pending: Set[Tuple[str, int, int]] = set()
+
+    def generation(self, table_key: str) -> int:
+        return self._generations.get(table_key, 0)
+
+    def get(
+        self, table_key: str, view_key: str, offset: int, page_size: int
+    ) -> Union[CachedPage, None]:
+        if self._views.get(table_key) != view_key:
+            return None
+
+        key = (table_key, offset, page_size)
+        page = self._cache.get(key)
+
+        if page is not None:
+            self._cache.move_to_end(key)
+
+        return page
+
+    def set(
+        self,
+        table_key: str,
+        view_key: str,
+        offset: int,
+        page_size: int,
+        page: CachedPage,
+        generation: Union[int, None] = None,
+    ) -> None:
+        """
+        Caches a page. If `generation` is set, the page is only cached if
+        the table's pages weren't dropped since then.
+        """
+        if generation is not None and generation != self.generation(table_key):
+            return
+
+        if self._views.get(table_key) != view_key:
+            self.delete_table(table_key)
+            self._views[table_key] = view_key
+
+        key = (table_key, offset, page_size)
+        self._cache[key] = page
+        self._cache.move_to_end(key)
+        self._keys_by_table.setdefault(table_key, set()).add(key)
+
+        while len(self._cache) > self.max_pages:
+            self._remove(next(iter(self._cache)))
+
+    def start_prefetch(self, table_key: str, offset: int, page_size: int) -> bool:
+        """
+        Marks a page as being prefetched. Returns `False` if it's already
+        being prefetched.
+        """
+        key = (table_key, offset, page_size)
+
+        if key in self._pending:
+            return False
+
+        self._pending.add(key)
+        return True
+
+    def finish_prefetch(self, table_key: str, offset: int, page_size: int) -> None:
+        self._pending.discard((table_key, offset, page_size))
+
+    def delete_table(self, table_key: str) -> None:
+        for key in list(self._keys_by_table.get(table_key, ())):
+            self._remove(key)
+
+        self._views.pop(table_key, None)
+        self._generations[table_key] = self.generation(table_key) + 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._views.clear()
+        self._keys_by_table.clear()
+        self._pending.clear()
+
+        for table_key in self._generations:
+            self._generations[table_key] += 1
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _remove(self, key: Tuple[str, int, int]) -> None:
+        del self._cache[key]
+
+        table_key = key[0]
+        table_keys = self._keys_by_table[table_key]
+        table_keys.discard(key)
+
+        if len(table_keys) == 0:
+            del self._keys_by_table[table_key]
@@ -0,0 +1,563 @@
+import re
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy
+import pandas  # type: ignore[import-untyped]
+
+from .dataframe_rows import DataFrameRows
+from .json import JSON
+from .ui.types import Table, TableColumns, TableColumnSortRule
+
+# Matches the number of rows that `Compress.table_layout` samples when
+# inferring the columns of a table that doesn't explicitly set them.
+INFER_COLUMNS_SAMPLE_SIZE = 5
+
+# Separates the values of a column inside its text index. Substring matches
+# can't cross a separator, so each match maps to exactly one row.
+TEXT_INDEX_SEPARATOR = "\x00"
+
+# Sort keys are folded into a single int64 key when the product of their
+# distinct value counts stays below this bound.
+MAX_FOLDED_SORT_KEY = 2**62
+
+# Number of rows that are compared to tell whether a dataset changed in
+# place since an engine was built for it.
+FINGERPRINT_SAMPLE_SIZE = 16
+
+IndexArray = numpy.ndarray
+MaskArray = numpy.ndarray
+
+
+def fingerprint_rows(rows: Sequence[Any]) -> int:
+    """
+    Hashes a sample of evenly spaced rows (including the first and last
+    row), so that rows that were changed in place are noticed without
+    hashing the entire dataset. Changes that only touch rows outside of the
+    sample go unnoticed.
+    """
+    count = len(rows)
+
+    if count == 0:
+        return 0
+
+    step = max(1, count // FINGERPRINT_SAMPLE_SIZE)
+    indices = {*range(0, count, step), count - 1}
+
+    return hash(JSON.to_bytes([rows[idx] for idx in sorted(indices)]))
+
+
+def to_search_string(value: Any) -> Union[str, None]:
+    """
+    Converts a cell value to the string representation that the browser
+    uses when searching and filtering table rows, e.g. `True` becomes
+    `"true"` and `1.0` becomes `"1"`.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        return value
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    if isinstance(value, (int, float)):
+        return str(value)
+
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+
+    return JSON.stringify(value)
+
+
+def is_empty(value: Any) -> bool:
+    return (
+        value is None
+        or value == ""
+        or (isinstance(value, (list, tuple, dict)) and len(value) == 0)
+    )
+
+
+def as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def has_any(value: Any, filter_value: List[Any]) -> bool:
+    if value is None:
+        return False
+
+    return any(element in filter_value for element in as_list(value))
+
+
+def has_all(value: Any, filter_value: List[Any]) -> bool:
+    if value is None:
+        return False
+
+    cell_values = as_list(value)
+    return all(element in cell_values for element in filter_value)
+
+
+def tag_is_equal(value: Any, filter_value: List[Any]) -> bool:
+    if value is None:
+        return False
+
+    cell_values = as_list(value)
+
+    if len(cell_values) != len(filter_value):
+        return False
+
+    return all(element in cell_values for element in filter_value)
+
+
+def get_column_keys(
+    rows: Sequence[Any], columns: Union[TableColumns, None]
+) -> List[str]:
+    if columns is not None:
+        return [
+            column if isinstance(column, str) else column["key"] for column in columns
+        ]
+
+    keys: List[str] = []
+
+    for i in range(min(len(rows), INFER_COLUMNS_SAMPLE_SIZE)):
+        for key in rows[i].keys():
+            if key not in keys:
+                keys.append(key)
+
+    return keys
+
+
+def get_column_formats(columns: Union[TableColumns, None]) -> Dict[str, str]:
+    if columns is None:
+        return {}
+
+    return {
+        column["key"]: column["format"]
+        for column in columns
+        if not isinstance(column, str) and "format" in column
+    }
+
+
+COMPARISON_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    "greater_than": lambda column, target: column > target,
+    "greater_than_or_equal": lambda column, target: column >= target,
+    "less_than": lambda column, target: column < target,
+    "less_than_or_equal": lambda column, target: column <= target,
+}
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    """
+    Orders values of mixed types: booleans, then numbers, then strings
+    (case-insensitive), then dates, then everything else.
+    """
+    if isinstance(value, bool):
+        return (0, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value.casefold())
+    if isinstance(value, (datetime, date, time)):
+        return (3, value.isoformat())
+
+    return (4, to_search_string(value))
+
+
+class TableQuery:
+    """
+    An in-process query engine for auto-paginated tables.
+
+    Applies the search query, filter model and sort model of a table view to
+    the full dataset and returns a single page of rows. Every column that is
+    touched by a query is extracted from the rows once and then kept as a
+    NumPy array, so that subsequent queries against the same dataset are
+    evaluated as vectorized operations instead of per-row Python loops.
+
+    Use `is_for()` to check whether a dataset can reuse an existing engine,
+    which also checks a sample of the rows for changes that were made in
+    place.
+    """
+
+    def __init__(self, rows: Sequence[Any]) -> None:
+        self.rows = rows
+        self.row_count = len(rows)
+        self.fingerprint = fingerprint_rows(rows)
+
+        self._values: Dict[str, numpy.ndarray] = {}
+        self._strings: Dict[str, numpy.ndarray] = {}
+        self._text_indexes: Dict[str, Tuple[str, IndexArray]] = {}
+        self._numbers: Dict[str, pandas.Series] = {}
+        self._datetimes: Dict[str, pandas.Series] = {}
+        self._ranks: Dict[str, Tuple[IndexArray, int]] = {}
+
+    def is_for(self, rows: Sequence[Any]) -> bool:
+        """
+        Whether the engine was built for the given dataset, and the dataset
+        wasn't changed in place since. Compares by reference, the length and
+        a sample of the rows (see `fingerprint_rows`), since comparing the
+        entire contents would cost as much as rebuilding the engine. Rows
+        backed by a DataFrame are compared by the DataFrame's reference.
+        """
+        if isinstance(rows, DataFrameRows) and isinstance(self.rows, DataFrameRows):
+            same = rows.df is self.rows.df
+        else:
+            same = rows is self.rows
+
+        return (
+            same
+            and len(rows) == self.row_count
+            and fingerprint_rows(rows) == self.fingerprint
+        )
+
+    def page(
+        self,
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+        columns: Union[TableColumns, None] = None,
+    ) -> Tuple[List[Any], int]:
+        """
+        Returns the rows for a single page of the view, along with the total
+        number of rows that match the view.
+        """
+        indices = self.select(view, columns)
+
+        if indices is None:
+            return list(self.rows[offset : offset + page_size]), self.row_count
+
+        return self.take(indices, offset, page_size), len(indices)
+
+    def select(
+        self,
+        view: Table.PaginationView,
+        columns: Union[TableColumns, None] = None,
+    ) -> Union[IndexArray, None]:
+        """
+        Returns the ordered row indices that match the view, or `None` if the
+        view doesn't search, filter or sort the table.
+        """
+        indices = self.filter(view, columns)
+
+        if len(view["sort_by"]) == 0:
+            return indices
+
+        if indices is None:
+            indices = self.all_indices()
+
+        return self.sort(indices, view["sort_by"])
+
+    def filter(
+        self,
+        view: Table.PaginationView,
+        columns: Union[TableColumns, None] = None,
+    ) -> Union[IndexArray, None]:
+        """
+        Returns the indices of the rows that match the search query and
+        filter model of the view, or `None` if neither is set.
+        """
+        # Views store the filter model in the browser's camelCase format.
+        filter_by = Table().transform_advanced_filter_model_to_snake_case(
+            view["filter_by"]
+        )
+        search_query = view["search_query"]
+
+        if filter_by is None and not search_query:
+            return None
+
+        mask = numpy.ones(self.row_count, dtype=bool)
+
+        if filter_by is not None:
+            mask &= self._evaluate(filter_by, get_column_formats(columns))
+
+        if search_query:
+            mask &= self._search(search_query, get_column_keys(self.rows, columns))
+
+        return numpy.flatnonzero(mask)
+
+    def sort(
+        self, indices: IndexArray, sort_by: List[TableColumnSortRule]
+    ) -> IndexArray:
+        """
+        Sorts the row indices by the sort model. Sorting is stable and empty
+        values are always placed last, regardless of the sort direction.
+        """
+        if len(sort_by) == 0 or len(indices) == 0:
+            return indices
+
+        folded: Union[IndexArray, None] = numpy.zeros(len(indices), dtype=numpy.int64)
+        folded_range = 1
+
+        for rule in sort_by:
+            codes, unique_count = self._directional_sort_codes(rule)
+            folded_range *= unique_count + 1
+
+            if folded_range >= MAX_FOLDED_SORT_KEY:
+                folded = None
+                break
+
+            folded = folded * (unique_count + 1) + codes[indices]  # type: ignore[operator]
+
+        if folded is not None:
+            return indices[numpy.argsort(folded, kind="stable")]
+
+        # Fall back to `lexsort`, which treats the last key as the primary key.
+        sort_keys = [
+            self._directional_sort_codes(rule)[0][indices] for rule in reversed(sort_by)
+        ]
+
+        return indices[numpy.lexsort(sort_keys)]
+
+    def all_indices(self) -> IndexArray:
+        return numpy.arange(self.row_count)
+
+    def take(self, indices: IndexArray, offset: int, page_size: int) -> List[Any]:
+        page_indices = indices[offset : offset + page_size].tolist()
+
+        if isinstance(self.rows, DataFrameRows):
+            return self.rows.take(page_indices)
+
+        return [self.rows[idx] for idx in page_indices]
+
+    def _column(self, key: str) -> numpy.ndarray:
+        if key not in self._values:
+            if isinstance(self.rows, DataFrameRows):
+                self._values[key] = self.rows.column(key)
+            else:
+                values = numpy.empty(self.row_count, dtype=object)
+                values[:] = [row.get(key) for row in self.rows]
+                self._values[key] = values
+
+        return self._values[key]
+
+    def _string_column(self, key: str) -> numpy.ndarray:
+        """
+        The lowercased string representation of every value in a column, or
+        `None` for empty values.
+        """
+        if key not in self._strings:
+            strings = numpy.empty(self.row_count, dtype=object)
+            strings[:] = [
+                None if string is None else string.lower()
+                for string in map(to_search_string, self._column(key))
+            ]
+            self._strings[key] = strings
+
+        return self._strings[key]
+
+    def _text_index(self, key: str) -> Tuple[str, IndexArray]:
+        """
+        Concatenates the string column into a single text, along with the
+        offset at which each row starts. Substring searches then run as one
+        scan over the text instead of one Python call per row.
+        """
+        if key not in self._text_indexes:
+            strings = [
+                "" if string is None else string for string in self._string_column(key)
+            ]
+            lengths = numpy.fromiter(
+                (len(string) + 1 for string in strings),
+                dtype=numpy.int64,
+                count=self.row_count,
+            )
+            starts = numpy.zeros(self.row_count, dtype=numpy.int64)
+            numpy.cumsum(lengths[:-1], out=starts[1:])
+
+            self._text_indexes[key] = (TEXT_INDEX_SEPARATOR.join(strings), starts)
+
+        return self._text_indexes[key]
+
+    def _contains(self, key: str, needle: str) -> MaskArray:
+        """
+        Returns whether each row's lowercased value contains the (already
+        lowercased) needle.
+        """
+        strings = self._string_column(key)
+
+        if needle == "" or TEXT_INDEX_SEPARATOR in needle:
+            return numpy.fromiter(
+                (string is not None and needle in string for string in strings),
+                dtype=bool,
+                count=self.row_count,
+            )
+
+        text, starts = self._text_index(key)
+
+        positions = numpy.fromiter(
+            (match.start() for match in re.finditer(re.escape(needle), text)),
+            dtype=numpy.int64,
+        )
+
+        mask = numpy.zeros(self.row_count, dtype=bool)
+        mask[numpy.searchsorted(starts, positions, side="right") - 1] = True
+
+        return mask
+
+    def _number_column(self, key: str) -> pandas.Series:
+        if key not in self._numbers:
+            self._numbers[key] = pandas.to_numeric(
+                pandas.Series(self._column(key), dtype=object), errors="coerce"
+            )
+
+        return self._numbers[key]
+
+    def _datetime_column(self, key: str) -> pandas.Series:
+        if key not in self._datetimes:
+            self._datetimes[key] = pandas.to_datetime(
+                pandas.Series(self._column(key), dtype=object),
+                errors="coerce",
+                utc=True,
+                format="mixed",
+            )
+
+        return self._datetimes[key]
+
+    def _sort_codes(self, key: str) -> Tuple[IndexArray, int]:
+        """
+        Returns the ascending rank of every row for a column, along with the
+        number of distinct values. Empty values are ranked after all other
+        values.
+        """
+        if key not in self._ranks:
+            values = self._column(key)
+
+            try:
+                labels, uniques = pandas.factorize(values, use_na_sentinel=True)
+            except TypeError:
+                # Unhashable values (e.g. lists for tag columns) are ranked
+                # by their serialized representation.
+                hashable = numpy.empty(self.row_count, dtype=object)
+                hashable[:] = [
+                    JSON.stringify(value) if isinstance(value, (list, dict)) else value
+                    for value in values
+                ]
+                labels, uniques = pandas.factorize(hashable, use_na_sentinel=True)
+
+            order = sorted(range(len(uniques)), key=lambda idx: sort_key(uniques[idx]))
+
+            ranks = numpy.empty(len(uniques) + 1, dtype=numpy.int64)
+            ranks[order] = numpy.arange(len(uniques))
+            ranks[-1] = len(uniques)
+
+            # Labels of -1 (empty values) map to the last rank.
+            self._ranks[key] = (ranks[labels], len(uniques))
+
+        return self._ranks[key]
+
+    def _directional_sort_codes(
+        self, rule: TableColumnSortRule
+    ) -> Tuple[IndexArray, int]:
+        codes, unique_count = self._sort_codes(rule["key"])
+
+        if rule["direction"] != "desc":
+            return codes, unique_count
+
+        return (
+            numpy.where(codes == unique_count, unique_count, unique_count - 1 - codes),
+            unique_count,
+        )
+
+    def _search(self, search_query: str, keys: List[str]) -> MaskArray:
+        query = search_query.lower()
+        mask = numpy.zeros(self.row_count, dtype=bool)
+
+        for key in keys:
+            mask |= self._contains(key, query)
+
+        return mask
+
+    def _evaluate(self, filter_by: Any, formats: Dict[str, str]) -> MaskArray:
+        if "logic_operator" in filter_by:
+            masks = [self._evaluate(f, formats) for f in filter_by["filters"]]
+
+            if filter_by["logic_operator"] == "or":
+                return (
+                    numpy.logical_or.reduce(masks)
+                    if len(masks) > 0
+                    else numpy.zeros(self.row_count, dtype=bool)
+                )
+
+            return (
+                numpy.logical_and.reduce(masks)
+                if len(masks) > 0
+                else numpy.ones(self.row_count, dtype=bool)
+            )
+
+        operator = filter_by["operator"]
+        key = filter_by["key"]
+        value = filter_by["value"]
+        column_format = formats.get(key, None)
+
+        if operator == "is":
+            return self._is_equal(key, value, column_format)
+        if operator == "is_not":
+            return ~self._is_equal(key, value, column_format)
+        if operator == "includes":
+            return self._includes(key, value)
+        if operator == "not_includes":
+            return ~self._includes(key, value)
+        if operator == "is_empty":
+            return self._apply(key, is_empty)
+        if operator == "is_not_empty":
+            return ~self._apply(key, is_empty)
+        if operator == "has_any":
+            return self._apply(key, lambda cell: has_any(cell, as_list(value)))
+        if operator == "not_has_any":
+            return ~self._apply(key, lambda cell: has_any(cell, as_list(value)))
+        if operator == "has_all":
+            return self._apply(key, lambda cell: has_all(cell, as_list(value)))
+        if operator == "not_has_all":
+            return ~self._apply(key, lambda cell: has_all(cell, as_list(value)))
+        if operator in COMPARISON_OPERATORS:
+            return self._compare(key, operator, value, column_format)
+
+        return numpy.zeros(self.row_count, dtype=bool)
+
+    def _apply(self, key: str, predicate: Callable[[Any], bool]) -> MaskArray:
+        return numpy.fromiter(
+            (predicate(value) for value in self._column(key)),
+            dtype=bool,
+            count=self.row_count,
+        )
+
+    def _is_equal(
+        self, key: str, value: Any, column_format: Union[str, None]
+    ) -> MaskArray:
+        if column_format == "tag":
+            return self._apply(key, lambda cell: tag_is_equal(cell, as_list(value)))
+
+        target = to_search_string(value)
+
+        if target is None:
+            return numpy.zeros(self.row_count, dtype=bool)
+
+        return self._string_column(key) == target.lower()  # type: ignore[no-any-return]
+
+    def _includes(self, key: str, value: Any) -> MaskArray:
+        target = to_search_string(value)
+
+        if target is None:
+            return numpy.zeros(self.row_count, dtype=bool)
+
+        return self._contains(key, target.lower())
+
+    def _compare(
+        self, key: str, operator: str, value: Any, column_format: Union[str, None]
+    ) -> MaskArray:
+        try:
+            if column_format == "date" or column_format == "datetime":
+                column = self._datetime_column(key)
+                target = pandas.Timestamp(value)
+                if target.tzinfo is None:
+                    target = target.tz_localize("UTC")
+            else:
+                column = self._number_column(key)
+                target = float(value)
+        except (TypeError, ValueError):
+            return numpy.zeros(self.row_count, dtype=bool)
+
+        # Comparisons against empty values (NaN / NaT) are always False.
+        return COMPARISON_OPERATORS[operator](column, target).to_numpy(dtype=bool)  # type: ignore[no-any-return]
@@ -0,0 +1,551 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .table_query import to_search_string
+from .ui.types import (
+    TableColumnSortRule,
+    TableCountArgs,
+    TablePageChangeArgs,
+    TablePageChangeResponse,
+)
+
+SqlParamStyle = Literal["qmark", "format", "numeric", "dollar"]
+
+DEFAULT_MAX_POOL_SIZE = 10
+
+# Alias of the base query inside the generated queries.
+BASE_QUERY_ALIAS = "compose_table"
+
+TRUE = "1 = 1"
+FALSE = "1 = 0"
+
+COMPARISON_OPERATORS = {
+    "greater_than": ">",
+    "greater_than_or_equal": ">=",
+    "less_than": "<",
+    "less_than_or_equal": "<=",
+}
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def get_column_names(description: Any) -> List[str]:
+    return [column[0] for column in description]
+
+
+class SqlDialect:
+    """
+    The syntax that differs between databases. The default works with
+    SQLite and PostgreSQL. Subclass it to support other databases.
+    """
+
+    def text(self, column: str) -> str:
+        """
+        Converts a column to text, so that it can be compared as a string.
+        """
+        return f"CAST({column} AS TEXT)"
+
+    def like(self, text: str, pattern: str) -> str:
+        """
+        Matches `text` against a `LIKE` pattern, whose wildcards are escaped
+        with `escape_pattern`.
+        """
+        return f"{text} LIKE {pattern} ESCAPE '\\'"
+
+    def escape_pattern(self, value: str) -> str:
+        return escape_like(value)
+
+    def paginate(
+        self, param: Callable[[Any], str], limit: int, offset: int, ordered: bool
+    ) -> str:
+        """
+        Returns the clause that limits the query to a page. `param` adds a
+        parameter to the query and returns its placeholder.
+        """
+        return f" LIMIT {param(limit)} OFFSET {param(offset)}"
+
+
+class MySqlDialect(SqlDialect):
+    """
+    MySQL and MariaDB, which escape `LIKE` wildcards with a backslash by
+    default and can't cast to `TEXT`.
+    """
+
+    def text(self, column: str) -> str:
+        return f"CAST({column} AS CHAR)"
+
+    def like(self, text: str, pattern: str) -> str:
+        return f"{text} LIKE {pattern}"
+
+
+class SqlServerDialect(SqlDialect):
+    """
+    Microsoft SQL Server 2012 and later.
+    """
+
+    def text(self, column: str) -> str:
+        return f"CAST({column} AS NVARCHAR(MAX))"
+
+    def escape_pattern(self, value: str) -> str:
+        # Brackets start a character range in SQL Server patterns.
+        return escape_like(value).replace("[", "\\[")
+
+    def paginate(
+        self, param: Callable[[Any], str], limit: int, offset: int, ordered: bool
+    ) -> str:
+        # `OFFSET` requires an `ORDER BY` clause.
+        order_by = "" if ordered else " ORDER BY (SELECT NULL)"
+        return f"{order_by} OFFSET {param(offset)} ROWS FETCH NEXT {param(limit)} ROWS ONLY"
+
+
+class SqlViewCompiler:
+    """
+    Compiles the search query, filter model and sort model of a table view
+    into SQL clauses. Values are always passed as parameters, and columns
+    that the query doesn't return are compiled as `NULL`, since the keys of
+    a view come from the browser.
+
+    Matches the semantics of auto-paginated tables: text comparisons are
+    case-insensitive, negated filters match empty values, and empty values
+    are sorted last. Sorting by a column that the query doesn't return
+    raises a `ValueError`.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        paramstyle: SqlParamStyle = "qmark",
+        params: Sequence[Any] = (),
+        dialect: Union[SqlDialect, None] = None,
+    ) -> None:
+        if paramstyle not in ("qmark", "format", "numeric", "dollar"):
+            raise ValueError(f"Unsupported paramstyle: {paramstyle}")
+
+        self.columns = set(columns)
+        self.paramstyle = paramstyle
+        self.params: List[Any] = list(params)
+        self.dialect = dialect if dialect is not None else SqlDialect()
+
+    def param(self, value: Any) -> str:
+        self.params.append(value)
+
+        if self.paramstyle == "qmark":
+            return "?"
+        if self.paramstyle == "format":
+            return "%s"
+        if self.paramstyle == "numeric":
+            return f":{len(self.params)}"
+
+        return f"${len(self.params)}"
+
+    def column(self, key: str) -> str:
+        return quote_identifier(key) if key in self.columns else "NULL"
+
+    def text(self, key: str) -> str:
+        return f"LOWER({self.dialect.text(self.column(key))})"
+
+    def where(
+        self,
+        search_query: Union[str, None],
+        filter_by: Any,
+        search_columns: Sequence[str],
+    ) -> Union[str, None]:
+        """
+        Returns the `WHERE` condition for the view, or `None` if the view
+        doesn't search or filter the table. Expects the filter model in
+        snake_case.
+        """
+        conditions: List[str] = []
+
+        if filter_by is not None:
+            conditions.append(self.condition(filter_by))
+
+        if search_query:
+            conditions.append(
+                self.any_of(
+                    [self.includes(key, search_query) for key in search_columns]
+                )
+            )
+
+        if len(conditions) == 0:
+            return None
+
+        return " AND ".join(f"({condition})" for condition in conditions)
+
+    def order_by(self, sort_by: Sequence[TableColumnSortRule]) -> Union[str, None]:
+        terms: List[str] = []
+
+        for rule in sort_by:
+            if rule["key"] not in self.columns:
+                raise ValueError(
+                    f"Can't sort by '{rule['key']}', since it isn't one of the columns of the query"
+                )
+
+            column = self.column(rule["key"])
+            direction = "DESC" if rule["direction"] == "desc" else "ASC"
+            terms.append(f"CASE WHEN {column} IS NULL THEN 1 ELSE 0 END")
+            terms.append(f"{column} {direction}")
+
+        if len(terms) == 0:
+            return None
+
+        return ", ".join(terms)
+
+    def condition(self, filter_by: Any) -> str:
+        if "logic_operator" in filter_by:
+            conditions = [self.condition(f) for f in filter_by["filters"]]
+
+            if filter_by["logic_operator"] == "or":
+                return self.any_of(conditions)
+
+            return self.all_of(conditions)
+
+        operator = filter_by["operator"]
+        key = filter_by["key"]
+        value = filter_by["value"]
+
+        if operator == "is":
+            return self.is_equal(key, value)
+        if operator == "is_not":
+            return self.negate(key, self.is_equal(key, value))
+        if operator == "includes":
+            return self.includes(key, value)
+        if operator == "not_includes":
+            return self.negate(key, self.includes(key, value))
+        if operator == "is_empty":
+            return self.is_empty(key)
+        if operator == "is_not_empty":
+            return f"NOT ({self.is_empty(key)})"
+        if operator == "has_any":
+            return self.has_any(key, value)
+        if operator == "not_has_any":
+            return self.negate(key, self.has_any(key, value))
+        if operator == "has_all":
+            return self.has_all(key, value)
+        if operator == "not_has_all":
+            return self.negate(key, self.has_all(key, value))
+        if operator in COMPARISON_OPERATORS:
+            return self.compare(key, operator, value)
+
+        return FALSE
+
+    def negate(self, key: str, condition: str) -> str:
+        # The condition is unknown for empty values, which negated filters
+        # should match.
+        return f"{self.column(key)} IS NULL OR NOT ({condition})"
+
+    def any_of(self, conditions: List[str]) -> str:
+        if len(conditions) == 0:
+            return FALSE
+
+        return " OR ".join(f"({condition})" for condition in conditions)
+
+    def all_of(self, conditions: List[str]) -> str:
+        if len(conditions) == 0:
+            return TRUE
+
+        return " AND ".join(f"({condition})" for condition in conditions)
+
+    def is_equal(self, key: str, value: Any) -> str:
+        if isinstance(value, (bool, int, float)):
+            return f"{self.column(key)} = {self.param(value)}"
+
+        target = to_search_string(value)
+
+        if target is None:
+            return FALSE
+
+        return f"{self.text(key)} = {self.param(target.lower())}"
+
+    def includes(self, key: str, value: Any) -> str:
+        target = to_search_string(value)
+
+        if target is None:
+            return FALSE
+
+        pattern = self.param(f"%{self.dialect.escape_pattern(target.lower())}%")
+        return self.dialect.like(self.text(key), pattern)
+
+    def is_empty(self, key: str) -> str:
+        column = self.column(key)
+        return f"{column} IS NULL OR {self.dialect.text(column)} = ''"
+
+    def has_any(self, key: str, value: Any) -> str:
+        values = value if isinstance(value, (list, tuple)) else [value]
+
+        if len(values) == 0:
+            return FALSE
+
+        placeholders = ", ".join(self.param(element) for element in values)
+        return f"{self.column(key)} IN ({placeholders})"
+
+    def has_all(self, key: str, value: Any) -> str:
+        # Columns are scalars, so a row only has all of the values if they're
+        # all equal to its value. Array columns aren't supported.
+        values = value if isinstance(value, (list, tuple)) else [value]
+
+        if len(values) == 0:
+            return f"{self.column(key)} IS NOT NULL"
+
+        # A single value can only equal every filter value if they're equal.
+        if any(element != values[0] for element in values):
+            return FALSE
+
+        return f"{self.column(key)} = {self.param(values[0])}"
+
+    def compare(self, key: str, operator: str, value: Any) -> str:
+        if value is None or value == "":
+            return FALSE
+
+        return (
+            f"{self.column(key)} {COMPARISON_OPERATORS[operator]} {self.param(value)}"
+        )
+
+
+class SqlConnectionPool:
+    """
+    A thread-safe pool of DB-API connections, for drivers that don't ship
+    their own pool. Holds up to `max_size` connections, which are created
+    by calling `connect` as they're needed.
+    """
+
+    def __init__(
+        self, connect: Callable[[], Any], *, max_size: int = DEFAULT_MAX_POOL_SIZE
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("'max_size' must be a positive integer")
+
+        self.connect = connect
+        self.max_size = max_size
+
+        self._idle: List[Any] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrows a connection until the block exits. Connections that raise
+        an error are closed instead of being returned to the pool.
+        """
+        self._slots.acquire()
+
+        try:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+
+            if connection is None:
+                connection = self.connect()
+
+            try:
+                yield connection
+                # End the transaction that the driver may have implicitly
+                # started, so the connection doesn't hold on to a snapshot.
+                connection.rollback()
+            except BaseException:
+                connection.close()
+                raise
+
+            with self._lock:
+                self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for connection in idle:
+            connection.close()
+
+
+class SqlTableSource:
+    """
+    A data source for manually paginated tables that pushes the view of the
+    table down to a SQL database. Pass it as the data of a table:
+
+    ```python
+    pool = c.SqlConnectionPool(lambda: sqlite3.connect("app.db", check_same_thread=False))
+    source = c.SqlTableSource(pool, "SELECT * FROM users WHERE active = ?", [True])
+
+    ui.table("users", source)
+    ```
+
+    The search query, filters, sorting and pagination of the table are
+    compiled into the `WHERE`, `ORDER BY` and `LIMIT` clauses of a query
+    that wraps `query`, and the page and the total number of records are
+    queried concurrently.
+
+    `pool` is either an object with a `connection()` method, or a function,
+    that returns a context manager that borrows a connection, e.g. a
+    `SqlConnectionPool` or a `psycopg_pool.ConnectionPool`. Async context
+    managers are supported too, as long as the async connection has an
+    `execute()` method (e.g. `psycopg_pool.AsyncConnectionPool` or
+    `aiosqlite`). Queries on sync connections run in a worker thread.
+
+    Other options:
+    - `params`: Positional parameters of `query`.
+    - `columns`: The columns that can be filtered and sorted. Defaults to
+    the columns returned by `query`.
+    - `search_columns`: The columns that the search query matches against.
+    Defaults to `columns`.
+    - `paramstyle`: The placeholder style of the driver. One of `"qmark"`
+    (`?`), `"format"` (`%s`), `"numeric"` (`:1`) or `"dollar"` (`$1`).
+    - `dialect`: The SQL syntax of the database. Defaults to `SqlDialect`,
+    which works with SQLite and PostgreSQL. Use `MySqlDialect` or
+    `SqlServerDialect` for those databases.
+
+    Columns are compared as scalar values, so the `has_all` filter only
+    matches rows when every filter value equals the row's value.
+    """
+
+    def __init__(
+        self,
+        pool: Any,
+        query: str,
+        params: Sequence[Any] = (),
+        *,
+        columns: Union[Sequence[str], None] = None,
+        search_columns: Union[Sequence[str], None] = None,
+        paramstyle: SqlParamStyle = "qmark",
+        dialect: Union[SqlDialect, None] = None,
+    ) -> None:
+        self.pool = pool
+        self.query = query
+        self.params = list(params)
+        self.columns = None if columns is None else list(columns)
+        self.search_columns = None if search_columns is None else list(search_columns)
+        self.paramstyle = paramstyle
+        self.dialect = dialect if dialect is not None else SqlDialect()
+
+        # Validate the paramstyle right away.
+        SqlViewCompiler([], paramstyle)
+
+    async def page(self, args: TablePageChangeArgs) -> TablePageChangeResponse:
+        columns = await self.get_columns()
+        compiler = SqlViewCompiler(columns, self.paramstyle, self.params, self.dialect)
+        sql = f"SELECT * FROM ({self.query}) AS {BASE_QUERY_ALIAS}"
+
+        where = compiler.where(
+            args["search_query"],
+            args["filter_by"],
+            columns if self.search_columns is None else self.search_columns,
+        )
+        if where is not None:
+            sql += f" WHERE {where}"
+
+        order_by = compiler.order_by(args["sort_by"])
+        if order_by is not None:
+            sql += f" ORDER BY {order_by}"
+
+        sql += self.dialect.paginate(
+            compiler.param, args["page_size"], args["offset"], order_by is not None
+        )
+
+        page = self.fetch(sql, compiler.params)
+
+        if not args["refresh_total_records"] and args["prev_total_records"] is not None:
+            names, rows = await page
+            total_records = args["prev_total_records"]
+        else:
+            (names, rows), total_records = await asyncio.gather(page, self.count(args))
+
+        return {
+            "data": [self.to_record(names, row) for row in rows],
+            "total_records": total_records,
+        }
+
+    async def count(self, args: Union[TableCountArgs, TablePageChangeArgs]) -> int:
+        """
+        Counts the records that match the search query and filters. Can be
+        passed as the `count` function of the table to count in the
+        background.
+        """
+        columns = await self.get_columns()
+        compiler = SqlViewCompiler(columns, self.paramstyle, self.params, self.dialect)
+        sql = f"SELECT COUNT(*) FROM ({self.query}) AS {BASE_QUERY_ALIAS}"
+
+        where = compiler.where(
+            args["search_query"],
+            args["filter_by"],
+            columns if self.search_columns is None else self.search_columns,
+        )
+        if where is not None:
+            sql += f" WHERE {where}"
+
+        _, rows = await self.fetch(sql, compiler.params)
+        return int(rows[0][0])
+
+    async def get_columns(self) -> List[str]:
+        if self.columns is None:
+            names, _ = await self.fetch(
+                f"SELECT * FROM ({self.query}) AS {BASE_QUERY_ALIAS} WHERE {FALSE}",
+                self.params,
+            )
+            self.columns = names
+
+        return self.columns
+
+    async def fetch(
+        self, sql: str, params: Sequence[Any]
+    ) -> Tuple[List[str], List[Any]]:
+        """
+        Runs a query on a pooled connection and returns the names of the
+        columns along with the rows.
+        """
+        manager = (
+            self.pool.connection() if hasattr(self.pool, "connection") else self.pool()
+        )
+
+        if not hasattr(manager, "__aenter__"):
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self.fetch_sync, manager, sql, params
+            )
+
+        async with manager as connection:
+            cursor = await connection.execute(sql, params)
+
+            try:
+                rows = await cursor.fetchall()
+                return get_column_names(cursor.description), list(rows)
+            finally:
+                await cursor.close()
+
+    @staticmethod
+    def fetch_sync(
+        manager: Any, sql: str, params: Sequence[Any]
+    ) -> Tuple[List[str], List[Any]]:
+        with manager as connection:
+            cursor = connection.cursor()
+
+            try:
+                cursor.execute(sql, params)
+                return get_column_names(cursor.description), cursor.fetchall()
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def to_record(names: List[str], row: Any) -> Dict[str, Any]:
+        if isinstance(row, Mapping):
+            return dict(row)
+
+        return dict(zip(names, row))
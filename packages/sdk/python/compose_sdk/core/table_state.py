@@ -1,9 +1,27 @@
-from typing import Dict, TypedDict, Any, Union, Tuple, List
+import asyncio
+from typing import Dict, Any, Union, Tuple, List, Sequence, Set
+from typing_extensions import NotRequired, TypedDict
 from ..scheduler import Scheduler
-from .ui.types import Stale, TableColumnSortRule, Table
+from .ui.types import (
+    Stale,
+    TableColumnSortRule,
+    Table,
+    TableColumns,
+    TableCursorDirection,
+    TablePageChangeResponse,
+)
 from .smart_debounce import SmartDebounce
 from .json import JSON
 from .component_update_cache import ComponentUpdateCache
+from .table_query import TableQuery
+from .table_page_cache import CachedPage, TablePageCache, get_page_view_key
+from .table_view_cache import (
+    TableViewCache,
+    TableViews,
+    ALL_ROWS,
+    normalize_filter_key,
+    normalize_view_key,
+)
 
 
 class TableStateRecordInput(TypedDict):
@@ -13,6 +31,8 @@ class TableStateRecordInput(TypedDict):
     page_size: int
     initial_view: Table.PaginationView
     stale: Stale.TYPE
+    # The `deps` of the table during its last render, if it declares them.
+    deps: NotRequired[Union[Sequence[Any], None]]
 
 
 class TableStateRecord(TableStateRecordInput):
@@ -20,9 +40,11 @@ class TableStateRecord(TableStateRecordInput):
     render_id: str
     table_id: str
     active_view: Table.PaginationView
+    query: Union[TableQuery, None]
 
 
 PAGE_UPDATE_DEBOUNCE_INTERVAL_MS = 250
+MAX_CACHED_COUNTS_PER_TABLE = 32
 KEY_SEPARATOR = "__"
 
 
@@ -71,13 +93,78 @@ def view_did_change(
     )
 
 
+def deps_did_change(
+    old_deps: Union[Sequence[Any], None], new_deps: Sequence[Any]
+) -> bool:
+    if old_deps is None or len(old_deps) != len(new_deps):
+        return True
+
+    try:
+        return any(
+            old is not new and bool(old != new) for old, new in zip(old_deps, new_deps)
+        )
+    except Exception:
+        # Values that can't be compared (e.g. arrays) always count as changed.
+        return True
+
+
+def inputs_did_change(
+    hook: Dict[str, Any],
+    record: TableStateRecord,
+    initial_view: Table.PaginationView,
+    changed_keys: Union[Set[Any], None],
+) -> bool:
+    """
+    Whether a manually paginated table should be refreshed after a re-render.
+    Tables that don't declare what they depend on are always refreshed.
+    `changed_keys` is `None` if any state key may have changed.
+    """
+    depends_on = hook.get("depends_on")
+    deps = hook.get("deps")
+
+    if depends_on is None and deps is None:
+        return True
+
+    # A new initial view replaces the active view.
+    if view_did_change(initial_view, record["initial_view"]):
+        return True
+
+    if deps is not None and deps_did_change(record["deps"], deps):
+        return True
+
+    return depends_on is not None and (
+        changed_keys is None or not changed_keys.isdisjoint(depends_on)
+    )
+
+
 class TableState:
     def __init__(
-        self, scheduler: Scheduler, component_update_cache: ComponentUpdateCache
+        self,
+        scheduler: Scheduler,
+        component_update_cache: ComponentUpdateCache,
+        view_cache: Union[TableViews, None] = None,
+        page_cache: Union[TablePageCache, None] = None,
     ):
         self.state: Dict[str, TableStateRecord] = {}
         self.scheduler = scheduler
         self.component_update_cache = component_update_cache
+        self.view_cache = (
+            view_cache if view_cache is not None else TableViewCache().scope("")
+        )
+        self.page_cache = page_cache if page_cache is not None else TablePageCache()
+        # Cursors returned by the page change functions of manually paginated
+        # tables, by table key. Each table keeps the cursors of a single view
+        # and page size, mapping the offset of a page to the cursor for it.
+        self.cursors: Dict[
+            str, Tuple[str, Dict[int, Tuple[Any, TableCursorDirection.TYPE]]]
+        ] = {}
+        # In-flight page change hooks, by table key.
+        self.page_changes: Dict[str, "asyncio.Future[Any]"] = {}
+        # Results of the count functions of manually paginated tables, by
+        # table key and then by search query and filter.
+        self.counts: Dict[str, Dict[str, int]] = {}
+        # In-flight count functions, by table key.
+        self.count_tasks: Dict[str, Tuple[str, "asyncio.Future[Any]"]] = {}
 
     def generate_key(self, render_id: str, table_id: str) -> str:
         return f"{render_id}{KEY_SEPARATOR}{table_id}"
@@ -115,6 +202,8 @@ class TableState:
             "table_id": table_id,
             "initial_view": state["initial_view"],
             "active_view": {**state["initial_view"]},
+            "query": None,
+            "deps": state.get("deps"),
         }
         self.component_update_cache.set(
             render_id, self._generate_cache_key(table_id), JSON.stringify(state["data"])
@@ -130,6 +219,12 @@ class TableState:
         ):
             self.state[key]["active_view"] = {**state["initial_view"]}  # type: ignore
 
+        # Cached pages and counts may be outdated once the table goes stale.
+        if "stale" in state and state["stale"] != Stale.FALSE:
+            self.page_cache.delete_table(key)
+            self.counts.pop(key, None)
+            self.cancel_count(key)
+
         if "data" in state:
             self.component_update_cache.set(
                 render_id,
@@ -144,8 +239,14 @@ class TableState:
 
         record = self.state[key]
         record["page_update_debouncer"].cleanup()
+        self.cancel_page_change(key)
 
         del self.state[key]
+        self.view_cache.delete_table(key)
+        self.page_cache.delete_table(key)
+        self.cursors.pop(key, None)
+        self.counts.pop(key, None)
+        self.cancel_count(key)
         self.component_update_cache.delete(
             render_id, self._generate_cache_key(table_id)
         )
@@ -154,20 +255,285 @@ class TableState:
         for record in self.get_by_render_id(render_id):
             key = self.generate_key(record["render_id"], record["table_id"])
             record["page_update_debouncer"].cleanup()
+            self.cancel_page_change(key)
             self.component_update_cache.delete(
                 render_id, self._generate_cache_key(record["table_id"])
             )
             del self.state[key]
+            self.view_cache.delete_table(key)
+            self.page_cache.delete_table(key)
+            self.cursors.pop(key, None)
+            self.counts.pop(key, None)
+            self.cancel_count(key)
+
+    def start_page_change(
+        self, render_id: str, table_id: str, page_change: "asyncio.Future[Any]"
+    ) -> None:
+        """
+        Tracks the in-flight page change hook of a table, cancelling the one
+        that it supersedes.
+        """
+        key = self.generate_key(render_id, table_id)
+        self.cancel_page_change(key)
+        self.page_changes[key] = page_change
+
+    def is_latest_page_change(
+        self, render_id: str, table_id: str, page_change: "asyncio.Future[Any]"
+    ) -> bool:
+        key = self.generate_key(render_id, table_id)
+        return self.page_changes.get(key) is page_change
+
+    def finish_page_change(
+        self, render_id: str, table_id: str, page_change: "asyncio.Future[Any]"
+    ) -> None:
+        key = self.generate_key(render_id, table_id)
+
+        if self.page_changes.get(key) is page_change:
+            del self.page_changes[key]
+
+    def cancel_page_change(self, key: str) -> None:
+        page_change = self.page_changes.pop(key, None)
+
+        if page_change is not None and not page_change.done():
+            page_change.cancel()
+
+    def get_cached_count(
+        self, render_id: str, table_id: str, view: Table.PaginationView
+    ) -> Union[int, None]:
+        key = self.generate_key(render_id, table_id)
+        return self.counts.get(key, {}).get(normalize_filter_key(view, None))
+
+    def set_cached_count(
+        self, render_id: str, table_id: str, view: Table.PaginationView, count: int
+    ) -> None:
+        key = self.generate_key(render_id, table_id)
+
+        # The table may have been deleted while it was counted.
+        if key not in self.state:
+            return
+
+        counts = self.counts.setdefault(key, {})
+        counts.pop(normalize_filter_key(view, None), None)
+        counts[normalize_filter_key(view, None)] = count
+
+        if len(counts) > MAX_CACHED_COUNTS_PER_TABLE:
+            del counts[next(iter(counts))]
+
+    def is_counting(
+        self, render_id: str, table_id: str, view: Table.PaginationView
+    ) -> bool:
+        key = self.generate_key(render_id, table_id)
+        entry = self.count_tasks.get(key)
+        return entry is not None and entry[0] == normalize_filter_key(view, None)
+
+    def start_count(
+        self,
+        render_id: str,
+        table_id: str,
+        view: Table.PaginationView,
+        count: "asyncio.Future[Any]",
+    ) -> None:
+        """
+        Tracks the in-flight count function of a table, cancelling the one
+        that it supersedes.
+        """
+        key = self.generate_key(render_id, table_id)
+        self.cancel_count(key)
+        self.count_tasks[key] = (normalize_filter_key(view, None), count)
+
+    def finish_count(
+        self, render_id: str, table_id: str, count: "asyncio.Future[Any]"
+    ) -> None:
+        key = self.generate_key(render_id, table_id)
+        entry = self.count_tasks.get(key)
+
+        if entry is not None and entry[1] is count:
+            del self.count_tasks[key]
+
+    def cancel_count(self, key: str) -> None:
+        entry = self.count_tasks.pop(key, None)
+
+        if entry is not None and not entry[1].done():
+            entry[1].cancel()
 
     def has_queued_update(self, render_id: str, table_id: str) -> bool:
         key = self.generate_key(render_id, table_id)
         return self.state[key]["page_update_debouncer"].has_queued_update
 
+    def get_query(self, render_id: str, table_id: str, rows: List[Any]) -> TableQuery:
+        """
+        Returns the query engine for an auto-paginated table, reusing the
+        existing engine (and its column indexes) if the table's data did not
+        change since the last query.
+        """
+        key = self.generate_key(render_id, table_id)
+        query = self.state[key]["query"]
+
+        if query is None or not query.is_for(rows):
+            query = TableQuery(rows)
+            self.state[key]["query"] = query
+            self.view_cache.delete_table(key)
+
+        return query
+
+    def get_page(
+        self,
+        render_id: str,
+        table_id: str,
+        rows: List[Any],
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+        columns: Union[TableColumns, None] = None,
+    ) -> Tuple[List[Any], int]:
+        """
+        Returns a single page of an auto-paginated table, along with the total
+        number of rows that match the view.
+
+        The filtered row set and sort permutation of each view are cached, so
+        paging through a view only costs as much as the page itself. The
+        cached entries are dropped when the table's data changes.
+        """
+        key = self.generate_key(render_id, table_id)
+        query = self.get_query(render_id, table_id, rows)
+
+        filter_key = normalize_filter_key(view, columns)
+        view_key = normalize_view_key(filter_key, view)
+
+        indices = self.view_cache.get(key, view_key)
+
+        if indices is None:
+            filtered = self.view_cache.get(key, filter_key)
+
+            if filtered is None:
+                filtered = query.filter(view, columns)
+                filtered = ALL_ROWS if filtered is None else filtered
+                self.view_cache.set(key, filter_key, filtered)
+
+            if len(view["sort_by"]) == 0:
+                indices = filtered
+            else:
+                indices = query.sort(
+                    query.all_indices() if filtered is ALL_ROWS else filtered,
+                    view["sort_by"],
+                )
+                self.view_cache.set(key, view_key, indices)
+
+        if indices is ALL_ROWS:
+            return list(rows[offset : offset + page_size]), query.row_count
+
+        return query.take(indices, offset, page_size), len(indices)
+
+    def get_cached_page(
+        self,
+        render_id: str,
+        table_id: str,
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+    ) -> Union[CachedPage, None]:
+        """
+        Returns a page of a manually paginated table that was cached by an
+        earlier page change or prefetch, if the table's view didn't change
+        since then.
+        """
+        key = self.generate_key(render_id, table_id)
+        return self.page_cache.get(key, get_page_view_key(view), offset, page_size)
+
+    def set_cached_page(
+        self,
+        render_id: str,
+        table_id: str,
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+        page: CachedPage,
+        generation: Union[int, None] = None,
+    ) -> None:
+        key = self.generate_key(render_id, table_id)
+        self.page_cache.set(
+            key, get_page_view_key(view), offset, page_size, page, generation
+        )
+
+    def get_cursor(
+        self,
+        render_id: str,
+        table_id: str,
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+    ) -> Tuple[Any, Union[TableCursorDirection.TYPE, None]]:
+        """
+        Returns the cursor for the page at `offset` and its direction, if an
+        adjacent page of the same view returned one.
+        """
+        key = self.generate_key(render_id, table_id)
+        entry = self.cursors.get(key)
+
+        if entry is None or entry[0] != self._cursor_view_key(view, page_size):
+            return None, None
+
+        return entry[1].get(offset, (None, None))
+
+    def set_cursors(
+        self,
+        render_id: str,
+        table_id: str,
+        view: Table.PaginationView,
+        offset: int,
+        page_size: int,
+        response: TablePageChangeResponse,
+    ) -> None:
+        """
+        Stores the cursors that a page returned for its adjacent pages.
+        Cursors are kept when the table goes stale, since they point to a
+        position in the view rather than to its rows.
+        """
+        next_cursor = response.get("next_cursor")
+        prev_cursor = response.get("prev_cursor")
+
+        if next_cursor is None and prev_cursor is None:
+            return
+
+        key = self.generate_key(render_id, table_id)
+
+        # The table may have been deleted while its page was fetched.
+        if key not in self.state:
+            return
+
+        view_key = self._cursor_view_key(view, page_size)
+        entry = self.cursors.get(key)
+
+        if entry is None or entry[0] != view_key:
+            entry = (view_key, {})
+            self.cursors[key] = entry
+
+        if next_cursor is not None:
+            entry[1][offset + page_size] = (next_cursor, "next")
+
+        if prev_cursor is not None and offset - page_size >= 0:
+            entry[1][offset - page_size] = (prev_cursor, "prev")
+
+    @staticmethod
+    def _cursor_view_key(view: Table.PaginationView, page_size: int) -> str:
+        return f"{page_size}{get_page_view_key(view)}"
+
     def cleanup(self) -> None:
         for record in self.state.values():
             record["page_update_debouncer"].cleanup()
 
+        for key in list(self.page_changes):
+            self.cancel_page_change(key)
+
+        for key in list(self.count_tasks):
+            self.cancel_count(key)
+
+        self.counts.clear()
+
         self.state.clear()
+        self.view_cache.clear()
+        self.page_cache.clear()
+        self.cursors.clear()
 
     def get_cached_table_data(
         self, render_id: str, table_id: str
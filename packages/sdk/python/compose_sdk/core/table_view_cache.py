@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Union
+
+import numpy
+
+from .json import JSON
+from .table_query import IndexArray
+from .ui.types import Table, TableColumns
+
+# 64 MB fits the sort permutation and filter set for a handful of views over a
+# million row table. The budget is shared by every execution in the process.
+DEFAULT_MEMORY_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Represents a view (or the filter portion of a view) that doesn't narrow the
+# table. Caching a sentinel avoids re-evaluating the view to find out.
+ALL_ROWS = numpy.empty(0, dtype=numpy.int64)
+
+
+def normalize_filter_key(
+    view: Table.PaginationView, columns: Union[TableColumns, None]
+) -> str:
+    """
+    Serializes the parts of a view that determine which rows match it. The
+    columns are included since they control which keys are searched and how
+    dates are compared.
+    """
+    return JSON.stringify(
+        {
+            "search_query": view["search_query"] or None,
+            "filter_by": view["filter_by"],
+            "columns": columns,
+        }
+    )
+
+
+def normalize_view_key(filter_key: str, view: Table.PaginationView) -> str:
+    """
+    Serializes the parts of a view that determine which rows match it and the
+    order they are returned in. `view_by` is omitted since it's only a label.
+    """
+    sort_by = [[rule["key"], rule["direction"]] for rule in view["sort_by"]]
+    return f"{filter_key}{JSON.stringify(sort_by)}"
+
+
+class TableViewCache:
+    """
+    An LRU cache of row indices for auto-paginated tables, bounded by the
+    total size of the cached arrays.
+
+    Entries are stored per table, so that a table's entries can be dropped
+    together once its data changes. A single cache is shared by every
+    execution, each using its own `scope`.
+    """
+
+    def __init__(self, memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.memory_bytes = 0
+        self._cache: "OrderedDict[Tuple[str, str], IndexArray]" = OrderedDict()
+        self._keys_by_table: Dict[str, Dict[str, None]] = {}
+
+    def get(self, table_key: str, entry_key: str) -> Union[IndexArray, None]:
+        key = (table_key, entry_key)
+        indices = self._cache.get(key)
+
+        if indices is not None:
+            self._cache.move_to_end(key)
+
+        return indices
+
+    def set(self, table_key: str, entry_key: str, indices: IndexArray) -> None:
+        key = (table_key, entry_key)
+
+        if key in self._cache:
+            self._remove(key)
+
+        # Entries that would take up the entire budget are never cached.
+        if indices.nbytes > self.memory_budget_bytes:
+            return
+
+        self._cache[key] = indices
+        self._keys_by_table.setdefault(table_key, {})[entry_key] = None
+        self.memory_bytes += indices.nbytes
+
+        while self.memory_bytes > self.memory_budget_bytes:
+            self._remove(next(iter(self._cache)))
+
+    def delete_table(self, table_key: str) -> None:
+        for entry_key in list(self._keys_by_table.get(table_key, {})):
+            self._remove((table_key, entry_key))
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._keys_by_table.clear()
+        self.memory_bytes = 0
+
+    def count(self, table_key: str) -> int:
+        return len(self._keys_by_table.get(table_key, {}))
+
+    def scope(self, owner: str) -> "TableViews":
+        return TableViews(self, owner)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        indices = self._cache.pop(key)
+        self.memory_bytes -= indices.nbytes
+
+        table_key, entry_key = key
+        table_keys: Dict[str, Any] = self._keys_by_table[table_key]
+        del table_keys[entry_key]
+
+        if len(table_keys) == 0:
+            del self._keys_by_table[table_key]
+
+
+class TableViews:
+    """
+    The entries that an owner (e.g. an execution) keeps in a shared
+    `TableViewCache`. Table keys are namespaced by the owner, so owners never
+    see each other's entries.
+    """
+
+    def __init__(self, cache: TableViewCache, owner: str) -> None:
+        self.cache = cache
+        self.owner = owner
+        # Tables of the owner that may have entries in the cache.
+        self._table_keys: Dict[str, None] = {}
+
+    def get(self, table_key: str, entry_key: str) -> Union[IndexArray, None]:
+        return self.cache.get(self.__key(table_key), entry_key)
+
+    def set(self, table_key: str, entry_key: str, indices: IndexArray) -> None:
+        self._table_keys[table_key] = None
+        self.cache.set(self.__key(table_key), entry_key, indices)
+
+    def delete_table(self, table_key: str) -> None:
+        self._table_keys.pop(table_key, None)
+        self.cache.delete_table(self.__key(table_key))
+
+    def clear(self) -> None:
+        for table_key in list(self._table_keys):
+            self.delete_table(table_key)
+
+    def __len__(self) -> int:
+        return sum(
+            self.cache.count(self.__key(table_key)) for table_key in self._table_keys
+        )
+
+    def __key(self, table_key: str) -> str:
+        return f"{self.owner}:{table_key}"
@@ -46,6 +46,7 @@ from .types import (
     TableTagColors,
     TablePageChangeArgs,
     TablePageChangeResponse,
+    TableCountArgs,
     TableDefault,
     TablePagination,
     Stale,
@@ -111,6 +112,7 @@ __all__ = [
     "TableTagColors",
     "TablePageChangeArgs",
     "TablePageChangeResponse",
+    "TableCountArgs",
     "TableDefault",
     "TablePagination",
     "Stale",
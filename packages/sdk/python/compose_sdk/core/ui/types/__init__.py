@@ -33,8 +33,10 @@ from .table import (
     TableTagColors,
     TablePageChangeArgs,
     TablePageChangeResponse,
+    TableCountArgs,
     TableDefault,
     TablePagination,
+    TableCursorDirection,
     TABLE_COLUMN_OVERFLOW,
     TableColumnSortRule,
     Table,
@@ -106,8 +108,10 @@ __all__ = [
     "TableTagColors",
     "TablePageChangeArgs",
     "TablePageChangeResponse",
+    "TableCountArgs",
     "TableDefault",
     "TablePagination",
+    "TableCursorDirection",
     "Stale",
     "NumberFormat",
     "TABLE_COLUMN_OVERFLOW",
@@ -14,8 +14,10 @@ from .table import (
     TableTagColors,
     TablePageChangeArgs,
     TablePageChangeResponse,
+    TableCountArgs,
     TableDefault,
     TablePagination,
+    TableCursorDirection,
     TABLE_COLUMN_OVERFLOW,
     TableColumnSortRule,
     Table,
@@ -39,8 +41,10 @@ __all__ = [
     "TableTagColors",
     "TablePageChangeArgs",
     "TablePageChangeResponse",
+    "TableCountArgs",
     "TableDefault",
     "TablePagination",
+    "TableCursorDirection",
     "TABLE_COLUMN_OVERFLOW",
     "TableColumnSortRule",
     "Table",
@@ -52,6 +52,12 @@ For example:
 """
 
 
+class TableCursorDirection:
+    NEXT = "next"
+    PREV = "prev"
+    TYPE = Literal["next", "prev"]
+
+
 class TablePageChangeArgs(TypedDict):
     """
     The arguments for a table page change event.
@@ -59,6 +65,12 @@ class TablePageChangeArgs(TypedDict):
     The following properties are available:
     - `offset`: The offset of the first record to return.
     - `page_size`: The number of records to return.
+    - `cursor`: The cursor that was returned by an adjacent page, or `None`.
+    Use it to query the page by key (e.g. `WHERE id > cursor`) instead of by
+    offset.
+    - `cursor_direction`: `"next"` if `cursor` is the `next_cursor` of the
+    previous page, `"prev"` if it's the `prev_cursor` of the next page, or
+    `None`.
     - `refresh_total_records`: Whether to refresh the total number of records.
     - `prev_total_records`: The previous total number of records. Return this if `refresh_total_records` is `False`.
     - `search_query`: The search query to filter the table by.
@@ -74,6 +86,8 @@ class TablePageChangeArgs(TypedDict):
     filter_by: TableColumnFilterModel
     refresh_total_records: bool
     prev_search_query: Union[str, None]  # deprecated
+    cursor: Any
+    cursor_direction: Union[TableCursorDirection.TYPE, None]
 
 
 class TablePageChangeResponse(TypedDict):
@@ -82,11 +96,20 @@ class TablePageChangeResponse(TypedDict):
 
     Required properties:
     - `data`: A list of table rows that represents the current page of data.
-    - `total_records`: The total number of records in the table.
+    - `total_records`: The total number of records in the table. Optional if
+    the table has a `count` function, which counts the records instead.
+
+    Optional properties:
+    - `next_cursor`: An opaque cursor for the page after this one (e.g. the
+    key of its last row), which is passed back when the user moves forward.
+    - `prev_cursor`: An opaque cursor for the page before this one (e.g. the
+    key of its first row), which is passed back when the user moves back.
     """
 
     data: List[Any]
-    total_records: int
+    total_records: NotRequired[int]
+    next_cursor: NotRequired[Any]
+    prev_cursor: NotRequired[Any]
 
 
 TableOnPageChangeSync = Callable[
@@ -100,6 +123,24 @@ TableOnPageChangeAsync = Callable[
 ]
 
 
+class TableCountArgs(TypedDict):
+    """
+    The arguments for a table count function.
+
+    The following properties are available:
+    - `search_query`: The search query to filter the table by.
+    - `filter_by`: The filter model to filter the table by.
+    """
+
+    search_query: Union[str, None]
+    filter_by: TableColumnFilterModel
+
+
+TableOnCountSync = Callable[[TableCountArgs], int]
+
+TableOnCountAsync = Callable[[TableCountArgs], Awaitable[int]]
+
+
 TAG_COLORS = Literal[
     "red",
     "orange",
@@ -311,6 +352,7 @@ class Table:
         TYPE = Literal["single", True, False]
 
     Density = TableDensity
+    CursorDirection = TableCursorDirection
 
     class SelectionReturn:
         FULL = "full"
@@ -325,6 +367,8 @@ class Table:
 
     OnPageChangeSync: TypeAlias = TableOnPageChangeSync
     OnPageChangeAsync: TypeAlias = TableOnPageChangeAsync
+    OnCountSync: TypeAlias = TableOnCountSync
+    OnCountAsync: TypeAlias = TableOnCountAsync
 
     ColumnSortRule: TypeAlias = TableColumnSortRule
 
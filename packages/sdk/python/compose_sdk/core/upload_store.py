@@ -0,0 +1,226 @@
+import asyncio
+import collections
+import tempfile
+import time
+from typing import IO, Iterator, MutableMapping, TypedDict, Union
+
+from .file import FileContent
+
+DEFAULT_MEMORY_BUDGET_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 60 * 60
+
+# How often `expire_periodically` discards expired uploads, at most.
+EXPIRE_INTERVAL_SECONDS = 60
+
+
+class UploadStoreMetrics(TypedDict):
+    # Uploads waiting to be claimed by a form submission.
+    count: int
+    # Size of the uploads that are kept in memory.
+    memory_bytes: int
+    # Size of the uploads that were spilled to disk.
+    disk_bytes: int
+
+
+class _Upload:
+    __slots__ = ("owner", "content", "size", "created_at")
+
+    def __init__(self, owner: str, content: FileContent, size: int) -> None:
+        self.owner = owner
+        self.content = content
+        self.size = size
+        self.created_at = time.monotonic()
+
+    @property
+    def on_disk(self) -> bool:
+        return not isinstance(self.content, (bytes, bytearray, memoryview))
+
+
+class UploadStore:
+    """
+    Holds the files that users upload until a form that uses them is
+    submitted. Shared by every execution in the process.
+
+    Uploads are kept in memory up to `memory_budget_bytes` in total, past
+    which the oldest uploads are spilled to temporary files. Uploads that
+    aren't claimed within `ttl_seconds` are discarded, the next time an
+    upload is stored or read, or by `expire_periodically`.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        spill_dir: Union[str, None] = None,
+    ) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir
+
+        # Ordered by upload time, oldest first.
+        self.uploads: "collections.OrderedDict[str, _Upload]" = (
+            collections.OrderedDict()
+        )
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+
+    def put(self, owner: str, file_id: str, content: FileContent) -> None:
+        self.expire()
+        self.discard(file_id)
+
+        size = (
+            len(content)
+            if isinstance(content, (bytes, bytearray))
+            else (
+                content.nbytes
+                if isinstance(content, memoryview)
+                else self.__stream_size(content)
+            )
+        )
+
+        upload = _Upload(owner, content, size)
+        self.uploads[file_id] = upload
+
+        if upload.on_disk:
+            self.disk_bytes += size
+            return
+
+        self.memory_bytes += size
+
+        if size > self.memory_budget_bytes:
+            self.__spill(upload)
+
+        for other in list(self.uploads.values()):
+            if self.memory_bytes <= self.memory_budget_bytes:
+                break
+
+            if not other.on_disk:
+                self.__spill(other)
+
+    def get(self, owner: str, file_id: str) -> FileContent:
+        self.expire()
+        upload = self.uploads.get(file_id)
+
+        if upload is None or upload.owner != owner:
+            raise KeyError(file_id)
+
+        return upload.content
+
+    def pop(self, owner: str, file_id: str) -> FileContent:
+        """
+        Removes an upload from the store and returns its content. The caller
+        takes ownership of the content.
+        """
+        content = self.get(owner, file_id)
+        self.__remove(file_id)
+        return content
+
+    def discard(self, file_id: str) -> None:
+        if file_id not in self.uploads:
+            return
+
+        content = self.uploads[file_id].content
+        self.__remove(file_id)
+
+        if not isinstance(content, (bytes, bytearray, memoryview)):
+            content.close()
+
+    def discard_owner(self, owner: str) -> None:
+        for file_id in self.file_ids(owner):
+            self.discard(file_id)
+
+    def expire(self) -> None:
+        now = time.monotonic()
+
+        while self.uploads:
+            file_id, upload = next(iter(self.uploads.items()))
+
+            if now - upload.created_at < self.ttl_seconds:
+                return
+
+            self.discard(file_id)
+
+    async def expire_periodically(self) -> None:
+        """
+        Discards expired uploads until cancelled, so that uploads expire
+        even when no other uploads are stored or read.
+        """
+        interval = min(self.ttl_seconds, EXPIRE_INTERVAL_SECONDS)
+
+        while True:
+            await asyncio.sleep(interval)
+            self.expire()
+
+    def file_ids(self, owner: str) -> Iterator[str]:
+        return iter(
+            [
+                file_id
+                for file_id, upload in self.uploads.items()
+                if upload.owner == owner
+            ]
+        )
+
+    def scope(self, owner: str) -> "Uploads":
+        return Uploads(self, owner)
+
+    def metrics(self) -> UploadStoreMetrics:
+        return {
+            "count": len(self.uploads),
+            "memory_bytes": self.memory_bytes,
+            "disk_bytes": self.disk_bytes,
+        }
+
+    def __remove(self, file_id: str) -> None:
+        upload = self.uploads.pop(file_id)
+
+        if upload.on_disk:
+            self.disk_bytes -= upload.size
+        else:
+            self.memory_bytes -= upload.size
+
+    def __spill(self, upload: _Upload) -> None:
+        file = tempfile.TemporaryFile(dir=self.spill_dir)
+        file.write(upload.content)  # type: ignore[arg-type]
+        file.seek(0)
+
+        upload.content = file
+        self.memory_bytes -= upload.size
+        self.disk_bytes += upload.size
+
+    @staticmethod
+    def __stream_size(stream: IO[bytes]) -> int:
+        position = stream.tell()
+        size = stream.seek(0, 2)
+        stream.seek(position)
+        return size
+
+
+class Uploads(MutableMapping[str, FileContent]):
+    """
+    The uploads of a single execution, as a mapping from file ID to content.
+    Deleting an upload hands its content over to the caller, rather than
+    closing it.
+    """
+
+    def __init__(self, store: UploadStore, owner: str) -> None:
+        self.store = store
+        self.owner = owner
+
+    def __getitem__(self, file_id: str) -> FileContent:
+        return self.store.get(self.owner, file_id)
+
+    def __setitem__(self, file_id: str, content: FileContent) -> None:
+        self.store.put(self.owner, file_id, content)
+
+    def __delitem__(self, file_id: str) -> None:
+        self.store.pop(self.owner, file_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.store.file_ids(self.owner)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.store.file_ids(self.owner))
+
+    def discard_all(self) -> None:
+        self.store.discard_owner(self.owner)
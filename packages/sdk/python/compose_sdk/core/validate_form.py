@@ -13,7 +13,7 @@ class ValidateForm:
         self.run_hook_function = run_hook_function
 
     @staticmethod
-    def hydrate_form_data(form_data, component_tree, temp_files):
+    def hydrate_form_data(form_data, component_tree, temp_files, index=None):
         hydrated = {}
         temp_files_to_delete = []
 
@@ -73,7 +73,17 @@ class ValidateForm:
                         except Exception:
                             hydrated[key] = data["value"]
                     elif data["type"] == TYPE.INPUT_TABLE:
-                        component = StaticTree.find_component.by_id(component_tree, key)
+                        if index is not None:
+                            component = (
+                                index.get(key)
+                                if index.get_form_id(key)
+                                == component_tree["model"]["id"]
+                                else None
+                            )
+                        else:
+                            component = StaticTree.find_component.by_id(
+                                component_tree, key
+                            )
 
                         if (
                             component is not None
@@ -124,14 +134,12 @@ class ValidateForm:
 
         return hydrated, temp_files_to_delete
 
-    async def get_form_input_errors(self, form_data, static_layout):
+    async def get_form_input_errors(self, form_data, index):
         input_errors = {}
         has_errors = False
 
         for component_id, data in form_data.items():
-            input_component = StaticTree.find_component.by_id(
-                static_layout, component_id
-            )
+            input_component = index.get(component_id)
 
             if (
                 input_component is None
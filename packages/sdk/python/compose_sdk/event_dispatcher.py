@@ -0,0 +1,258 @@
+import asyncio
+import collections
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Set,
+    TypedDict,
+    Union,
+)
+
+from .core import EventType
+
+# Events that only carry the latest value of something, so that a newer
+# event makes the older ones redundant. Older events that are still waiting
+# are dropped, and an older event that's being handled is cancelled.
+COALESCABLE_EVENT_KEYS: Dict[str, tuple[str, ...]] = {
+    EventType.ServerToSdk.ON_TABLE_PAGE_CHANGE_HOOK: ("renderId", "componentId"),
+}
+
+# Replies to something that a running handler is waiting for. They're
+# handled right away, since queueing them behind the handler that's waiting
+# for them would deadlock the execution.
+UNORDERED_EVENT_TYPES = {
+    EventType.ServerToSdk.ON_CONFIRM_RESPONSE_HOOK,
+    EventType.ServerToSdk.ON_CLOSE_MODAL,
+}
+
+
+def get_coalesce_key(event: Dict[str, Any]) -> Union[Hashable, None]:
+    """
+    Returns a key that's shared by the events that coalesce with each other,
+    or `None` if the event can't be coalesced.
+    """
+    if event["type"] not in COALESCABLE_EVENT_KEYS:
+        return None
+
+    fields = COALESCABLE_EVENT_KEYS[event["type"]]
+
+    return (event["type"], *(event.get(field) for field in fields))
+
+
+class EventDispatcherMetrics(TypedDict):
+    # Executions with events that are waiting or being handled.
+    mailboxes: int
+    # Events waiting to be handled, across every mailbox.
+    depth: int
+    # Highest depth seen so far.
+    max_depth: int
+    # Events dropped or cancelled because a newer event made them redundant.
+    coalesced: int
+    # Events that were handled in order.
+    handled: int
+    # Time that events waited in their mailbox before being handled.
+    average_wait_ms: float
+    max_wait_ms: float
+
+
+class _Entry:
+    __slots__ = ("event", "key", "enqueued_at", "alive")
+
+    def __init__(self, event: Dict[str, Any], key: Union[Hashable, None]) -> None:
+        self.event = event
+        self.key = key
+        self.enqueued_at = time.monotonic()
+        self.alive = True
+
+
+class _Mailbox:
+    __slots__ = ("entries", "keys", "running", "running_by_key", "changed")
+
+    def __init__(self) -> None:
+        self.entries: Deque[_Entry] = collections.deque()
+        # Waiting entries by coalesce key.
+        self.keys: Dict[Hashable, _Entry] = {}
+        # Events that are being handled, and the coalescable ones by key.
+        self.running: Set["asyncio.Future[None]"] = set()
+        self.running_by_key: Dict[Hashable, "asyncio.Future[None]"] = {}
+        # Set when an event is added.
+        self.changed = asyncio.Event()
+
+    def start(
+        self, key: Union[Hashable, None], running: "asyncio.Future[None]"
+    ) -> None:
+        self.running.add(running)
+
+        if key is not None:
+            self.running_by_key[key] = running
+
+        def done(running: "asyncio.Future[None]") -> None:
+            self.running.discard(running)
+
+            if key is not None and self.running_by_key.get(key) is running:
+                del self.running_by_key[key]
+
+        running.add_done_callback(done)
+
+
+class EventDispatcher:
+    """
+    Dispatches browser events to `handle`, through one mailbox per
+    execution. Events of an execution are started in the order they
+    arrived, and the events of up to `max_concurrency` executions are
+    handled at a time. An execution keeps its slot until all of its events
+    are handled.
+
+    By default, an event is started without waiting for the previous event
+    of its execution to be handled. With `max_hold_seconds`, an event holds
+    its mailbox until it's handled, or for at most `max_hold_seconds`, so
+    that the events of an execution are handled one at a time. This gives
+    up two things:
+    - Handlers that run for longer than the hold are overtaken by the next
+      event, so the order is only kept for handlers that finish within it.
+    - Handlers that wait for a later event of their own execution (e.g. a
+      modal form that waits to be submitted) delay it by the hold, since it
+      can't start before the hold expires.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[Dict[str, Any]], Awaitable[None]],
+        *,
+        max_concurrency: Union[int, None] = None,
+        max_hold_seconds: Union[float, None] = None,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("'max_concurrency' must be a positive integer")
+
+        self.handle = handle
+        self.max_concurrency = max_concurrency
+        self.max_hold_seconds = max_hold_seconds
+
+        self.mailboxes: Dict[str, _Mailbox] = {}
+        # Created once the event loop is running.
+        self.semaphore: Union[asyncio.Semaphore, None] = None
+
+        self.depth = 0
+        self.max_depth = 0
+        self.coalesced = 0
+        self.handled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def dispatch(self, event: Dict[str, Any]) -> None:
+        execution_id = event.get("executionId")
+
+        if execution_id is None or event["type"] in UNORDERED_EVENT_TYPES:
+            await self.handle(event)
+            return
+
+        if self.max_concurrency is not None and self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        mailbox = self.mailboxes.get(execution_id)
+
+        if mailbox is None:
+            mailbox = _Mailbox()
+            self.mailboxes[execution_id] = mailbox
+            task = asyncio.get_running_loop().create_task(
+                self.__drain(execution_id, mailbox)
+            )
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        entry = _Entry(event, get_coalesce_key(event))
+
+        if entry.key is not None:
+            previous = mailbox.keys.get(entry.key)
+
+            if previous is not None and previous.alive:
+                previous.alive = False
+                self.depth -= 1
+                self.coalesced += 1
+
+            mailbox.keys[entry.key] = entry
+            running = mailbox.running_by_key.get(entry.key)
+
+            if running is not None and not running.done():
+                running.cancel()
+                self.coalesced += 1
+
+        mailbox.entries.append(entry)
+        mailbox.changed.set()
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+    def metrics(self) -> EventDispatcherMetrics:
+        return {
+            "mailboxes": len(self.mailboxes),
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "coalesced": self.coalesced,
+            "handled": self.handled,
+            "average_wait_ms": (
+                self.total_wait / self.handled * 1000 if self.handled > 0 else 0.0
+            ),
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    async def __drain(self, execution_id: str, mailbox: _Mailbox) -> None:
+        try:
+            # The execution keeps its slot until all of its events are
+            # handled, including the ones that outlive their hold.
+            if self.semaphore is not None:
+                await self.semaphore.acquire()
+
+            try:
+                await self.__handle_entries(mailbox)
+            finally:
+                if self.semaphore is not None:
+                    self.semaphore.release()
+        finally:
+            del self.mailboxes[execution_id]
+
+    async def __handle_entries(self, mailbox: _Mailbox) -> None:
+        while True:
+            mailbox.changed.clear()
+
+            if not mailbox.entries:
+                if not mailbox.running:
+                    return
+
+                # Waits for a running event to finish, or for a new event,
+                # which may be what a running handler is waiting for.
+                changed = asyncio.ensure_future(mailbox.changed.wait())
+                waiting: Set["asyncio.Future[Any]"] = {changed, *mailbox.running}
+
+                try:
+                    await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    changed.cancel()
+
+                continue
+
+            entry = mailbox.entries.popleft()
+
+            if not entry.alive:
+                continue
+
+            entry.alive = False
+            self.depth -= 1
+
+            if entry.key is not None and mailbox.keys.get(entry.key) is entry:
+                del mailbox.keys[entry.key]
+
+            wait = time.monotonic() - entry.enqueued_at
+            self.handled += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+            running = asyncio.ensure_future(self.handle(entry.event))
+            mailbox.start(entry.key, running)
+
+            if self.max_hold_seconds is not None:
+                await asyncio.wait({running}, timeout=self.max_hold_seconds)
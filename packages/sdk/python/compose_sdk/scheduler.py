@@ -95,6 +95,9 @@ class Scheduler:
         • *Non-blocking* mode – submits ``fn`` to the internal
           :class:`ThreadPoolExecutor` and blocks until the result is available.
 
+        Coroutines should use :py:meth:`run_sync_async` instead, since
+        blocking the event-loop would stall every other execution.
+
         Returns
         -------
         Any
@@ -117,6 +120,33 @@ class Scheduler:
             future = self._executor.submit(fn, *args, **kwargs)
             return future.result()
 
+    async def run_sync_async(
+        self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> Any:
+        """Awaitable counterpart of :py:meth:`run_sync`.
+
+        • *Blocking* mode – calls ``fn`` directly on the caller's thread.
+
+        • *Non-blocking* mode – submits ``fn`` to the internal
+          :class:`ThreadPoolExecutor` and awaits the result, so that the
+          event-loop keeps serving other coroutines while ``fn`` runs.
+
+        Returns
+        -------
+        Any
+            Whatever ``fn`` returns.
+        """
+        if self._is_blocking:
+            return fn(*args, **kwargs)
+        else:
+            if self._executor is None:  # should never happen
+                raise RuntimeError(
+                    "Scheduler was created as blocking=False, but executor is missing"
+                )
+
+            future = self._executor.submit(fn, *args, **kwargs)
+            return await asyncio.wrap_future(future)
+
     def run_async(
         self,
         coro: Coroutine[Any, Any, Any],
@@ -0,0 +1,211 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import multiprocessing.connection
+import threading
+import zlib
+from typing import Any, Callable, Coroutine, Dict, List, Union
+
+from .api import encode_sdk_message
+from .core import EventType, Debug
+from .core.file_stream import FilePieces, join_pieces
+
+Connection = multiprocessing.connection.Connection
+
+# Workers are forked so that they inherit the app definitions, which usually
+# contain closures that can't be pickled.
+START_METHOD = "fork"
+
+# Events without an `executionId` are handled by the first worker.
+DEFAULT_SHARD = 0
+
+
+def is_supported() -> bool:
+    return START_METHOD in multiprocessing.get_all_start_methods()
+
+
+class WorkerApiHandler:
+    """
+    Stands in for the `ApiHandler` inside a worker process. Messages are
+    encoded in the worker and relayed to the supervisor, which writes them
+    to the websocket as-is.
+    """
+
+    def __init__(self, conn: Connection, *, debug: bool = False) -> None:
+        self.conn = conn
+        self.debug = debug
+        # Writes to the pipe block while it's full, so they run in a thread.
+        # A single thread keeps the messages in the order they were sent.
+        self.writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def send_raw(self, data: Union[bytes, bytearray]) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.writer, self.conn.send_bytes, data)
+
+    async def send_stream(self, header: bytes, pieces: FilePieces) -> None:
+        # The supervisor chunks large messages, if chunking is enabled.
+        await self.send_raw(await join_pieces(header, pieces))
+
+    async def send(
+        self,
+        data: Dict[str, Any],
+        sessionId: Union[str, None] = None,
+        executionId: Union[str, None] = None,
+    ) -> None:
+        if self.debug:
+            data_type_pretty = EventType.SdkToServerPretty.get(data["type"], "Unknown")
+            Debug.log("Send websocket message", f"{data_type_pretty}")
+
+        await self.send_raw(encode_sdk_message(data, sessionId, executionId))
+
+
+class WorkerPool:
+    """
+    Shards executions across forked worker processes by `executionId`.
+
+    The supervisor process keeps the websocket connection. Browser events are
+    forwarded to the worker that owns the execution, and the messages that
+    workers send are relayed back to the websocket.
+
+    Each worker runs `serve(conn)`, which should read events from `conn`
+    until it receives `None` or the connection is closed.
+    """
+
+    def __init__(self, size: int, serve: Callable[[Connection], None]) -> None:
+        self.size = size
+        self.serve = serve
+        self.conns: List[Connection] = []
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self.relays_done: List[threading.Event] = []
+
+    def start(self) -> None:
+        """
+        Forks the workers. Should be called before the scheduler starts any
+        threads, since only the calling thread survives a fork.
+        """
+        context: Any = multiprocessing.get_context(START_METHOD)
+
+        for _ in range(self.size):
+            conn, worker_conn = context.Pipe()
+
+            process = context.Process(
+                target=self.__run_worker,
+                args=(worker_conn, [*self.conns, conn]),
+                daemon=True,
+            )
+            process.start()
+            worker_conn.close()
+
+            self.conns.append(conn)
+            self.processes.append(process)
+
+    def __run_worker(
+        self, conn: Connection, supervisor_conns: List[Connection]
+    ) -> None:
+        # Close the inherited supervisor ends, so that the worker sees EOF
+        # once the supervisor goes away.
+        for supervisor_conn in supervisor_conns:
+            supervisor_conn.close()
+
+        self.serve(conn)
+
+    def shard(self, execution_id: Union[str, None]) -> int:
+        if execution_id is None:
+            return DEFAULT_SHARD
+
+        return zlib.crc32(execution_id.encode("utf-8")) % self.size
+
+    async def dispatch(self, event: Dict[str, Any]) -> None:
+        if event["type"] == EventType.ServerToSdk.BROWSER_SESSION_ENDED:
+            self.broadcast(event)
+            return
+
+        shard = self.shard(event.get("executionId"))
+
+        if event["type"] == EventType.ServerToSdk.START_EXECUTION:
+            # Workers clean up the previous executions of the browser session
+            # when they start a new one, but those may live on other workers.
+            session_ended = {
+                "type": EventType.ServerToSdk.BROWSER_SESSION_ENDED,
+                "sessionId": event["sessionId"],
+            }
+
+            for idx, conn in enumerate(self.conns):
+                if idx != shard:
+                    conn.send(session_ended)
+
+        if isinstance(event.get("fileContents"), memoryview):
+            # Views can't be pickled.
+            event = {**event, "fileContents": bytes(event["fileContents"])}
+
+        self.conns[shard].send(event)
+
+    def broadcast(self, event: Dict[str, Any]) -> None:
+        for conn in self.conns:
+            conn.send(event)
+
+    def relay(
+        self, send_raw: Callable[[bytes], Coroutine[Any, Any, None]]
+    ) -> List[Coroutine[Any, Any, None]]:
+        """
+        Returns one coroutine per worker that forwards the messages sent by
+        the worker to `send_raw`, in order.
+        """
+        self.relays_done = [threading.Event() for _ in self.conns]
+
+        return [
+            self.__relay(conn, send_raw, done)
+            for conn, done in zip(self.conns, self.relays_done)
+        ]
+
+    async def __relay(
+        self,
+        conn: Connection,
+        send_raw: Callable[[bytes], Coroutine[Any, Any, None]],
+        done: threading.Event,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fileno = conn.fileno()
+        loop.add_reader(fileno, readable.set)
+
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+
+                while conn.poll():
+                    try:
+                        data = conn.recv_bytes()
+                    except (EOFError, OSError):
+                        return
+
+                    await send_raw(data)
+        finally:
+            loop.remove_reader(fileno)
+            done.set()
+
+    def shutdown(self) -> None:
+        # Workers stop on `None`. Their connections close once they exit,
+        # which also stops the relays.
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+
+        for process in self.processes:
+            process.join(timeout=5)
+
+            if process.is_alive():
+                process.terminate()
+
+        for done in self.relays_done:
+            done.wait(timeout=1)
+
+        for conn in self.conns:
+            conn.close()
+
+        self.conns = []
+        self.processes = []
+        self.relays_done = []
@@ -0,0 +1,52 @@
+from compose_sdk.core import ComponentInstance as ui, StaticTree
+from compose_sdk.core.component_update_cache import ComponentUpdateCache
+
+
+def build_layout():
+    return ui.stack(
+        [
+            ui.text_input("name"),
+            ui.form("form", ui.stack([ui.text_input("email"), ui.number_input("age")])),
+        ]
+    )
+
+
+def test_indexes_components_parents_and_forms():
+    layout = build_layout()
+    index = StaticTree.component_index.build(layout)
+
+    email = index.get("email")
+    parent = index.get_parent("email")
+
+    assert email is not None and email["model"]["id"] == "email"
+    assert parent is not None and parent["model"]["children"][0] is email
+    assert index.get_form_id("email") == "form"
+    assert index.get_form_id("form") == "form"
+    assert index.get_form_id("name") is None
+    assert index.get("missing") is None
+    assert index.get_parent(layout["model"]["id"]) is None
+
+
+def test_matches_find_component_for_every_id():
+    layout = build_layout()
+    index = StaticTree.component_index.build(layout)
+
+    for component_id in ["name", "form", "email", "age", layout["model"]["id"]]:
+        assert index.get(component_id) is StaticTree.find_component.by_id(
+            layout, component_id
+        )
+
+
+def test_diff_returns_index_with_old_ids_applied():
+    old_layout = build_layout()
+    new_layout = build_layout()
+    old_root_id = old_layout["model"]["id"]
+
+    diff = StaticTree.diff(old_layout, new_layout, "render-id", ComponentUpdateCache())
+
+    index = diff["index"]
+    root = index.get(old_root_id)
+
+    assert root is diff["new_layout_with_ids_applied"]
+    assert index.get_parent("form") is root
+    assert len(index) == 6
@@ -0,0 +1,70 @@
+from compose_sdk.core import ComponentInstance as ui, StaticTree
+from compose_sdk.core.component_update_cache import (
+    DIGEST_SIZE_BYTES,
+    ComponentUpdateCache,
+)
+
+
+def build_layout(rows, label="Hello"):
+    return ui.stack(
+        [
+            ui.text(label),
+            ui.table("table", rows),
+            ui.select_box("select", ["a", "b", "c"]),
+        ]
+    )
+
+
+def diff_twice(cache: ComponentUpdateCache, second_rows, second_label="Hello"):
+    rows = [{"id": i, "name": f"Row {i}"} for i in range(100)]
+
+    first = StaticTree.diff(build_layout(rows), build_layout(rows), "render-id", cache)
+    second = StaticTree.diff(
+        first["new_layout_with_ids_applied"],
+        build_layout(second_rows, second_label),
+        "render-id",
+        cache,
+    )
+
+    return second
+
+
+def test_matches_byte_mode_for_unchanged_layout():
+    rows = [{"id": i, "name": f"Row {i}"} for i in range(100)]
+
+    byte_diff = diff_twice(ComponentUpdateCache(), rows)
+    hash_diff = diff_twice(ComponentUpdateCache(hash_models=True), rows)
+
+    assert byte_diff["did_change"] is False
+    assert hash_diff["did_change"] is False
+
+
+def test_matches_byte_mode_for_changed_layout():
+    rows = [{"id": i, "name": f"Row {i}"} for i in range(99)]
+
+    byte_diff = diff_twice(ComponentUpdateCache(), rows, "Goodbye")
+    hash_diff = diff_twice(ComponentUpdateCache(hash_models=True), rows, "Goodbye")
+
+    assert hash_diff["did_change"] is True
+    # The text component has a generated ID, which differs between layouts.
+    assert len(hash_diff["update"]) == len(byte_diff["update"]) == 2
+    assert "table" in hash_diff["update"] and "select" not in hash_diff["update"]
+    assert hash_diff["add"] == byte_diff["add"]
+    assert hash_diff["delete"] == byte_diff["delete"]
+
+
+def test_stores_fixed_size_digests():
+    cache = ComponentUpdateCache(hash_models=True)
+    rows = [{"id": i, "name": f"Row {i}"} for i in range(1000)]
+
+    diff = diff_twice(cache, rows)
+    index = diff["index"]
+
+    for component_id in ["table", "select"]:
+        cached = cache.get("render-id", component_id)
+        assert isinstance(cached, bytes) and len(cached) == DIGEST_SIZE_BYTES
+
+    # Non-input leaves are cached too, under the ID they keep after the diff.
+    text_id = diff["new_layout_with_ids_applied"]["model"]["children"][0]["model"]["id"]
+    assert text_id in index
+    assert cache.get("render-id", text_id) is not None
@@ -0,0 +1,58 @@
+from compose_sdk.core import ComponentInstance as ui
+from compose_sdk.core.compress import Compress
+from compose_sdk.core.static_tree.pipeline import (
+    CompressPass,
+    IndexPass,
+    StaticTreePipeline,
+    ValidatePass,
+)
+
+
+def build_layout():
+    return ui.stack(
+        [
+            ui.text_input("name"),
+            ui.table("table", [{"a": 1, "b": 2}, {"a": 3, "b": 4}]),
+            ui.form("form", ui.stack([ui.text_input("email"), ui.text("Hello")])),
+        ]
+    )
+
+
+def test_compress_pass_matches_compress_ui_tree():
+    layout = build_layout()
+    compress_pass = CompressPass()
+
+    error = StaticTreePipeline([compress_pass]).run(layout)
+
+    assert error is None
+    assert compress_pass.result == Compress.ui_tree(layout)
+
+
+def test_runs_every_pass_in_a_single_traversal():
+    layout = build_layout()
+    index_pass = IndexPass()
+    pipeline = StaticTreePipeline([ValidatePass(), index_pass], measure=True)
+
+    error = pipeline.run(layout)
+
+    assert error is None
+    assert index_pass.index.get_form_id("email") == "form"
+    assert index_pass.index.get_parent("table") is layout
+    assert set(pipeline.timings.keys()) == {"validate", "index"}
+
+
+def test_validate_pass_reports_duplicate_ids():
+    layout = ui.stack([ui.text_input("name"), ui.text_input("name")])
+
+    error = StaticTreePipeline([ValidatePass()]).run(layout)
+
+    assert error is not None
+    assert "Duplicate component ID found: 'name'" in error
+
+
+def test_validate_pass_reports_nested_forms():
+    layout = ui.form("outer", ui.form("inner", ui.text_input("name")))
+
+    error = StaticTreePipeline([ValidatePass()]).run(layout)
+
+    assert error == "Cannot render a form inside another form"
@@ -0,0 +1,107 @@
+from typing import Any, Dict, List
+
+from compose_sdk.core import ComponentInstance as ui, StaticTree
+from compose_sdk.core.component_update_cache import ComponentUpdateCache
+
+RATIO = 0.5
+
+
+def build_rows(count: int) -> List[Dict[str, Any]]:
+    return [{"id": i, "name": f"Row {i}", "value": 0} for i in range(count)]
+
+
+def build_layout(rows: List[Dict[str, Any]], **kwargs: Any):
+    return ui.stack([ui.text("Title"), ui.table("table", rows, **kwargs)])
+
+
+class Differ:
+    def __init__(self, rows: List[Dict[str, Any]], **kwargs: Any):
+        self.kwargs = kwargs
+        self.cache = ComponentUpdateCache()
+        self.layout = build_layout(rows, **kwargs)
+
+    def diff(self, rows: List[Dict[str, Any]]):
+        diff = StaticTree.diff(
+            self.layout,
+            build_layout(rows, **self.kwargs),
+            "render-id",
+            self.cache,
+            RATIO,
+        )
+        self.layout = diff["new_layout_with_ids_applied"]
+        return diff
+
+
+def test_first_change_replaces_table_then_sends_row_updates():
+    rows = build_rows(10)
+    differ = Differ(rows)
+
+    first = differ.diff([{**rows[0], "value": 1}, *rows[1:]])
+
+    assert "table" in first["update"]
+    assert first["table_deltas"] == {}
+
+    second = differ.diff([{**rows[0], "value": 2}, *rows[1:]])
+    delta = second["table_deltas"]["table"]
+
+    assert second["did_change"] is True
+    assert second["update"] == {}
+    assert delta["delete"] == []
+    assert delta["insert"] == []
+    assert [key for key, _ in delta["update"]] == [0]
+
+
+def test_inserts_and_deletes_rows_by_primary_key():
+    rows = build_rows(10)
+    differ = Differ(rows, primary_key="id")
+
+    differ.diff([{**rows[0], "value": 1}, *rows[1:]])
+    diff = differ.diff(
+        [{**rows[0], "value": 1}, *rows[2:5], {"id": 99, "name": "New"}, *rows[5:]]
+    )
+    delta = diff["table_deltas"]["table"]
+
+    assert diff["update"] == {}
+    assert delta["delete"] == [1]
+    assert [index for index, _ in delta["insert"]] == [4]
+    assert delta["update"] == []
+
+
+def test_replaces_table_past_change_ratio():
+    rows = build_rows(10)
+    differ = Differ(rows)
+
+    differ.diff([{**row, "value": 1} for row in rows])
+    diff = differ.diff([{**row, "value": 2} for row in rows])
+
+    assert "table" in diff["update"]
+    assert diff["table_deltas"] == {}
+
+
+def test_replaces_table_when_rows_are_reordered():
+    rows = build_rows(10)
+    differ = Differ(rows, primary_key="id")
+
+    differ.diff([{**rows[0], "value": 1}, *rows[1:]])
+    diff = differ.diff([rows[1], {**rows[0], "value": 1}, *rows[2:]])
+
+    assert "table" in diff["update"]
+    assert diff["table_deltas"] == {}
+
+
+def test_disabled_by_default():
+    rows = build_rows(10)
+    cache = ComponentUpdateCache()
+    layout = build_layout(rows)
+
+    for value in [1, 2]:
+        diff = StaticTree.diff(
+            layout,
+            build_layout([{**rows[0], "value": value}, *rows[1:]]),
+            "render-id",
+            cache,
+        )
+        layout = diff["new_layout_with_ids_applied"]
+
+        assert "table" in diff["update"]
+        assert diff["table_deltas"] == {}
@@ -0,0 +1,77 @@
+from typing import Any
+
+import pandas
+
+from compose_sdk.core import ComponentInstance as ui, JSON, Table, TableDefault
+from compose_sdk.core.dataframe_rows import DataFrameRows
+from compose_sdk.core.table_query import TableQuery
+
+
+def view(**kwargs: Any) -> Table.PaginationView:
+    return {
+        "search_query": kwargs.get("search_query", None),
+        "sort_by": kwargs.get("sort_by", []),
+        "filter_by": kwargs.get("filter_by", None),
+        "view_by": None,
+    }
+
+
+def create_df(rows: int) -> pandas.DataFrame:
+    return pandas.DataFrame(
+        {
+            "id": list(range(rows)),
+            "name": [None if i % 7 == 0 else f"Name {i % 13}" for i in range(rows)],
+            "score": [float("nan") if i % 5 == 0 else i % 11 for i in range(rows)],
+            "count": pandas.array(
+                [None if i % 3 == 0 else i for i in range(rows)], dtype="Int64"
+            ),
+        }
+    )
+
+
+def test_replaces_empty_values_in_small_dataframes():
+    table = ui.dataframe("table", create_df(6))
+    data = table["model"]["properties"]["data"]
+
+    assert isinstance(data, list)
+    assert data[0] == {"id": 0, "name": "", "score": "", "count": ""}
+    assert data[1] == {"id": 1, "name": "Name 1", "score": 1.0, "count": 1}
+
+
+def test_keeps_large_dataframes_as_backing_store():
+    df = create_df(TableDefault.PAGINATION_THRESHOLD + 1)
+    table = ui.dataframe("table", df)
+
+    rows = table["hooks"]["onPageChange"]["fn"]()
+
+    assert isinstance(rows, DataFrameRows)
+    assert rows.df is df
+    assert len(rows) == len(df)
+    assert rows[7] == {"id": 7, "name": "", "score": 7.0, "count": 7}
+    assert JSON.parse(JSON.stringify(rows[0:2])) == JSON.parse(
+        JSON.stringify(rows.tolist()[0:2])
+    )
+
+
+def test_query_matches_materialized_rows():
+    df = create_df(500)
+    rows = DataFrameRows(df)
+    records = rows.tolist()
+    sorted_view = view(
+        search_query="name 1",
+        sort_by=[
+            {"key": "score", "direction": "desc"},
+            {"key": "id", "direction": "asc"},
+        ],
+    )
+
+    assert TableQuery(rows).page(sorted_view, 10, 20) == TableQuery(records).page(
+        sorted_view, 10, 20
+    )
+
+
+def test_query_is_reused_for_same_dataframe():
+    df = create_df(10)
+
+    assert TableQuery(DataFrameRows(df)).is_for(DataFrameRows(df))
+    assert not TableQuery(DataFrameRows(df)).is_for(DataFrameRows(df.copy()))
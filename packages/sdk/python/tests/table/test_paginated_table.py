@@ -1,5 +1,6 @@
 # type: ignore
 
+import asyncio
 from typing import Any
 import pytest
 from compose_sdk.scheduler import Scheduler
@@ -54,3 +55,424 @@ async def test_sends_paginated_data_to_client(
         await tracker.wait_until_condition()
 
     assert tracker.met_condition is True
+
+
+@pytest.mark.asyncio
+async def test_auto_paginated_table_applies_view_to_full_dataset(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    rows = [{"id": idx, "name": f"user {idx}", "age": idx % 50} for idx in range(3000)]
+
+    async def handler(page: Page, ui: UI):
+        page.add(lambda: ui.table("table-id", rows), key="render-id")
+        await scheduler.sleep(0)
+
+    tracker = api_event_tracker_factory()
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await scheduler.sleep(0.002)
+
+        await runner.on_table_page_change_hook(
+            "render-id",
+            "table-id",
+            10,
+            10,
+            {
+                "search_query": "9",
+                "sort_by": [{"key": "age", "direction": "desc"}],
+                "filter_by": {"key": "age", "operator": "greaterThan", "value": 40},
+                "view_by": None,
+            },
+        )
+
+    responses = [
+        event
+        for event in tracker.events
+        if event["type"] == EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2
+    ]
+
+    expected = sorted(
+        (
+            row
+            for row in rows
+            if row["age"] > 40 and any("9" in str(value) for value in row.values())
+        ),
+        key=lambda row: -row["age"],
+    )
+
+    assert len(responses) == 1
+    assert responses[0]["totalRecords"] == len(expected)
+    assert responses[0]["data"] == expected[10:20]
+
+
+@pytest.mark.asyncio
+async def test_cancels_superseded_manual_page_changes(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    calls = []
+    cancelled = []
+
+    async def get_data(args: Any):
+        calls.append(args["offset"])
+
+        try:
+            await scheduler.sleep(0.05 if args["offset"] == 10 else 0)
+        except asyncio.CancelledError:
+            cancelled.append(args["offset"])
+            raise
+
+        return {"data": [{"id": args["offset"]}], "total_records": 100}
+
+    async def handler(page: Page, ui: UI):
+        page.add(lambda: ui.table("table-id", get_data), key="render-id")
+        await scheduler.sleep(0)
+
+    tracker = api_event_tracker_factory()
+    view = {"search_query": None, "sort_by": [], "filter_by": None, "view_by": None}
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await scheduler.sleep(0.002)
+        tracker.events.clear()
+
+        first = asyncio.ensure_future(
+            runner.on_table_page_change_hook("render-id", "table-id", 10, 10, view)
+        )
+        await scheduler.sleep(0.002)
+        await runner.on_table_page_change_hook("render-id", "table-id", 20, 10, view)
+        await first
+
+    responses = [
+        event
+        for event in tracker.events
+        if event["type"] == EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2
+    ]
+
+    assert calls[-2:] == [10, 20]
+    assert cancelled == [10]
+    assert len(responses) == 1
+    assert responses[0]["offset"] == 20
+
+
+@pytest.mark.asyncio
+async def test_propagates_cancellation_of_a_superseded_page_change(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    async def get_data(args: Any):
+        await scheduler.sleep(0.05 if args["offset"] == 10 else 0)
+        return {"data": [{"id": args["offset"]}], "total_records": 100}
+
+    async def handler(page: Page, ui: UI):
+        page.add(lambda: ui.table("table-id", get_data), key="render-id")
+        await scheduler.sleep(0)
+
+    api_event_tracker_factory()
+    view = {"search_query": None, "sort_by": [], "filter_by": None, "view_by": None}
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await scheduler.sleep(0.002)
+
+        page_change = asyncio.ensure_future(
+            runner.on_table_page_change_hook("render-id", "table-id", 10, 10, view)
+        )
+        await scheduler.sleep(0.002)
+
+        # The hook is superseded while the page change itself is cancelled.
+        runner.table_state.cancel_page_change(
+            runner.table_state.generate_key("render-id", "table-id")
+        )
+        page_change.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await page_change
+
+
+@pytest.mark.asyncio
+async def test_serves_prefetched_pages_from_the_cache(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    calls = []
+
+    def get_data(args: Any):
+        calls.append(args["offset"])
+        return {"data": [{"id": args["offset"]}], "total_records": 300}
+
+    async def handler(page: Page, ui: UI):
+        page.add(lambda: ui.table("table-id", get_data, prefetch=True), key="render-id")
+        await scheduler.sleep(0)
+
+    tracker = api_event_tracker_factory()
+    view = {"search_query": None, "sort_by": [], "filter_by": None, "view_by": None}
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await scheduler.sleep(0.005)
+
+        # The initial page, and the next page in the background.
+        assert calls == [0, 100]
+
+        await runner.on_table_page_change_hook("render-id", "table-id", 100, 100, view)
+        await scheduler.sleep(0.005)
+
+        # Served from the cache, while the following page is prefetched.
+        assert calls == [0, 100, 200]
+
+        await runner.on_table_page_change_hook("render-id", "table-id", 0, 100, view)
+        await scheduler.sleep(0.005)
+
+        assert calls == [0, 100, 200]
+
+        searched = {**view, "search_query": "a"}
+        await runner.on_table_page_change_hook(
+            "render-id", "table-id", 0, 100, searched
+        )
+        await scheduler.sleep(0.005)
+
+        assert calls == [0, 100, 200, 0, 100]
+
+    responses = [
+        event
+        for event in tracker.events
+        if event["type"] == EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2
+    ]
+
+    assert [response["data"] for response in responses[-3:]] == [
+        [{"id": 100}],
+        [{"id": 0}],
+        [{"id": 0}],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_passes_cursors_of_adjacent_pages(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    calls = []
+
+    def get_data(args: Any):
+        calls.append((args["offset"], args["cursor"], args["cursor_direction"]))
+        offset = args["offset"]
+        return {
+            "data": [{"id": offset}],
+            "total_records": 300,
+            "next_cursor": f"after-{offset}",
+            "prev_cursor": f"before-{offset}",
+        }
+
+    async def handler(page: Page, ui: UI):
+        page.add(lambda: ui.table("table-id", get_data), key="render-id")
+        await scheduler.sleep(0)
+
+    # Cursors are only known once the first page was sent.
+    tracker = api_event_tracker_factory(
+        {
+            "condition": lambda event: event["type"]
+            == EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2
+        }
+    )
+    view = {"search_query": None, "sort_by": [], "filter_by": None, "view_by": None}
+    sorted_view = {**view, "sort_by": [{"key": "id", "direction": "desc"}]}
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await tracker.wait_until_condition({"timeoutMs": 1000})
+
+        for offset in [100, 200, 100]:
+            await runner.on_table_page_change_hook(
+                "render-id", "table-id", offset, 100, view
+            )
+
+        # Cursors are dropped when the view changes.
+        await runner.on_table_page_change_hook(
+            "render-id", "table-id", 100, 100, sorted_view
+        )
+
+    assert calls == [
+        (0, None, None),
+        (100, "after-0", "next"),
+        (200, "after-100", "next"),
+        (100, "before-200", "prev"),
+        (100, None, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_counts_total_records_in_the_background(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    counts = []
+
+    def get_data(args: Any):
+        assert args["refresh_total_records"] is False
+        return {"data": [{"id": args["offset"]}] * 100}
+
+    async def count(args: Any):
+        counts.append(args["search_query"])
+        await asyncio.sleep(0.002)
+        return 250
+
+    async def handler(page: Page, ui: UI):
+        page.add(lambda: ui.table("table-id", get_data, count=count), key="render-id")
+        await scheduler.sleep(0)
+
+    tracker = api_event_tracker_factory()
+    view = {"search_query": None, "sort_by": [], "filter_by": None, "view_by": None}
+
+    def get_totals():
+        return [
+            event["totalRecords"]
+            for event in tracker.events
+            if event["type"] == EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2
+        ]
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await scheduler.sleep(0.01)
+
+        # The page is sent with an estimate, followed by the count.
+        assert get_totals() == [101, 250]
+
+        await runner.on_table_page_change_hook("render-id", "table-id", 100, 100, view)
+        await scheduler.sleep(0.01)
+
+        # The count is reused while the search and filters don't change.
+        assert counts == [None]
+        assert get_totals() == [101, 250, 250]
+
+        searched = {**view, "search_query": "a"}
+        await runner.on_table_page_change_hook(
+            "render-id", "table-id", 0, 100, searched
+        )
+        await scheduler.sleep(0.01)
+
+        assert counts == [None, "a"]
+        assert get_totals() == [101, 250, 250, 101, 250]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("declaration", ["depends_on", "deps"])
+async def test_only_refreshes_tables_whose_inputs_changed(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+    declaration: str,
+):
+    tracker = api_event_tracker_factory()
+    refreshed = []
+
+    def get_data(args: Any):
+        return {"data": [{"id": 1}], "total_records": 1}
+
+    def get_stale_tables():
+        return [
+            event["componentId"]
+            for event in tracker.events
+            if event["type"] == EventType.SdkToServer.STALE_STATE_UPDATE_V2
+        ]
+
+    states = []
+
+    async def handler(page: Page, ui: UI, state: c.State):
+        state["customer"] = 1
+        state["other"] = 1
+        states.append(state)
+
+        def layout():
+            options = (
+                {"depends_on": ["customer"]}
+                if declaration == "depends_on"
+                else {"deps": [state["customer"]]}
+            )
+
+            return ui.stack(
+                [
+                    ui.text(str(state["other"])),
+                    ui.table("declared", get_data, **options),
+                    ui.table("undeclared", get_data),
+                ]
+            )
+
+        page.add(layout, key="render-id")
+        await scheduler.sleep(0)
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await scheduler.sleep(0.01)
+        previous = len(get_stale_tables())
+
+        states[0]["other"] = 2
+        await scheduler.sleep(0.01)
+        refreshed.append(get_stale_tables()[previous:])
+
+        states[0]["customer"] = 2
+        await scheduler.sleep(0.01)
+        refreshed.append(get_stale_tables()[previous:])
+
+    assert refreshed == [
+        ["undeclared"],
+        ["undeclared", "declared", "undeclared"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_prefetches_pages_of_tables_with_a_count_function(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    calls = []
+    counts = []
+
+    def get_data(args: Any):
+        calls.append(args["offset"])
+        return {"data": [{"id": args["offset"]}] * 100}
+
+    async def count(args: Any):
+        counts.append(args["search_query"])
+        return 300
+
+    async def handler(page: Page, ui: UI):
+        page.add(
+            lambda: ui.table("table-id", get_data, prefetch=True, count=count),
+            key="render-id",
+        )
+        await scheduler.sleep(0)
+
+    tracker = api_event_tracker_factory()
+    view = {"search_query": None, "sort_by": [], "filter_by": None, "view_by": None}
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await scheduler.sleep(0.01)
+
+        assert calls == [0, 100]
+
+        await runner.on_table_page_change_hook("render-id", "table-id", 100, 100, view)
+        await scheduler.sleep(0.01)
+
+        # Served from the cache, with the cached count.
+        assert calls == [0, 100, 200]
+        assert counts == [None]
+
+    responses = [
+        event
+        for event in tracker.events
+        if event["type"] == EventType.SdkToServer.TABLE_PAGE_CHANGE_RESPONSE_V2
+    ]
+
+    assert responses[-1]["offset"] == 100
+    assert responses[-1]["totalRecords"] == 300
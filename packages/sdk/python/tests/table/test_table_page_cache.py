@@ -0,0 +1,77 @@
+from typing import Any
+
+from compose_sdk.core import Table
+from compose_sdk.core.table_page_cache import TablePageCache, get_page_view_key
+
+
+def view(**kwargs: Any) -> Table.PaginationView:
+    return {
+        "search_query": kwargs.get("search_query", None),
+        "sort_by": kwargs.get("sort_by", []),
+        "filter_by": kwargs.get("filter_by", None),
+        "view_by": None,
+    }
+
+
+def page(offset: int) -> Any:
+    return {"data": [{"id": offset}], "total_records": 100}
+
+
+def test_caches_pages_of_the_current_view():
+    cache = TablePageCache()
+    key = get_page_view_key(view())
+
+    cache.set("table", key, 0, 10, page(0))
+    cache.set("table", key, 10, 10, page(10))
+
+    assert cache.get("table", key, 10, 10) == page(10)
+    assert cache.get("table", key, 10, 20) is None
+    assert cache.get("table", get_page_view_key(view(search_query="a")), 10, 10) is None
+
+
+def test_drops_pages_when_the_view_changes():
+    cache = TablePageCache()
+    key = get_page_view_key(view())
+    sorted_key = get_page_view_key(view(sort_by=[{"key": "id", "direction": "asc"}]))
+
+    cache.set("table", key, 0, 10, page(0))
+    cache.set("table", sorted_key, 0, 10, page(0))
+
+    assert cache.get("table", key, 0, 10) is None
+    assert len(cache) == 1
+
+
+def test_ignores_pages_fetched_before_the_table_was_dropped():
+    cache = TablePageCache()
+    key = get_page_view_key(view())
+    generation = cache.generation("table")
+
+    cache.delete_table("table")
+    cache.set("table", key, 10, 10, page(10), generation)
+
+    assert cache.get("table", key, 10, 10) is None
+
+
+def test_evicts_least_recently_used_pages():
+    cache = TablePageCache(max_pages=2)
+    key = get_page_view_key(view())
+
+    cache.set("first", key, 0, 10, page(0))
+    cache.set("second", key, 0, 10, page(0))
+    cache.get("first", key, 0, 10)
+    cache.set("third", key, 0, 10, page(0))
+
+    assert cache.get("first", key, 0, 10) is not None
+    assert cache.get("second", key, 0, 10) is None
+    assert len(cache) == 2
+
+
+def test_tracks_pending_prefetches():
+    cache = TablePageCache()
+
+    assert cache.start_prefetch("table", 10, 10) is True
+    assert cache.start_prefetch("table", 10, 10) is False
+
+    cache.finish_prefetch("table", 10, 10)
+
+    assert cache.start_prefetch("table", 10, 10) is True
@@ -0,0 +1,145 @@
+from typing import Any, List
+
+from compose_sdk.core import Table
+from compose_sdk.core.table_query import TableQuery
+
+ROWS = [
+    {"id": 1, "name": "John", "age": 30, "tags": ["admin"], "joined": "2024-01-05"},
+    {"id": 2, "name": "jane", "age": 25, "tags": [], "joined": "2023-06-01"},
+    {"id": 3, "name": "Alex", "age": None, "tags": ["admin", "dev"], "joined": None},
+    {"id": 4, "name": "Emily", "age": 41, "tags": ["dev"], "joined": "2022-12-31"},
+    {"id": 5, "name": "Chris", "age": 25, "tags": ["ops"], "joined": "2024-03-10"},
+]
+
+
+def view(**kwargs: Any) -> Table.PaginationView:
+    return {
+        "search_query": kwargs.get("search_query", None),
+        "sort_by": kwargs.get("sort_by", []),
+        "filter_by": kwargs.get("filter_by", None),
+        "view_by": None,
+    }
+
+
+def ids(rows: List[Any]) -> List[int]:
+    return [row["id"] for row in rows]
+
+
+def test_returns_slice_when_view_is_empty():
+    data, total = TableQuery(ROWS).page(view(), 1, 2)
+
+    assert ids(data) == [2, 3]
+    assert total == 5
+
+
+def test_searches_all_columns_case_insensitively():
+    data, total = TableQuery(ROWS).page(view(search_query="JA"), 0, 10)
+
+    assert ids(data) == [2]
+    assert total == 1
+
+
+def test_searches_only_specified_columns():
+    data, total = TableQuery(ROWS).page(view(search_query="2"), 0, 10, ["name"])
+
+    assert data == []
+    assert total == 0
+
+
+def test_sorts_by_multiple_columns_with_empty_values_last():
+    query = TableQuery(ROWS)
+
+    data, _ = query.page(
+        view(
+            sort_by=[
+                {"key": "age", "direction": "asc"},
+                {"key": "name", "direction": "desc"},
+            ]
+        ),
+        0,
+        10,
+    )
+
+    assert ids(data) == [2, 5, 1, 4, 3]
+
+    data, _ = query.page(view(sort_by=[{"key": "age", "direction": "desc"}]), 0, 10)
+
+    assert ids(data) == [4, 1, 2, 5, 3]
+
+
+def test_sorts_strings_case_insensitively():
+    data, _ = TableQuery(ROWS).page(
+        view(sort_by=[{"key": "name", "direction": "asc"}]), 0, 10
+    )
+
+    assert ids(data) == [3, 5, 4, 2, 1]
+
+
+def test_applies_camel_case_filter_groups():
+    filter_by = {
+        "logicOperator": "or",
+        "filters": [
+            {"key": "age", "operator": "greaterThan", "value": 35},
+            {
+                "logicOperator": "and",
+                "filters": [
+                    {"key": "name", "operator": "includes", "value": "J"},
+                    {"key": "age", "operator": "lessThanOrEqual", "value": 25},
+                ],
+            },
+        ],
+    }
+
+    data, total = TableQuery(ROWS).page(view(filter_by=filter_by), 0, 10)
+
+    assert ids(data) == [2, 4]
+    assert total == 2
+
+
+def test_filters_tags_and_empty_values():
+    query = TableQuery(ROWS)
+
+    data, _ = query.page(
+        view(filter_by={"key": "tags", "operator": "hasAny", "value": ["dev"]}), 0, 10
+    )
+    assert ids(data) == [3, 4]
+
+    data, _ = query.page(
+        view(filter_by={"key": "tags", "operator": "isEmpty", "value": None}), 0, 10
+    )
+    assert ids(data) == [2]
+
+    data, _ = query.page(
+        view(filter_by={"key": "age", "operator": "isNot", "value": "25"}), 0, 10
+    )
+    assert ids(data) == [1, 3, 4]
+
+
+def test_filters_date_columns():
+    filter_by = {"key": "joined", "operator": "greaterThan", "value": "2023-01-01"}
+
+    data, total = TableQuery(ROWS).page(
+        view(filter_by=filter_by, sort_by=[{"key": "joined", "direction": "asc"}]),
+        0,
+        10,
+        [{"key": "joined", "format": "date"}, "name"],
+    )
+
+    assert ids(data) == [2, 1, 5]
+    assert total == 3
+
+
+def test_is_for_compares_by_reference():
+    query = TableQuery(ROWS)
+
+    assert query.is_for(ROWS) is True
+    assert query.is_for(list(ROWS)) is False
+
+
+def test_is_for_notices_rows_that_changed_in_place():
+    rows = [{"id": idx} for idx in range(100)]
+    query = TableQuery(rows)
+
+    rows[-1]["id"] = -1
+
+    assert query.is_for(rows) is False
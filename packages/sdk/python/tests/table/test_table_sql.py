@@ -0,0 +1,248 @@
+import sqlite3
+from typing import Any, List
+
+import pytest
+
+from compose_sdk.core import Table, generator
+from compose_sdk.core.table_query import TableQuery
+from compose_sdk.core.table_sql import (
+    MySqlDialect,
+    SqlConnectionPool,
+    SqlDialect,
+    SqlServerDialect,
+    SqlTableSource,
+    SqlViewCompiler,
+)
+
+ROWS = [
+    {"id": 1, "name": "John", "age": 30, "city": "Paris"},
+    {"id": 2, "name": "jane", "age": 25, "city": "100%_real"},
+    {"id": 3, "name": "Alex", "age": None, "city": None},
+    {"id": 4, "name": "Emily", "age": 41, "city": "Berlin"},
+    {"id": 5, "name": "Chris", "age": 25, "city": "paris"},
+]
+
+# Filter models in the browser's camelCase format.
+FILTERS: List[Any] = [
+    {"key": "name", "operator": "is", "value": "JOHN"},
+    {"key": "age", "operator": "is", "value": 25},
+    {"key": "age", "operator": "isNot", "value": 25},
+    {"key": "city", "operator": "includes", "value": "PAR"},
+    {"key": "city", "operator": "notIncludes", "value": "par"},
+    {"key": "city", "operator": "includes", "value": "%_"},
+    {"key": "age", "operator": "isEmpty", "value": None},
+    {"key": "age", "operator": "isNotEmpty", "value": None},
+    {"key": "age", "operator": "greaterThan", "value": 26},
+    {"key": "age", "operator": "lessThanOrEqual", "value": 30},
+    {"key": "age", "operator": "hasAny", "value": [25, 41]},
+    {"key": "age", "operator": "notHasAny", "value": [25, 41]},
+    {"key": "age", "operator": "hasAll", "value": [25]},
+    {"key": "missing", "operator": "isNot", "value": "x"},
+    {
+        "logicOperator": "or",
+        "filters": [
+            {"key": "age", "operator": "greaterThan", "value": 40},
+            {
+                "logicOperator": "and",
+                "filters": [
+                    {"key": "age", "operator": "is", "value": 25},
+                    {"key": "city", "operator": "includes", "value": "paris"},
+                ],
+            },
+        ],
+    },
+]
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = tmp_path / "table.db"
+
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE users (id INTEGER, name TEXT, age INTEGER, city TEXT)"
+        )
+        connection.executemany(
+            "INSERT INTO users VALUES (:id, :name, :age, :city)", ROWS
+        )
+
+    pool = SqlConnectionPool(
+        lambda: sqlite3.connect(path, check_same_thread=False), max_size=2
+    )
+    yield pool
+    pool.close()
+
+
+def args(**kwargs: Any) -> Any:
+    return {
+        "offset": kwargs.get("offset", 0),
+        "page_size": kwargs.get("page_size", 10),
+        "search_query": kwargs.get("search_query", None),
+        "sort_by": kwargs.get("sort_by", []),
+        "filter_by": Table().transform_advanced_filter_model_to_snake_case(
+            kwargs.get("filter_by", None)
+        ),
+        "refresh_total_records": kwargs.get("refresh_total_records", True),
+        "prev_total_records": kwargs.get("prev_total_records", None),
+        "prev_search_query": None,
+        "cursor": None,
+        "cursor_direction": None,
+    }
+
+
+def ids(rows: List[Any]) -> List[int]:
+    return [row["id"] for row in rows]
+
+
+@pytest.mark.parametrize("filter_by", FILTERS)
+async def test_matches_auto_paginated_tables(pool, filter_by: Any):
+    source = SqlTableSource(pool, "SELECT * FROM users")
+    sort_by = [{"key": "age", "direction": "desc"}, {"key": "id", "direction": "asc"}]
+
+    response = await source.page(args(filter_by=filter_by, sort_by=sort_by))
+    data, total = TableQuery(ROWS).page(
+        {
+            "search_query": None,
+            "sort_by": sort_by,  # type: ignore[typeddict-item]
+            "filter_by": filter_by,
+            "view_by": None,
+        },
+        0,
+        10,
+    )
+
+    assert ids(response["data"]) == ids(data)
+    assert response["total_records"] == total
+
+
+async def test_pages_searches_and_sorts_in_the_database(pool):
+    source = SqlTableSource(pool, "SELECT * FROM users WHERE id != ?", [4])
+
+    response = await source.page(
+        args(
+            search_query="PAR",
+            sort_by=[{"key": "name", "direction": "asc"}],
+            offset=1,
+            page_size=1,
+        )
+    )
+
+    assert response == {
+        "data": [{"id": 1, "name": "John", "age": 30, "city": "Paris"}],
+        "total_records": 2,
+    }
+
+
+async def test_searches_only_the_search_columns(pool):
+    source = SqlTableSource(pool, "SELECT * FROM users", search_columns=["name"])
+
+    response = await source.page(args(search_query="paris"))
+
+    assert response["total_records"] == 0
+
+
+async def test_reuses_the_previous_total_records(pool):
+    source = SqlTableSource(pool, "SELECT * FROM users")
+
+    response = await source.page(
+        args(refresh_total_records=False, prev_total_records=123)
+    )
+
+    assert len(response["data"]) == 5
+    assert response["total_records"] == 123
+
+
+async def test_ignores_columns_that_the_query_does_not_return(pool):
+    source = SqlTableSource(pool, "SELECT * FROM users", columns=["id", "name"])
+
+    response = await source.page(
+        args(filter_by={"key": 'age" > 0 OR "id', "operator": "isNotEmpty", "value": 0})
+    )
+
+    assert response["total_records"] == 0
+
+
+async def test_rejects_sorting_by_columns_that_the_query_does_not_return(pool):
+    source = SqlTableSource(pool, "SELECT * FROM users", columns=["id", "name"])
+
+    with pytest.raises(ValueError):
+        await source.page(args(sort_by=[{"key": "city", "direction": "asc"}]))
+
+
+async def test_reuses_pooled_connections(tmp_path):
+    connections = []
+
+    def connect():
+        connection = sqlite3.connect(tmp_path / "db", check_same_thread=False)
+        connections.append(connection)
+        return connection
+
+    pool = SqlConnectionPool(connect, max_size=2)
+    source = SqlTableSource(pool, "SELECT 1 AS id")
+
+    for _ in range(3):
+        await source.page(args())
+
+    assert len(connections) <= 2
+
+    pool.close()
+
+
+def test_is_a_page_change_function_of_the_table(pool):
+    source = SqlTableSource(pool, "SELECT * FROM users")
+
+    component = generator.table("table-id", source)
+
+    assert component["hooks"]["onPageChange"]["fn"] == source.page
+    assert component["model"]["properties"]["paged"] is True
+
+
+def test_searches_sorts_and_filters_tables_of_a_source_by_default(pool):
+    source = SqlTableSource(pool, "SELECT * FROM users")
+
+    properties = generator.table("table-id", source)["model"]["properties"]
+
+    assert "notSearchable" not in properties
+    assert "sortable" not in properties
+    assert "filterable" not in properties
+
+
+@pytest.mark.parametrize(
+    "dialect, text, like, page",
+    [
+        (
+            MySqlDialect(),
+            'LOWER(CAST("name" AS CHAR))',
+            'LOWER(CAST("name" AS CHAR)) LIKE ?)',
+            " LIMIT ? OFFSET ?",
+        ),
+        (
+            SqlServerDialect(),
+            'LOWER(CAST("name" AS NVARCHAR(MAX)))',
+            "ESCAPE '\\'",
+            " ORDER BY (SELECT NULL) OFFSET ? ROWS FETCH NEXT ? ROWS ONLY",
+        ),
+    ],
+)
+def test_compiles_the_syntax_of_the_dialect(
+    dialect: SqlDialect, text: str, like: str, page: str
+):
+    compiler = SqlViewCompiler(["name"], dialect=dialect)
+
+    where = compiler.where("a_[b", None, ["name"])
+
+    assert where is not None and text in where and like in where
+    assert page in dialect.paginate(compiler.param, 10, 20, False)
+
+
+def test_escapes_brackets_for_sql_server():
+    compiler = SqlViewCompiler(["name"], dialect=SqlServerDialect())
+
+    compiler.where("a_[b", None, ["name"])
+
+    assert compiler.params == ["%a\\_\\[b%"]
+
+
+def test_rejects_unsupported_paramstyles(pool):
+    with pytest.raises(ValueError):
+        SqlTableSource(pool, "SELECT * FROM users", paramstyle="named")  # type: ignore[arg-type]
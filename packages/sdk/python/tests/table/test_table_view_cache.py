@@ -0,0 +1,176 @@
+from typing import Any, List
+
+import numpy
+
+from compose_sdk.core import Table
+from compose_sdk.core.component_update_cache import ComponentUpdateCache
+from compose_sdk.core.table_state import TableState
+from compose_sdk.core.table_view_cache import TableViewCache
+from compose_sdk.scheduler import Scheduler
+
+
+def view(**kwargs: Any) -> Table.PaginationView:
+    return {
+        "search_query": kwargs.get("search_query", None),
+        "sort_by": kwargs.get("sort_by", []),
+        "filter_by": kwargs.get("filter_by", None),
+        "view_by": None,
+    }
+
+
+def add_table(table_state: TableState) -> None:
+    table_state.add(
+        "render-id",
+        "table-id",
+        {
+            "data": [],
+            "offset": 0,
+            "page_size": 10,
+            "total_records": None,
+            "stale": False,
+            "initial_view": view(),
+        },
+    )
+
+
+def create_table_state(scheduler: Scheduler, rows: List[Any]) -> TableState:
+    table_state = TableState(scheduler, ComponentUpdateCache())
+    add_table(table_state)
+    return table_state
+
+
+def test_evicts_least_recently_used_entries_over_budget():
+    entry = numpy.arange(10, dtype=numpy.int64)
+    cache = TableViewCache(memory_budget_bytes=entry.nbytes * 2)
+
+    cache.set("table", "a", entry)
+    cache.set("table", "b", entry.copy())
+    cache.get("table", "a")
+    cache.set("table", "c", entry.copy())
+
+    assert cache.get("table", "a") is entry
+    assert cache.get("table", "b") is None
+    assert cache.get("table", "c") is not None
+    assert cache.memory_bytes == entry.nbytes * 2
+
+
+def test_skips_entries_larger_than_budget():
+    cache = TableViewCache(memory_budget_bytes=8)
+
+    cache.set("table", "a", numpy.arange(10, dtype=numpy.int64))
+
+    assert len(cache) == 0
+    assert cache.memory_bytes == 0
+
+
+def test_deletes_all_entries_for_table():
+    cache = TableViewCache()
+
+    cache.set("table-1", "a", numpy.arange(5))
+    cache.set("table-1", "b", numpy.arange(5))
+    cache.set("table-2", "a", numpy.arange(5))
+    cache.delete_table("table-1")
+
+    assert len(cache) == 1
+    assert cache.get("table-2", "a") is not None
+
+
+def test_scopes_share_the_budget_of_the_cache():
+    entry = numpy.arange(10, dtype=numpy.int64)
+    cache = TableViewCache(memory_budget_bytes=entry.nbytes * 2)
+    first = cache.scope("execution-1")
+    second = cache.scope("execution-2")
+
+    first.set("table", "a", entry)
+    second.set("table", "a", entry.copy())
+    second.set("table", "b", entry.copy())
+
+    assert first.get("table", "a") is None
+    assert second.get("table", "a") is not None
+    assert cache.memory_bytes == entry.nbytes * 2
+
+    second.clear()
+
+    assert len(second) == 0
+    assert len(cache) == 0
+
+
+def test_table_states_only_clear_their_own_entries(scheduler: Scheduler):
+    rows = [{"id": i} for i in range(10)]
+    cache = TableViewCache()
+    table_states = [
+        TableState(scheduler, ComponentUpdateCache(), view_cache=cache.scope(owner))
+        for owner in ["execution-1", "execution-2"]
+    ]
+    sorted_view = view(sort_by=[{"key": "id", "direction": "desc"}])
+
+    for table_state in table_states:
+        add_table(table_state)
+        table_state.get_page("render-id", "table-id", rows, sorted_view, 0, 3)
+
+    table_states[0].cleanup()
+
+    assert len(table_states[1].view_cache) == 2
+    assert len(cache) == 2
+
+
+def test_reuses_sorted_view_across_pages(scheduler: Scheduler):
+    rows = [{"id": i, "value": i % 7} for i in range(100)]
+    table_state = create_table_state(scheduler, rows)
+    sorted_view = view(
+        sort_by=[{"key": "value", "direction": "desc"}],
+        filter_by={"key": "value", "operator": "greaterThan", "value": 2},
+    )
+
+    first_page, total = table_state.get_page(
+        "render-id", "table-id", rows, sorted_view, 0, 10
+    )
+    entries = len(table_state.view_cache)
+
+    second_page, _ = table_state.get_page(
+        "render-id", "table-id", rows, {**sorted_view}, 10, 10
+    )
+
+    expected = sorted(
+        [row for row in rows if row["value"] > 2], key=lambda row: -row["value"]
+    )
+
+    assert total == len(expected)
+    assert first_page == expected[0:10]
+    assert second_page == expected[10:20]
+    # The filter set and the sort permutation.
+    assert entries == 2
+    assert len(table_state.view_cache) == 2
+
+
+def test_invalidates_views_when_data_reference_changes(scheduler: Scheduler):
+    rows = [{"id": i} for i in range(10)]
+    table_state = create_table_state(scheduler, rows)
+    sorted_view = view(sort_by=[{"key": "id", "direction": "desc"}])
+
+    table_state.get_page("render-id", "table-id", rows, sorted_view, 0, 3)
+
+    new_rows = [{"id": i} for i in range(20)]
+    data, total = table_state.get_page(
+        "render-id", "table-id", new_rows, sorted_view, 0, 3
+    )
+
+    assert [row["id"] for row in data] == [19, 18, 17]
+    assert total == 20
+
+    table_state.delete("render-id", "table-id")
+
+    assert len(table_state.view_cache) == 0
+
+
+def test_invalidates_views_when_rows_change_in_place(scheduler: Scheduler):
+    rows = [{"id": i} for i in range(10)]
+    table_state = create_table_state(scheduler, rows)
+    sorted_view = view(sort_by=[{"key": "id", "direction": "desc"}])
+
+    table_state.get_page("render-id", "table-id", rows, sorted_view, 0, 3)
+
+    rows[0]["id"] = 100
+    data, _ = table_state.get_page("render-id", "table-id", rows, sorted_view, 0, 3)
+
+    assert [row["id"] for row in data] == [100, 9, 8]
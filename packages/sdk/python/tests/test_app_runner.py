@@ -1,10 +1,13 @@
 # type: ignore
 
+import asyncio
+import time
 from typing import Callable, Tuple
 
 import pytest
 from compose_sdk.scheduler import Scheduler
 from compose_sdk.app.appRunner import AppRunner
+from compose_sdk.app.state import ALL_KEYS
 from compose_sdk.api import ApiHandler
 from compose_sdk import Page, UI, State
 from compose_sdk.core import EventType, TYPE
@@ -507,3 +510,208 @@ async def test_app_runner_does_nothing_when_state_update_does_not_change_anythin
 
     assert received_incorrect_render is False
     assert received_correct_render is True
+
+
+@pytest.mark.asyncio
+async def test_app_runner_only_rerenders_fragments_that_read_updated_state(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    render_counts = {"count": 0, "other": 0, "untracked": 0}
+    done = asyncio.Event()
+
+    async def handler(page: Page, ui: UI, state: State):
+        state.merge({"count": 0, "other": 0})
+        await scheduler.sleep(0.02)
+
+        def count_layout():
+            render_counts["count"] += 1
+            return ui.text(f"{state['count']} COUNT")
+
+        def other_layout():
+            render_counts["other"] += 1
+            return ui.text(f"{state.get('other')} OTHER")
+
+        def untracked_layout():
+            render_counts["untracked"] += 1
+            return ui.text("UNTRACKED")
+
+        page.add(count_layout)
+        page.add(other_layout)
+        page.add(untracked_layout, track_state=False)
+        await scheduler.sleep(0.02)
+
+        state["count"] = 1
+        await scheduler.sleep(0.02)
+
+        page.update()
+        await scheduler.sleep(0.02)
+        done.set()
+
+    tracker = api_event_tracker_factory()
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await asyncio.wait_for(done.wait(), 1)
+
+    # Initial render + state update + page.update()
+    assert render_counts["count"] == 3
+    # Initial render + page.update()
+    assert render_counts["other"] == 2
+    # Opted out of tracking, so re-renders on every update.
+    assert render_counts["untracked"] == 3
+    assert tracker.rerender_count == 1
+
+
+@pytest.mark.asyncio
+async def test_app_runner_tracks_state_read_by_coroutines_of_a_fragment(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    render_count = {"chart": 0}
+    done = asyncio.Event()
+
+    async def handler(page: Page, ui: UI, state: State):
+        state["threshold"] = 1
+        await scheduler.sleep(0.02)
+
+        def chart_layout():
+            render_count["chart"] += 1
+
+            # The chart's data is formatted by a coroutine, which is awaited
+            # after the layout returns.
+            return ui.bar_chart(
+                "chart",
+                [{"value": 1}, {"value": 2}],
+                group=lambda row: row["value"] > state["threshold"],
+            )
+
+        page.add(chart_layout)
+        await scheduler.sleep(0.02)
+
+        state["threshold"] = 2
+        await scheduler.sleep(0.02)
+        done.set()
+
+    tracker = api_event_tracker_factory()
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await asyncio.wait_for(done.wait(), 1)
+
+    assert render_count["chart"] == 2
+    assert tracker.rerender_count == 1
+
+
+def test_falls_back_to_every_key_for_async_layouts():
+    reads = set()
+
+    async def layout():
+        return None
+
+    coroutine = State.track_reads(layout, reads)()
+    coroutine.close()
+
+    assert reads == {ALL_KEYS}
+
+
+@pytest.mark.asyncio
+async def test_app_runner_regenerates_fragments_concurrently():
+    scheduler = Scheduler()
+    scheduler.init(False)
+
+    api = ApiHandler(
+        scheduler,
+        isDevelopment=True,
+        apiKey="test_api_key",
+        package_name="test_package_name",
+        package_version="test_package_version",
+    )
+    events = []
+
+    async def send(event, *args):
+        events.append(event)
+
+    api.send = send
+
+    slow = {"enabled": False}
+
+    def handler(page: Page, ui: UI):
+        for idx in range(3):
+
+            def layout(idx=idx):
+                if slow["enabled"]:
+                    time.sleep(0.2)
+
+                return ui.text(f"{idx} {slow['enabled']}")
+
+            page.add(layout)
+
+    runner = AppRunner(
+        scheduler,
+        api,
+        AppDefinition("test-app", handler),
+        "test_execution_id",
+        "test_browser_session_id",
+        concurrent_renders=True,
+    )
+
+    def run_on_scheduler(coro):
+        return asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, scheduler._loop)
+        )
+
+    try:
+        await run_on_scheduler(runner.execute({}))
+        await asyncio.sleep(0.05)
+
+        slow["enabled"] = True
+        start = time.time()
+        await run_on_scheduler(runner.on_state_update())
+        elapsed = time.time() - start
+
+        rerenders = [
+            event
+            for event in events
+            if event["type"] == EventType.SdkToServer.RERENDER_UI_V3
+        ]
+
+        # Regenerating sequentially would take at least 600ms.
+        assert elapsed < 0.45
+        assert len(rerenders) == 1
+        assert list(rerenders[0]["diff"].keys()) == runner.renders
+    finally:
+        runner.cleanup()
+        scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_resync_resends_every_render_in_full(
+    scheduler: Scheduler,
+    app_runner_factory: AppRunnerFactory,
+    api_event_tracker_factory: ApiEventTrackerFactory,
+):
+    async def handler(page: Page, ui: UI):
+        page.add(lambda: ui.stack([ui.text("first"), ui.text("second")]))
+        await scheduler.sleep(0)
+
+    tracker = api_event_tracker_factory(
+        {"condition": lambda event, tracker: tracker.one_render_or_more}
+    )
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.execute({})
+        await tracker.wait_until_condition()
+
+        await runner.resync()
+
+    render = tracker.renders[0]
+    rerender = tracker.events[-1]
+    diff = rerender["diff"][render["renderId"]]
+
+    assert rerender["type"] == EventType.SdkToServer.RERENDER_UI_V3
+    assert diff["rootId"] == render["rootComponentId"]
+    assert diff["delete"] == []
+    assert diff["add"][diff["rootId"]] == tracker.events[0]["ui"]
@@ -124,6 +124,9 @@ def create_fake_table(rows):
     return [create_fake_data(i) for i in range(rows)]
 
 
+columnar_columns = ["id", "name", "email", "age", "isActive", "createdAt"]
+
+
 @pytest.mark.benchmark
 def test_compress_10k_rows(benchmark):
 
@@ -141,7 +144,7 @@ def test_compress_10k_rows(benchmark):
     benchmark.extra_info["layout_size_mb"] = layout_size_mb
     benchmark.extra_info["compressed_size_mb"] = compressed_size_mb
 
-    print(f"Layout size: {layout_size_mb:.2f} MB -> {compressed_size_mb:.2f} MB")
+    assert compressed_size_mb <= layout_size_mb
 
     result = benchmark(Compress.ui_tree, layout)
 
@@ -164,7 +167,7 @@ def test_compress_10k_rows_with_columns_property(benchmark):
     benchmark.extra_info["layout_size_mb"] = layout_size_mb
     benchmark.extra_info["compressed_size_mb"] = compressed_size_mb
 
-    print(f"Layout size: {layout_size_mb:.2f} MB -> {compressed_size_mb:.2f} MB")
+    assert compressed_size_mb < layout_size_mb
 
     result = benchmark(Compress.ui_tree, layout)
 
@@ -186,7 +189,7 @@ def test_compress_100k_rows(benchmark):
     benchmark.extra_info["layout_size_mb"] = layout_size_mb
     benchmark.extra_info["compressed_size_mb"] = compressed_size_mb
 
-    print(f"Layout size: {layout_size_mb:.2f} MB -> {compressed_size_mb:.2f} MB")
+    assert compressed_size_mb <= layout_size_mb
 
     result = benchmark(Compress.ui_tree, layout)
 
@@ -209,6 +212,86 @@ def test_compress_100k_rows_with_columns_property(benchmark):
     benchmark.extra_info["layout_size_mb"] = layout_size_mb
     benchmark.extra_info["compressed_size_mb"] = compressed_size_mb
 
-    print(f"Layout size: {layout_size_mb:.2f} MB -> {compressed_size_mb:.2f} MB")
+    assert compressed_size_mb < layout_size_mb
 
     result = benchmark(Compress.ui_tree, layout)
+
+
+@pytest.mark.benchmark
+def test_compress_10k_rows_columnar(benchmark):
+
+    fake_data = create_fake_table(10000)
+
+    layout = ui.table(
+        "table",
+        fake_data,
+        columns=columnar_columns,
+    )
+
+    compressed = Compress.ui_tree(layout)
+    columnar = Compress.ui_tree(layout, columnar=True)
+
+    compressed_size_mb = len(JSON.stringify(compressed).encode()) / 1024 / 1024
+    columnar_size_mb = len(JSON.stringify(columnar).encode()) / 1024 / 1024
+    benchmark.extra_info["compressed_size_mb"] = compressed_size_mb
+    benchmark.extra_info["columnar_size_mb"] = columnar_size_mb
+
+    assert columnar_size_mb < compressed_size_mb
+
+    result = benchmark(Compress.ui_tree, layout, True)
+
+
+@pytest.mark.benchmark
+def test_compress_100k_rows_columnar(benchmark):
+
+    fake_data = create_fake_table(100000)
+
+    layout = ui.table(
+        "table",
+        fake_data,
+        columns=columnar_columns,
+    )
+
+    compressed = Compress.ui_tree(layout)
+    columnar = Compress.ui_tree(layout, columnar=True)
+
+    compressed_size_mb = len(JSON.stringify(compressed).encode()) / 1024 / 1024
+    columnar_size_mb = len(JSON.stringify(columnar).encode()) / 1024 / 1024
+    benchmark.extra_info["compressed_size_mb"] = compressed_size_mb
+    benchmark.extra_info["columnar_size_mb"] = columnar_size_mb
+
+    assert columnar_size_mb < compressed_size_mb
+
+    result = benchmark(Compress.ui_tree, layout, True)
+
+
+@pytest.mark.benchmark
+def test_encode_100k_rows(benchmark):
+
+    fake_data = create_fake_table(100000)
+
+    layout = ui.table(
+        "table",
+        fake_data,
+        columns=columnar_columns,
+    )
+
+    compressed = Compress.ui_tree(layout)
+
+    result = benchmark(JSON.to_bytes, compressed)
+
+
+@pytest.mark.benchmark
+def test_encode_100k_rows_columnar(benchmark):
+
+    fake_data = create_fake_table(100000)
+
+    layout = ui.table(
+        "table",
+        fake_data,
+        columns=columnar_columns,
+    )
+
+    columnar = Compress.ui_tree(layout, columnar=True)
+
+    result = benchmark(JSON.to_bytes, columnar)
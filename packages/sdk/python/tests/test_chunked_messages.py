@@ -0,0 +1,131 @@
+import os
+from typing import List
+
+from compose_sdk.api import (
+    ApiHandler,
+    ChunkAssembler,
+    encode_chunked_message,
+    encode_chunks,
+    encode_sdk_message,
+)
+from compose_sdk.api.compression import (
+    Codec,
+    PayloadCompressor,
+    decode_compressed_message,
+)
+from compose_sdk.api.ws_message import CHUNK_HEADER_LENGTH, decode_chunk
+from compose_sdk.core.eventType import SDK_TO_SERVER_EVENT_TYPE
+
+SESSION_ID = "s" * 36
+EXECUTION_ID = "e" * 36
+HEADER = (SESSION_ID + EXECUTION_ID).encode("utf-8")
+
+
+def render(size: int) -> bytes:
+    return encode_sdk_message(
+        {"type": SDK_TO_SERVER_EVENT_TYPE.RENDER_UI_V2, "data": "x" * size},
+        SESSION_ID,
+        EXECUTION_ID,
+    )
+
+
+def test_splits_and_reassembles_messages():
+    message = render(10_000)
+    chunks = list(encode_chunked_message(message, 1, chunk_size=1024))
+    assembler = ChunkAssembler()
+
+    assert len(chunks) == 10
+    assert all(len(chunk) <= CHUNK_HEADER_LENGTH + 1024 for chunk in chunks)
+    assert all(chunk[:2].decode("utf-8") == "bo" for chunk in chunks)
+    assert all(chunk[2:74] == HEADER for chunk in chunks)
+
+    results = [assembler.add(chunk) for chunk in chunks]
+
+    assert results[:-1] == [None] * 9
+    assert results[-1] == message
+    assert assembler.pending == {}
+
+
+def test_reassembles_interleaved_messages():
+    first = render(5000)
+    second = render(3000)
+    assembler = ChunkAssembler()
+
+    first_chunks = list(encode_chunked_message(first, 1, chunk_size=1024))
+    second_chunks = list(encode_chunked_message(second, 2, chunk_size=1024))
+
+    results = []
+
+    for idx in range(max(len(first_chunks), len(second_chunks))):
+        for chunks in [first_chunks, second_chunks]:
+            if idx < len(chunks):
+                result = assembler.add(chunks[idx])
+
+                if result is not None:
+                    results.append(result)
+
+    assert results == [second, first]
+
+
+def test_discards_messages_with_missing_chunks():
+    message = render(5000)
+    chunks = list(encode_chunked_message(message, 1, chunk_size=1024))
+    assembler = ChunkAssembler()
+
+    for chunk in chunks[:2] + chunks[3:]:
+        assert assembler.add(chunk) is None
+
+    assert assembler.pending == {}
+    assert assembler.pending_bytes == 0
+
+
+def test_streams_chunks_from_pieces():
+    pieces = [os.urandom(size) for size in [100, 3000, 1, 2000]]
+    chunks = list(encode_chunks("bo", HEADER, 7, iter(pieces), chunk_size=1024))
+
+    decoded = [decode_chunk(chunk) for chunk in chunks]
+
+    assert [index for _, _, index, _, _ in decoded] == list(range(len(chunks)))
+    assert len(chunks) == 5
+    assert [is_last for _, _, _, is_last, _ in decoded] == [False] * 4 + [True]
+    assert b"".join(data for *_, data in decoded) == b"".join(pieces)
+
+
+def test_evicts_oldest_incomplete_message():
+    assembler = ChunkAssembler(max_pending_bytes=3000)
+    first = list(encode_chunked_message(render(5000), 1, chunk_size=1024))
+    second = list(encode_chunked_message(render(5000), 2, chunk_size=1024))
+
+    assembler.add(first[0])
+    assembler.add(first[1])
+    assembler.add(second[0])
+    assembler.add(second[1])
+
+    assert list(assembler.pending.keys()) == [(HEADER, 2)]
+    assert assembler.pending_bytes == 2048
+
+
+async def test_compresses_messages_before_splitting_them(api: ApiHandler):
+    api.compressor = PayloadCompressor(threshold_bytes=1024, codecs=[Codec.ZLIB])
+    api.chunk_size_bytes = 64
+    api.capabilities = {"compressed", "chunk"}
+    frames: List[bytes] = []
+
+    async def write(frame: bytes) -> None:
+        frames.append(frame)
+
+    message = render(100_000)
+    streamed = list(encode_chunks("bo", HEADER, 7, iter([message]), chunk_size=64))
+    writer = api._APIHandler__writer(write)  # type: ignore[attr-defined]
+
+    for frame in [message, *streamed]:
+        await writer(frame)
+
+    assembler = ChunkAssembler()
+    results = [assembler.add(frame) for frame in frames]
+    compressed, *rest = [result for result in results if result is not None]
+
+    assert all(frame[:2].decode("utf-8") == "bo" for frame in frames)
+    assert decode_compressed_message(compressed) == message
+    assert frames[-len(streamed) :] == streamed
+    assert rest == [message]
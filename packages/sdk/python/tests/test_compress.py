@@ -382,3 +382,46 @@ def test_handles_primary_key_not_present_in_inferred_columns():
 
     assert compressed["model"]["properties"]["data"] == expected_data
     assert compressed["model"]["properties"]["primaryKey"] == "i"
+
+
+def test_columnar_table_compression():
+    layout = ui.table(
+        "table",
+        [
+            {"id": "1", "name": "row 1"},
+            {"id": "2"},
+        ],
+        columns=["id", "name"],
+        primary_key="id",
+    )
+
+    compressed = Compress.ui_tree(layout, columnar=True)
+    properties = compressed["model"]["properties"]
+
+    assert properties["dataVersion"] == 2
+    assert properties["data"] == {"i": ["1", "2"], "1": ["row 1", None]}
+    assert properties["primaryKey"] == "i"
+    assert (
+        properties["columns"]
+        == Compress.ui_tree(layout)["model"]["properties"]["columns"]
+    )
+
+
+def test_columnar_table_compression_separately_assigns_primary_key():
+    layout = ui.table(
+        "table",
+        [
+            {"id": "1", "name": "row 1", "hidden_id": "hidden-1"},
+            {"id": "2", "name": "row 2", "hidden_id": "hidden-2"},
+        ],
+        columns=["id", "name"],
+        primary_key="hidden_id",
+    )
+
+    compressed = Compress.ui_tree(layout, columnar=True)
+
+    assert compressed["model"]["properties"]["data"] == {
+        "0": ["1", "2"],
+        "1": ["row 1", "row 2"],
+        "i": ["hidden-1", "hidden-2"],
+    }
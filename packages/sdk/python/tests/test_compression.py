@@ -0,0 +1,102 @@
+import os
+from typing import List, Set
+
+from compose_sdk.api import ApiHandler, encode_chunked_message, encode_sdk_message
+from compose_sdk.api.compression import (
+    Codec,
+    PayloadCompressor,
+    decode_compressed_message,
+)
+from compose_sdk.core.eventType import SDK_TO_SERVER_EVENT_TYPE
+
+SESSION_ID = "s" * 36
+EXECUTION_ID = "e" * 36
+
+
+def render(rows: int) -> bytes:
+    return encode_sdk_message(
+        {
+            "type": SDK_TO_SERVER_EVENT_TYPE.RENDER_UI_V2,
+            "data": [{"id": idx, "name": f"Row {idx}"} for idx in range(rows)],
+        },
+        SESSION_ID,
+        EXECUTION_ID,
+    )
+
+
+def test_compresses_large_messages():
+    compressor = PayloadCompressor(threshold_bytes=1024, codecs=[Codec.ZLIB])
+    message = render(1000)
+
+    assert compressor.should_compress(message)
+
+    compressed = compressor.compress(message)
+
+    assert compressed[:2].decode("utf-8") == SDK_TO_SERVER_EVENT_TYPE.COMPRESSED
+    assert compressed[2:74] == message[2:74]
+    assert len(compressed) < len(message) / 4
+    assert decode_compressed_message(compressed) == message
+
+
+def test_skips_small_and_initialize_messages():
+    compressor = PayloadCompressor(threshold_bytes=1024)
+    initialize = encode_sdk_message(
+        {"type": SDK_TO_SERVER_EVENT_TYPE.INITIALIZE, "padding": "x" * 2048}
+    )
+
+    assert not compressor.should_compress(render(1))
+    assert not compressor.should_compress(initialize)
+
+
+def test_sends_incompressible_messages_as_is():
+    compressor = PayloadCompressor(threshold_bytes=1024, codecs=[Codec.ZLIB])
+    message = render(0) + os.urandom(4096)
+
+    assert compressor.compress(message) == message
+
+
+def test_stops_compressing_when_it_does_not_pay_off():
+    message = render(1000)
+
+    slow_network = PayloadCompressor(
+        bandwidth_bytes_per_second=1024, codecs=[Codec.ZLIB]
+    )
+    fast_network = PayloadCompressor(
+        bandwidth_bytes_per_second=1e15, codecs=[Codec.ZLIB]
+    )
+
+    for compressor in [slow_network, fast_network]:
+        # The first message samples the codec.
+        assert compressor.choose(len(message)) == Codec.ZLIB
+        compressor.compress(message)
+
+    assert slow_network.choose(len(message)) == Codec.ZLIB
+    assert fast_network.choose(len(message)) is None
+
+
+def test_skips_chunks():
+    compressor = PayloadCompressor(threshold_bytes=1024, codecs=[Codec.ZLIB])
+    chunks = list(encode_chunked_message(render(1000), 1, chunk_size=4096))
+
+    assert not any(compressor.should_compress(chunk) for chunk in chunks)
+
+
+async def test_only_compresses_if_the_server_accepts_compressed_messages(
+    api: ApiHandler,
+):
+    api.compressor = PayloadCompressor(threshold_bytes=1024, codecs=[Codec.ZLIB])
+    message = render(1000)
+
+    async def write_with(capabilities: Set[str]) -> bytes:
+        frames: List[bytes] = []
+
+        async def write(frame: bytes) -> None:
+            frames.append(frame)
+
+        api.capabilities = capabilities
+        await api._APIHandler__writer(write)(message)  # type: ignore[attr-defined]
+
+        return frames[0]
+
+    assert await write_with(set()) == message
+    assert decode_compressed_message(await write_with({"compressed"})) == message
@@ -0,0 +1,133 @@
+import io
+import os
+from typing import Any, AsyncIterator, List, Set
+
+import pytest
+
+from compose_sdk.api import ApiHandler, ChunkAssembler
+from compose_sdk.api.ws_message import StreamedMessage
+from compose_sdk.core.eventType import SDK_TO_SERVER_EVENT_TYPE
+from compose_sdk.core.file_stream import iter_file
+from tests.conftest import AppRunnerFactory
+
+CONTENT = os.urandom(10_000)
+
+
+def handler() -> None:
+    pass
+
+
+async def download(
+    api: ApiHandler,
+    app_runner_factory: AppRunnerFactory,
+    file: Any,
+    chunk_size_bytes: Any = None,
+    capabilities: Set[str] = {"chunk"},
+) -> List[bytes]:
+    api.chunk_size_bytes = chunk_size_bytes
+    api.capabilities = capabilities
+
+    with app_runner_factory(handler=handler) as runner:
+        await runner.download(file, "file.bin")
+
+    messages: List[bytes] = []
+
+    while api.send_queue.size > 0:
+        message = await api.send_queue.get()
+
+        if isinstance(message, StreamedMessage):
+            message = b"".join([bytes(piece) async for piece in message.fragments()])
+
+        messages.append(message)
+
+    return messages
+
+
+def get_file_contents(message: bytes) -> bytes:
+    assert message[:2].decode("utf-8") == SDK_TO_SERVER_EVENT_TYPE.FILE_TRANSFER_V2
+
+    # Event type, followed by the session and execution IDs of the runner.
+    offset = 2 + len("test_browser_session_id") + len("test_execution_id")
+    metadata_length = int.from_bytes(message[offset : offset + 4], byteorder="big")
+    return message[offset + 4 + metadata_length :]
+
+
+async def async_pieces() -> AsyncIterator[bytes]:
+    for offset in range(0, len(CONTENT), 3000):
+        yield CONTENT[offset : offset + 3000]
+
+
+@pytest.fixture
+def path(tmp_path):
+    file_path = tmp_path / "file.bin"
+    file_path.write_bytes(CONTENT)
+    return file_path
+
+
+@pytest.mark.parametrize(
+    "source", ["bytes", "path", "file_object", "iterator", "async"]
+)
+async def test_downloads_every_file_source(
+    api: ApiHandler, app_runner_factory: AppRunnerFactory, path, source: str
+):
+    file = {
+        "bytes": lambda: CONTENT,
+        "path": lambda: path,
+        "file_object": lambda: io.BytesIO(CONTENT),
+        "iterator": lambda: iter([CONTENT[:100], CONTENT[100:]]),
+        "async": async_pieces,
+    }[source]()
+
+    messages = await download(api, app_runner_factory, file)
+
+    assert len(messages) == 1
+    assert get_file_contents(messages[0]) == CONTENT
+
+
+async def test_downloads_strings_as_their_content(
+    api: ApiHandler, app_runner_factory: AppRunnerFactory, path
+):
+    messages = await download(api, app_runner_factory, str(path))
+
+    assert get_file_contents(messages[0]) == str(path).encode("utf-8")
+
+
+async def test_streams_chunks_when_chunking_is_enabled(
+    api: ApiHandler, app_runner_factory: AppRunnerFactory, path
+):
+    messages = await download(api, app_runner_factory, path, chunk_size_bytes=1024)
+
+    assert len(messages) > 1
+    assert all(
+        message[:2].decode("utf-8") == SDK_TO_SERVER_EVENT_TYPE.CHUNK
+        for message in messages
+    )
+
+    assembler = ChunkAssembler()
+    results = [assembler.add(message) for message in messages]
+
+    assert results[:-1] == [None] * (len(messages) - 1)
+    assert get_file_contents(results[-1]) == CONTENT  # type: ignore[arg-type]
+
+
+async def test_streams_whole_messages_if_the_server_does_not_accept_chunks(
+    api: ApiHandler, app_runner_factory: AppRunnerFactory, path
+):
+    messages = await download(
+        api, app_runner_factory, path, chunk_size_bytes=1024, capabilities=set()
+    )
+
+    assert len(messages) == 1
+    assert get_file_contents(messages[0]) == CONTENT
+
+
+async def test_reads_paths_in_pieces(path):
+    pieces = iter_file(path, read_size=4096)
+    sizes = [len(piece) async for piece in pieces]  # type: ignore[union-attr]
+
+    assert sizes == [4096, 4096, 1808]
+
+
+def test_rejects_unsupported_sources():
+    with pytest.raises(TypeError):
+        iter_file(123)  # type: ignore[arg-type]
@@ -0,0 +1,210 @@
+import asyncio
+from typing import Any, Dict, List
+
+from compose_sdk.core import EventType
+from compose_sdk.event_dispatcher import EventDispatcher
+
+
+def click(execution_id: str, component_id: str) -> Dict[str, Any]:
+    return {
+        "type": EventType.ServerToSdk.ON_CLICK_HOOK,
+        "executionId": execution_id,
+        "componentId": component_id,
+    }
+
+
+def page_change(execution_id: str, offset: int) -> Dict[str, Any]:
+    return {
+        "type": EventType.ServerToSdk.ON_TABLE_PAGE_CHANGE_HOOK,
+        "executionId": execution_id,
+        "renderId": "render",
+        "componentId": "table",
+        "offset": offset,
+    }
+
+
+class Recorder:
+    def __init__(self, duration: float = 0.01) -> None:
+        self.duration = duration
+        self.log: List[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def handle(self, event: Dict[str, Any]) -> None:
+        name = (
+            f"{event['executionId']}:{event.get('componentId')}:{event.get('offset')}"
+        )
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.log.append(f"start {name}")
+        await asyncio.sleep(self.duration)
+        self.log.append(f"end {name}")
+        self.running -= 1
+
+
+async def wait_until_idle(dispatcher: EventDispatcher) -> None:
+    while dispatcher.mailboxes:
+        await asyncio.sleep(0.005)
+
+
+async def test_starts_events_without_waiting_by_default():
+    recorder = Recorder()
+    dispatcher = EventDispatcher(recorder.handle)
+
+    await dispatcher.dispatch(click("a", "first"))
+    await dispatcher.dispatch(click("a", "second"))
+    await wait_until_idle(dispatcher)
+
+    assert recorder.log[:2] == ["start a:first:None", "start a:second:None"]
+
+
+async def test_handles_events_of_an_execution_in_order_while_held():
+    recorder = Recorder()
+    dispatcher = EventDispatcher(recorder.handle, max_hold_seconds=1)
+
+    await dispatcher.dispatch(click("a", "first"))
+    await dispatcher.dispatch(click("a", "second"))
+    await wait_until_idle(dispatcher)
+
+    assert recorder.log == [
+        "start a:first:None",
+        "end a:first:None",
+        "start a:second:None",
+        "end a:second:None",
+    ]
+
+
+async def test_handles_executions_concurrently_up_to_the_limit():
+    recorder = Recorder()
+    dispatcher = EventDispatcher(recorder.handle, max_concurrency=2)
+
+    for execution_id in ["a", "b", "c", "d"]:
+        await dispatcher.dispatch(click(execution_id, "button"))
+
+    await wait_until_idle(dispatcher)
+
+    assert recorder.max_running == 2
+    assert dispatcher.metrics()["handled"] == 4
+
+
+async def test_coalesces_waiting_page_changes():
+    recorder = Recorder()
+    dispatcher = EventDispatcher(recorder.handle)
+
+    await dispatcher.dispatch(click("a", "button"))
+
+    for offset in [10, 20, 30]:
+        await dispatcher.dispatch(page_change("a", offset))
+
+    assert dispatcher.metrics()["depth"] == 2
+
+    await wait_until_idle(dispatcher)
+
+    assert [line for line in recorder.log if line.startswith("start")] == [
+        "start a:button:None",
+        "start a:table:30",
+    ]
+    assert dispatcher.metrics()["coalesced"] == 2
+
+
+async def test_starts_the_next_event_once_the_hold_expires():
+    recorder = Recorder(duration=0.1)
+    dispatcher = EventDispatcher(recorder.handle, max_hold_seconds=0.01)
+
+    await dispatcher.dispatch(click("a", "first"))
+    await dispatcher.dispatch(click("a", "second"))
+    await wait_until_idle(dispatcher)
+
+    assert recorder.log[:2] == ["start a:first:None", "start a:second:None"]
+
+
+async def test_keeps_the_slot_until_events_that_outlive_their_hold_finish():
+    recorder = Recorder(duration=0.05)
+    dispatcher = EventDispatcher(
+        recorder.handle, max_concurrency=1, max_hold_seconds=0.01
+    )
+
+    await dispatcher.dispatch(click("a", "button"))
+    await dispatcher.dispatch(click("b", "button"))
+    await wait_until_idle(dispatcher)
+
+    assert recorder.max_running == 1
+    assert recorder.log == [
+        "start a:button:None",
+        "end a:button:None",
+        "start b:button:None",
+        "end b:button:None",
+    ]
+
+
+async def test_starts_events_that_a_running_handler_waits_for():
+    submitted = asyncio.Event()
+    log: List[str] = []
+
+    async def handle(event: Dict[str, Any]) -> None:
+        if event["componentId"] == "form":
+            submitted.set()
+        else:
+            # e.g. a modal that waits for its form to be submitted.
+            await submitted.wait()
+
+        log.append(event["componentId"])
+
+    dispatcher = EventDispatcher(handle, max_concurrency=1)
+
+    await dispatcher.dispatch(click("a", "button"))
+    await dispatcher.dispatch(click("a", "form"))
+    await asyncio.wait_for(wait_until_idle(dispatcher), timeout=1)
+
+    assert log == ["form", "button"]
+
+
+async def test_handles_replies_right_away():
+    recorder = Recorder(duration=0.05)
+    dispatcher = EventDispatcher(recorder.handle)
+
+    await dispatcher.dispatch(click("a", "button"))
+    await asyncio.sleep(0.01)
+    await dispatcher.dispatch(
+        {
+            "type": EventType.ServerToSdk.ON_CONFIRM_RESPONSE_HOOK,
+            "executionId": "a",
+            "componentId": "confirm",
+        }
+    )
+
+    # The reply didn't wait for the click to be handled.
+    assert recorder.log[:2] == ["start a:button:None", "start a:confirm:None"]
+
+    await wait_until_idle(dispatcher)
+
+
+async def test_reports_wait_times():
+    recorder = Recorder(duration=0.02)
+    dispatcher = EventDispatcher(recorder.handle, max_hold_seconds=1)
+
+    await dispatcher.dispatch(click("a", "first"))
+    await dispatcher.dispatch(click("a", "second"))
+
+    assert dispatcher.metrics()["max_depth"] == 2
+
+    await wait_until_idle(dispatcher)
+    metrics = dispatcher.metrics()
+
+    assert metrics["mailboxes"] == 0
+    assert metrics["depth"] == 0
+    assert metrics["max_wait_ms"] >= 15
+    assert 0 < metrics["average_wait_ms"] < metrics["max_wait_ms"]
+
+
+async def test_cancels_a_page_change_that_is_superseded_while_handled():
+    recorder = Recorder(duration=0.05)
+    dispatcher = EventDispatcher(recorder.handle)
+
+    await dispatcher.dispatch(page_change("a", 10))
+    await asyncio.sleep(0.01)
+    await dispatcher.dispatch(page_change("a", 20))
+    await wait_until_idle(dispatcher)
+
+    assert recorder.log == ["start a:table:10", "start a:table:20", "end a:table:20"]
+    assert dispatcher.metrics()["coalesced"] == 1
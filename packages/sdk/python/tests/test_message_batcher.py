@@ -0,0 +1,188 @@
+import asyncio
+from typing import Any, List
+
+from compose_sdk.api import ApiHandler, decode_batch_message, encode_sdk_message
+from compose_sdk.api.batcher import MessageBatcher
+from compose_sdk.core.eventType import SDK_TO_SERVER_EVENT_TYPE
+
+SESSION_ID = "s" * 36
+EXECUTION_A = "a" * 36
+EXECUTION_B = "b" * 36
+
+
+def toast(message: str, execution_id: str = EXECUTION_A) -> bytes:
+    return encode_sdk_message(
+        {"type": SDK_TO_SERVER_EVENT_TYPE.TOAST_V2, "message": message},
+        SESSION_ID,
+        execution_id,
+    )
+
+
+class Sink:
+    def __init__(self) -> None:
+        self.messages: List[bytes] = []
+        self.keys: List[Any] = []
+
+    async def send(
+        self, message: bytes, key: Any = None, supersedes: List[Any] = []
+    ) -> None:
+        self.messages.append(message)
+        self.keys.append((key, supersedes))
+
+    @property
+    def types(self) -> List[str]:
+        return [message[:2].decode("utf-8") for message in self.messages]
+
+
+async def test_batches_messages_sent_in_the_same_tick():
+    sink = Sink()
+    batcher = MessageBatcher(sink.send)
+    messages = [toast(str(idx)) for idx in range(3)]
+
+    for message in messages:
+        await batcher.add(message)
+
+    assert sink.messages == []
+
+    await asyncio.sleep(0.01)
+
+    assert sink.types == [SDK_TO_SERVER_EVENT_TYPE.BATCH]
+    assert sink.messages[0][2:74] == (SESSION_ID + EXECUTION_A).encode("utf-8")
+    assert decode_batch_message(sink.messages[0]) == messages
+
+
+async def test_sends_single_messages_as_is():
+    sink = Sink()
+    batcher = MessageBatcher(sink.send, window_ms=5)
+    message = toast("hello")
+
+    await batcher.add(message)
+    await asyncio.sleep(0.02)
+
+    assert sink.messages == [message]
+
+
+async def test_batches_each_execution_separately():
+    sink = Sink()
+    batcher = MessageBatcher(sink.send)
+    messages = [
+        toast("1", EXECUTION_A),
+        toast("2", EXECUTION_B),
+        toast("3", EXECUTION_A),
+        toast("4", EXECUTION_B),
+    ]
+
+    for message in messages:
+        await batcher.add(message)
+
+    await batcher.flush()
+
+    assert [decode_batch_message(message) for message in sink.messages] == [
+        [messages[0], messages[2]],
+        [messages[1], messages[3]],
+    ]
+
+
+async def test_large_messages_flush_pending_messages_first():
+    sink = Sink()
+    batcher = MessageBatcher(sink.send, max_batch_bytes=500)
+    small = toast("small")
+    large = toast("x" * 500)
+
+    await batcher.add(small)
+    await batcher.add(large)
+
+    assert sink.messages == [small, large]
+
+
+async def test_initialize_is_never_batched():
+    sink = Sink()
+    batcher = MessageBatcher(sink.send)
+    initialize = encode_sdk_message({"type": SDK_TO_SERVER_EVENT_TYPE.INITIALIZE})
+
+    await batcher.add(toast("1"))
+    await batcher.add(toast("2"))
+    await batcher.add(initialize)
+
+    assert sink.types == [
+        SDK_TO_SERVER_EVENT_TYPE.BATCH,
+        SDK_TO_SERVER_EVENT_TYPE.INITIALIZE,
+    ]
+
+
+def loading(value: bool) -> bytes:
+    return encode_sdk_message(
+        {"type": SDK_TO_SERVER_EVENT_TYPE.UPDATE_LOADING_V2, "value": value},
+        SESSION_ID,
+        EXECUTION_A,
+    )
+
+
+async def test_forwards_supersede_keys():
+    sink = Sink()
+    batcher = MessageBatcher(sink.send)
+    key = ("loading", EXECUTION_A)
+
+    await batcher.add(loading(True), key)
+    await batcher.flush()
+
+    await batcher.add(loading(True), key)
+    await batcher.add(toast("1"))
+    await batcher.add(loading(False), key)
+    await batcher.flush()
+
+    # Newer pending messages supersede older ones, and the batch supersedes
+    # the queued messages with the same key.
+    assert sink.messages[0] == loading(True)
+    assert sink.keys == [(key, []), (None, [key])]
+    assert decode_batch_message(sink.messages[1]) == [toast("1"), loading(False)]
+
+
+def test_creates_the_lock_on_the_loop_that_uses_it():
+    batcher = MessageBatcher(Sink().send)
+
+    assert batcher.lock is None
+
+    asyncio.run(batcher.add(encode_sdk_message({"type": "ab"})))
+
+    assert batcher.lock is not None
+
+
+class Handshake:
+    def __init__(self, capabilities: str) -> None:
+        self.response = type(
+            "Response", (), {"headers": {"x-compose-capabilities": capabilities}}
+        )()
+
+
+async def test_only_batches_if_the_server_accepts_batches(scheduler):
+    api = ApiHandler(
+        scheduler,
+        isDevelopment=True,
+        apiKey="test_api_key",
+        package_name="test_package_name",
+        package_version="test_package_version",
+        batch_window_ms=0,
+    )
+    messages = [toast(str(idx)) for idx in range(3)]
+
+    async def send_all(capabilities: str) -> List[str]:
+        api.capabilities = api._APIHandler__accepted_capabilities(  # type: ignore[attr-defined]
+            Handshake(capabilities)
+        )
+
+        for message in messages:
+            await api.send_raw(message)
+
+        await api.batcher.flush()  # type: ignore[union-attr]
+
+        types: List[str] = []
+
+        while api.send_queue.size > 0:
+            types.append((await api.send_queue.get())[:2].decode("utf-8"))
+
+        return types
+
+    assert "batch" in api.requested_capabilities
+    assert await send_all("") == [SDK_TO_SERVER_EVENT_TYPE.TOAST_V2] * 3
+    assert await send_all("chunk, batch") == [SDK_TO_SERVER_EVENT_TYPE.BATCH]
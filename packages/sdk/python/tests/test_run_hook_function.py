@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+import pytest
+
+from compose_sdk.core.run_hook_function import RunHookFunction
+from compose_sdk.scheduler import Scheduler
+
+
+@pytest.mark.asyncio
+async def test_slow_sync_hook_does_not_block_event_loop():
+    scheduler = Scheduler()
+    scheduler.init(False)
+
+    run_hook_function = RunHookFunction(scheduler)
+
+    def run_on_scheduler(coro):
+        return asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, scheduler._loop)
+        )
+
+    def slow_hook(value):
+        time.sleep(0.3)
+        return value * 2
+
+    try:
+        slow = run_on_scheduler(run_hook_function.execute(slow_hook, 21))
+        await asyncio.sleep(0.02)
+
+        start = time.time()
+        await run_on_scheduler(asyncio.sleep(0.01))
+        elapsed = time.time() - start
+
+        # The loop would be blocked until the hook finishes otherwise.
+        assert elapsed < 0.2
+        assert await slow == 42
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,197 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from compose_sdk.api.send_queue import SendQueue, get_supersede_key
+from compose_sdk.api.ws_message import ChunkEncoder, StreamedMessage
+from compose_sdk.core.eventType import SDK_TO_SERVER_EVENT_TYPE
+
+
+def message(idx: int) -> bytes:
+    return f"message-{idx}".encode("utf-8")
+
+
+async def drain_all(queue: SendQueue) -> List[bytes]:
+    messages: List[bytes] = []
+
+    while queue.metrics()["depth"] > 0:
+        messages.append(await queue.get())
+
+    return messages
+
+
+async def test_drops_oldest_messages_while_disconnected():
+    queue = SendQueue(max_messages=3)
+
+    for idx in range(5):
+        await queue.put(message(idx))
+
+    assert queue.metrics()["dropped"] == 2
+    assert await drain_all(queue) == [message(2), message(3), message(4)]
+
+
+async def test_spills_to_disk_while_disconnected(tmp_path):
+    queue = SendQueue(max_messages=2, spill_dir=str(tmp_path))
+
+    for idx in range(5):
+        await queue.put(message(idx))
+
+    metrics = queue.metrics()
+
+    assert metrics["depth"] == 5
+    assert metrics["spilled"] == 3
+    assert metrics["dropped"] == 0
+    assert await drain_all(queue) == [message(idx) for idx in range(5)]
+    assert queue.spill_file is None
+
+
+async def test_keeps_spilled_streams_in_order(tmp_path):
+    queue = SendQueue(max_messages=1, spill_dir=str(tmp_path))
+    stream = StreamedMessage(message(1), [b"content"])
+
+    await queue.put(message(0))
+    await queue.put(stream)
+    await queue.put(message(2))
+
+    assert queue.metrics()["spilled"] == 2
+    assert await drain_all(queue) == [message(0), stream, message(2)]
+
+
+async def test_drops_streams_that_failed_partway():
+    queue = SendQueue()
+    header = b"ab" + b"x" * 72
+
+    async def write(data) -> None:
+        async for _ in data.fragments():
+            raise ConnectionError()
+
+    await queue.put(StreamedMessage(header, [b"content"]))
+
+    with pytest.raises(ConnectionError):
+        await queue.drain(write)
+
+    assert queue.metrics()["depth"] == 0
+    assert queue.metrics()["dropped"] == 1
+    assert queue.take_desynced() == [header[2:]]
+
+
+async def test_supersedes_older_messages_with_the_same_key():
+    queue = SendQueue()
+
+    def loading(value: bool):
+        data = {"type": SDK_TO_SERVER_EVENT_TYPE.UPDATE_LOADING_V2, "value": value}
+        return get_supersede_key(data, "execution-id")
+
+    await queue.put(b"loading", loading(True))
+    await queue.put(b"rerender")
+    await queue.put(b"done", loading(False))
+
+    assert queue.metrics()["superseded"] == 1
+    assert await drain_all(queue) == [b"rerender", b"done"]
+
+
+def test_rerenders_are_never_superseded():
+    data = {"type": SDK_TO_SERVER_EVENT_TYPE.RERENDER_UI_V3, "diff": {}}
+
+    assert get_supersede_key(data, "execution-id") is None
+
+
+async def test_waits_for_room_while_connected():
+    queue = SendQueue(max_messages=2)
+    queue.set_connected(True)
+
+    await queue.put(message(0))
+    await queue.put(message(1))
+
+    put = asyncio.create_task(queue.put(message(2)))
+    await asyncio.sleep(0.01)
+
+    assert not put.done()
+    assert await queue.get() == message(0)
+
+    await asyncio.wait_for(put, 1)
+
+    assert queue.metrics()["dropped"] == 0
+    assert await drain_all(queue) == [message(1), message(2)]
+
+
+async def test_keeps_failed_message_at_the_front():
+    queue = SendQueue()
+    written: List[bytes] = []
+
+    async def write(data: bytes) -> None:
+        if len(written) == 1:
+            raise ConnectionError()
+
+        written.append(data)
+
+    for idx in range(3):
+        await queue.put(message(idx))
+
+    with pytest.raises(ConnectionError):
+        await queue.drain(write)
+
+    assert written == [message(0)]
+    assert await drain_all(queue) == [message(1), message(2)]
+
+
+async def test_supersedes_queued_messages_of_a_batch():
+    queue = SendQueue()
+
+    await queue.put(b"loading", "loading-key")
+    await queue.put(b"batch", None, ["loading-key"])
+
+    assert queue.metrics()["superseded"] == 1
+    assert await drain_all(queue) == [b"batch"]
+
+
+def header(execution_id: str) -> bytes:
+    return ("s" * 36 + execution_id.rjust(36, "e")).encode("utf-8")
+
+
+def sdk_message(event_type: str, execution_id: str) -> bytes:
+    return event_type.encode("utf-8") + header(execution_id) + b"{}"
+
+
+async def test_drops_supersedable_messages_first():
+    queue = SendQueue(max_messages=2)
+    rerender = sdk_message(SDK_TO_SERVER_EVENT_TYPE.RERENDER_UI_V3, "a")
+
+    await queue.put(rerender)
+    await queue.put(b"loading", "loading-key")
+    await queue.put(message(0))
+
+    assert queue.metrics()["dropped"] == 1
+    assert queue.take_desynced() == []
+    assert await drain_all(queue) == [rerender, message(0)]
+
+
+async def test_marks_executions_that_lost_a_rerender():
+    dropped: List[bytes] = []
+    queue = SendQueue(max_messages=1, on_drop=dropped.append)
+    rerender = sdk_message(SDK_TO_SERVER_EVENT_TYPE.RERENDER_UI_V3, "a")
+
+    await queue.put(b"loading", "loading-key")
+    await queue.put(rerender)
+    await queue.put(message(0))
+
+    assert queue.take_desynced() == [header("a")]
+    assert queue.take_desynced() == []
+    # Superseded and supersedable messages aren't reported.
+    assert dropped == [rerender]
+
+
+async def test_drops_the_rest_of_a_chunked_message():
+    queue = SendQueue(max_messages=2)
+    encoder = ChunkEncoder(SDK_TO_SERVER_EVENT_TYPE.CHUNK, header("a"), 1, 4)
+    chunks = [*encoder.feed(b"0123456789"), encoder.finish()]
+
+    for chunk in chunks:
+        await queue.put(chunk)
+
+    await queue.put(message(0))
+
+    assert queue.metrics()["dropped"] == len(chunks)
+    assert queue.take_desynced() == [header("a")]
+    assert await drain_all(queue) == [message(0)]
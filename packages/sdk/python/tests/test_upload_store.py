@@ -0,0 +1,144 @@
+import asyncio
+import io
+import os
+
+import pytest
+
+from compose_sdk.core.file import File
+from compose_sdk.core.upload_store import UploadStore
+
+OWNER = "execution_id"
+
+
+def test_keeps_uploads_in_memory_within_the_budget():
+    store = UploadStore(memory_budget_bytes=1000)
+    store.put(OWNER, "a", b"x" * 400)
+    store.put(OWNER, "b", b"y" * 400)
+
+    assert store.metrics() == {"count": 2, "memory_bytes": 800, "disk_bytes": 0}
+    assert store.get(OWNER, "a") == b"x" * 400
+
+
+def test_spills_oldest_uploads_past_the_budget():
+    store = UploadStore(memory_budget_bytes=1000)
+    store.put(OWNER, "a", b"x" * 600)
+    store.put(OWNER, "b", b"y" * 600)
+
+    assert store.metrics() == {"count": 2, "memory_bytes": 600, "disk_bytes": 600}
+    assert store.get(OWNER, "b") == b"y" * 600
+
+    spilled = store.get(OWNER, "a")
+
+    assert isinstance(spilled, io.IOBase)
+    assert spilled.read() == b"x" * 600
+
+
+def test_spills_uploads_larger_than_the_budget():
+    store = UploadStore(memory_budget_bytes=100)
+    store.put(OWNER, "a", b"x" * 500)
+
+    assert store.metrics() == {"count": 1, "memory_bytes": 0, "disk_bytes": 500}
+
+
+def test_expires_unclaimed_uploads():
+    store = UploadStore(ttl_seconds=0)
+    store.put(OWNER, "a", b"x")
+    store.put(OWNER, "b", b"y")
+
+    assert list(store.uploads) == ["b"]
+
+    store.expire()
+
+    assert store.metrics() == {"count": 0, "memory_bytes": 0, "disk_bytes": 0}
+
+
+def test_scopes_uploads_to_their_owner():
+    store = UploadStore()
+    first = store.scope("first")
+    second = store.scope("second")
+
+    first["a"] = b"x"
+    second["b"] = b"y"
+
+    assert dict(first) == {"a": b"x"}
+    assert "a" not in second
+
+    first.discard_all()
+
+    assert first == {}
+    assert dict(second) == {"b": b"y"}
+
+
+def test_deleting_an_upload_hands_it_to_the_caller():
+    store = UploadStore(memory_budget_bytes=0)
+    uploads = store.scope(OWNER)
+    uploads["a"] = b"x" * 10
+
+    content = uploads["a"]
+    del uploads["a"]
+
+    assert store.metrics()["count"] == 0
+    assert not content.closed  # type: ignore[union-attr]
+    assert File(content, "a.txt", "text/plain").read() == b"x" * 10
+
+
+def test_reads_files_from_memory_and_disk():
+    content = os.urandom(1000)
+    disk = io.BytesIO(content)
+
+    for source in [memoryview(content), disk]:
+        file = File(source, "file.bin", "application/octet-stream")
+
+        assert file.read(10) == content[:10]
+        assert file.tell() == 10
+        assert file.read() == content[10:]
+        assert file.getvalue() == content
+
+        file.seek(-5, io.SEEK_END)
+
+        assert file.read() == content[-5:]
+
+        file.close()
+
+    assert disk.closed
+
+
+def test_files_support_the_methods_of_bytes_io():
+    content = b"x" * 10
+    file = File(content, "file.txt", "text/plain")
+
+    assert bytes(file.getbuffer()) == content
+
+    file.seek(5)
+    file.write(b"yy")
+
+    assert file.getvalue() == b"xxxxxyyxxx"
+    assert bytes(file.getbuffer()) == b"xxxxxyyxxx"
+    assert content == b"x" * 10
+
+    file.truncate(3)
+
+    assert file.getvalue() == b"xxx"
+
+
+def test_get_discards_expired_uploads():
+    store = UploadStore(ttl_seconds=60)
+    store.put(OWNER, "a", b"x")
+    store.uploads["a"].created_at -= 60
+
+    with pytest.raises(KeyError):
+        store.get(OWNER, "a")
+
+    assert store.metrics()["count"] == 0
+
+
+async def test_expires_uploads_periodically():
+    store = UploadStore(ttl_seconds=0.01)
+    store.put(OWNER, "a", b"x")
+    task = asyncio.get_running_loop().create_task(store.expire_periodically())
+
+    try:
+        await asyncio.sleep(0.05)
+        assert store.metrics()["count"] == 0
+    finally:
+        task.cancel()
@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+import compose_sdk as c
+from compose_sdk.core import JSON
+from compose_sdk.core.eventType import (
+    SDK_TO_SERVER_EVENT_TYPE,
+    SERVER_TO_SDK_EVENT_TYPE,
+)
+from compose_sdk.worker_pool import DEFAULT_SHARD, WorkerPool, is_supported
+
+pytestmark = pytest.mark.skipif(not is_supported(), reason="requires fork")
+
+SESSION_ID = "s" * 36
+
+
+def handler(page: c.Page, ui: c.UI):
+    page.add(lambda: ui.text(str(os.getpid())))
+
+
+def execution_ids_for_each_worker(client: c.Client) -> List[str]:
+    pool = client.worker_pool
+    assert pool is not None
+
+    ids: Dict[int, str] = {}
+    idx = 0
+
+    while len(ids) < pool.size:
+        execution_id = f"{idx:036d}"
+        ids.setdefault(pool.shard(execution_id), execution_id)
+        idx += 1
+
+    return list(ids.values())
+
+
+def test_shards_executions_across_worker_processes():
+    client = c.Client(
+        api_key="test_api_key",
+        apps=[c.App(route="test-app", handler=handler)],
+        DANGEROUS_ENABLE_DEV_MODE=True,
+        workers=2,
+    )
+
+    messages: List[bytes] = []
+
+    async def send_raw(data: bytes) -> None:
+        messages.append(data)
+
+    client.api.send_raw = send_raw  # type: ignore
+    client.api.connect = lambda on_connect_data: None  # type: ignore
+
+    client.connect_async()
+
+    try:
+        execution_ids = execution_ids_for_each_worker(client)
+
+        for execution_id in execution_ids:
+            asyncio.run_coroutine_threadsafe(
+                client.worker_pool.dispatch(  # type: ignore
+                    {
+                        "type": SERVER_TO_SDK_EVENT_TYPE.START_EXECUTION,
+                        "appRoute": "test-app",
+                        "executionId": execution_id,
+                        "sessionId": SESSION_ID,
+                        "params": {},
+                    }
+                ),
+                client.scheduler._loop,  # type: ignore
+            ).result()
+
+        pids: Dict[str, Any] = {}
+        start = time.time()
+
+        while len(pids) < len(execution_ids) and time.time() - start < 10:
+            for message in messages:
+                if message[:2].decode("utf-8") != SDK_TO_SERVER_EVENT_TYPE.RENDER_UI_V2:
+                    continue
+
+                # Header is the event type, session ID and execution ID.
+                execution_id = message[38:74].decode("utf-8")
+                data = JSON.parse(message[74:].decode("utf-8"))
+                pids[execution_id] = data["ui"]["model"]["properties"]["text"]
+
+            time.sleep(0.01)
+
+        assert set(pids.keys()) == set(execution_ids)
+        assert len(set(pids.values())) == len(execution_ids)
+        assert str(os.getpid()) not in pids.values()
+    finally:
+        client.shutdown()
+
+
+async def test_routes_events_without_an_execution_to_the_default_shard():
+    pool = WorkerPool(2, lambda conn: None)
+    pipes = [multiprocessing.Pipe() for _ in range(pool.size)]
+    pool.conns = [conn for conn, _ in pipes]
+
+    try:
+        await pool.dispatch({"type": SERVER_TO_SDK_EVENT_TYPE.ON_CLICK_HOOK})
+
+        assert pipes[DEFAULT_SHARD][1].recv() == {
+            "type": SERVER_TO_SDK_EVENT_TYPE.ON_CLICK_HOOK
+        }
+    finally:
+        for conn, worker_conn in pipes:
+            conn.close()
+            worker_conn.close()